@@ -0,0 +1,201 @@
+"""
+Modo de servicio asíncrono (ASGI).
+
+Las rutas de lectura más consultadas se atienden con corrutinas sobre los DAOs
+asíncronos (asyncpg + Motor); en /api/stats PostgreSQL y MongoDB se consultan en
+paralelo. Todo lo demás (login, formularios, escrituras, reportes) lo sigue
+atendiendo la aplicación Flask, montada como WSGI dentro del mismo servidor.
+
+Uso: SERVING_MODE=async gunicorn -c app/gunicorn.conf.py
+(workers uvicorn.workers.UvicornWorker). El modo síncrono sigue siendo el predeterminado.
+"""
+import time
+import asyncio
+import hashlib
+import functools
+import os
+import json
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+from typing import Optional
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount, Route
+
+from app.main import (create_app, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE,
+                      missing_opportunity_ids, format_my_application)
+from app.dao.async_factory import AsyncUCEFactory
+from app.db import close_async_clients
+from app.dto.models import UserDTO
+from app.cache import user_cache
+from app.metrics import observe_request
+from app.profiling import start_profile, finish_profile
+
+# La app Flask que atiende todo lo que no es nativo ASGI (login, escrituras, reportes)
+flask_app = create_app()
+
+# Hilos que atienden las rutas Flask montadas (equivalente a --threads de gthread)
+WSGI_THREADS = int(os.getenv("ASGI_WSGI_THREADS", "10"))
+
+# --- SESIÓN ---
+# La cookie la firma Flask (login); aquí solo se valida y se lee el usuario de Flask-Login.
+_session_serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+
+async def get_current_user(request: Request, factory: AsyncUCEFactory) -> Optional[UserDTO]:
+    cookie = request.cookies.get(flask_app.config["SESSION_COOKIE_NAME"])
+    if not cookie:
+        return None
+    try:
+        session = _session_serializer.loads(
+            cookie, max_age=int(flask_app.permanent_session_lifetime.total_seconds())
+        )
+    except Exception:
+        return None
+    user_id = session.get("_user_id")
+    if not user_id:
+        return None
+
+    # Misma caché read-through que el user_loader de Flask
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return UserDTO(**cached)
+    user = await factory.get_user_dao().get(user_id)
+    if user:
+        user_cache.set(user_id, asdict(user))
+    return user
+
+def get_page_args(request: Request):
+    try:
+        limit = int(request.query_params.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        limit = DEFAULT_PAGE_SIZE
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    return limit, request.query_params.get('after') or None
+
+def timed(route: str):
+    """Latencia y perfil por ruta (las rutas Flask montadas usan sus propios hooks)."""
+    def decorate(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(request: Request) -> Response:
+            started = time.perf_counter()
+            profile_token = start_profile()
+            status = 500
+            try:
+                response = await endpoint(request)
+                status = response.status_code
+                header = finish_profile(profile_token, f"{request.method} {route}",
+                                        (time.perf_counter() - started) * 1000)
+                if header:
+                    response.headers['Server-Timing'] = header
+                return response
+            finally:
+                observe_request(route, request.method, status, time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+def unauthorized() -> JSONResponse:
+    return JSONResponse({"error": "No autenticado"}, status_code=401)
+
+# --- RUTAS ASÍNCRONAS ---
+
+@timed('/api/opportunities')
+async def list_opportunities(request: Request) -> Response:
+    limit, after = get_page_args(request)
+    filters = {}
+    if request.query_params.get('company'):
+        filters['company_name'] = request.query_params['company']
+
+    async with AsyncUCEFactory() as factory:
+        try:
+            page = await factory.get_opportunity_dao().get_page(limit=limit, after=after, filters=filters)
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        except Exception as e:
+            return JSONResponse({"error": str(e)}, status_code=500)
+
+    # Mismo contrato que Flask: ETag del contenido y 304 si no cambió
+    body = json.dumps(page, ensure_ascii=False, default=str).encode()
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+@timed('/api/my-applications')
+async def my_applications(request: Request) -> Response:
+    async with AsyncUCEFactory() as factory:
+        user = await get_current_user(request, factory)
+        if user is None:
+            return unauthorized()
+        if user.role != 'student':
+            return JSONResponse([], status_code=403)
+
+        limit, after = get_page_args(request)
+        filters = {"user_id": user.id}
+        if request.query_params.get('status'):
+            filters['status'] = request.query_params['status']
+        try:
+            page = await factory.get_application_dao().get_page(limit=limit, after=after, filters=filters)
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        except Exception as e:
+            logging.error(f"Error en my-applications (async): {e}")
+            return JSONResponse({"items": [], "next_cursor": None})
+
+        apps = page["items"]
+        opps_by_id = {}
+        missing_ids = missing_opportunity_ids(apps)
+        if missing_ids:
+            opps_by_id = await factory.get_opportunity_dao().get_many(missing_ids)
+
+        data = [format_my_application(app, opps_by_id) for app in apps]
+        return JSONResponse({"items": data, "next_cursor": page["next_cursor"]})
+
+async def _safe_count(make_factory, dao_getter) -> int:
+    try:
+        async with make_factory() as factory:
+            return await dao_getter(factory).count()
+    except Exception as e:
+        logging.error(f"Error contando para /api/stats: {e}")
+        return 0
+
+@timed('/api/stats')
+async def dashboard_stats(request: Request) -> Response:
+    async with AsyncUCEFactory() as factory:
+        user = await get_current_user(request, factory)
+    if user is None:
+        return unauthorized()
+    if user.role != 'admin':
+        return JSONResponse({}, status_code=403)
+
+    # Los tres conteos en paralelo: cada consulta SQL con su propia sesión
+    total_students, total_apps, total_opps = await asyncio.gather(
+        _safe_count(AsyncUCEFactory, lambda f: f.get_student_dao()),
+        _safe_count(AsyncUCEFactory, lambda f: f.get_application_dao()),
+        _safe_count(AsyncUCEFactory, lambda f: f.get_opportunity_dao()),
+    )
+    return JSONResponse({
+        "students": total_students,
+        "opportunities": total_opps,
+        "applications": total_apps
+    })
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    await close_async_clients()
+
+asgi_app = Starlette(
+    routes=[
+        Route('/api/opportunities', list_opportunities, methods=['GET']),
+        Route('/api/my-applications', my_applications, methods=['GET']),
+        Route('/api/stats', dashboard_stats, methods=['GET']),
+        # El resto de rutas (y los otros métodos de las anteriores) los atiende Flask
+        Mount('/', app=WSGIMiddleware(flask_app, workers=WSGI_THREADS)),
+    ],
+    lifespan=lifespan,
+)
@@ -0,0 +1,387 @@
+import os
+import time
+import inspect
+import logging
+import functools
+import threading
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+# --- CIRCUIT BREAKER CON ESTADO COMPARTIDO ---
+# El estado (abierto/cerrado, fallos, sonda en curso) vive en un backend intercambiable:
+# Redis (compartido por todos los workers y contenedores) si se define CACHE_REDIS_URL,
+# o memoria del proceso (un breaker independiente por worker, útil en pruebas).
+# Así un corte de Mongo lo detectan tres fallos en todo el clúster, no tres por worker.
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half-open"
+
+class CircuitBreakerError(Exception):
+    """Circuito abierto: la operación se rechaza sin tocar la base de datos."""
+
+
+class MemoryBreakerStorage:
+    """Estado del breaker en memoria del proceso (segura para hilos)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._opened_at: Optional[float] = None
+        self._failures = 0
+        self._failures_expire_at = 0.0
+        self._probe_until = 0.0
+
+    def load(self) -> Optional[float]:
+        """Instante (epoch) en que se abrió el circuito; None si está cerrado."""
+        return self._opened_at
+
+    def open(self, opened_at: float) -> None:
+        with self._lock:
+            self._opened_at = opened_at
+            self._failures = 0
+            self._probe_until = 0.0
+
+    def close(self) -> None:
+        with self._lock:
+            self._opened_at = None
+            self._failures = 0
+            self._probe_until = 0.0
+
+    def incr_failures(self, window: float) -> int:
+        now = time.time()
+        with self._lock:
+            if now >= self._failures_expire_at:
+                self._failures = 0
+            self._failures += 1
+            self._failures_expire_at = now + window
+            return self._failures
+
+    def reset_failures(self) -> None:
+        with self._lock:
+            self._failures = 0
+
+    def acquire_probe(self, ttl: float) -> bool:
+        """Solo un llamador a la vez obtiene la sonda; expira sola si su dueño muere."""
+        now = time.time()
+        with self._lock:
+            if now < self._probe_until:
+                return False
+            self._probe_until = now + ttl
+            return True
+
+    def release_probe(self) -> None:
+        with self._lock:
+            self._probe_until = 0.0
+
+
+class RedisBreakerStorage:
+    """
+    Estado del breaker compartido en Redis. Si Redis falla se usa el estado local
+    del proceso durante REDIS_RETRY_AFTER segundos: nunca rompe el request.
+    """
+    REDIS_RETRY_AFTER = 30.0
+
+    def __init__(self, name: str, client):
+        self.name = name
+        self._client = client
+        self._prefix = f"uce:breaker:{name}:"
+        self._fallback = MemoryBreakerStorage()
+        self._down_until = 0.0
+
+    def _run(self, action: str, operation: Callable[[], Any], fallback: Callable[[], Any]) -> Any:
+        if time.monotonic() < self._down_until:
+            return fallback()
+        try:
+            return operation()
+        except Exception as e:
+            logging.error(f"Error Redis breaker {action} ({self.name}): {e}")
+            self._down_until = time.monotonic() + self.REDIS_RETRY_AFTER
+            return fallback()
+
+    def load(self) -> Optional[float]:
+        def operation():
+            raw = self._client.get(self._prefix + "opened_at")
+            return float(raw) if raw is not None else None
+        return self._run("load", operation, self._fallback.load)
+
+    def open(self, opened_at: float) -> None:
+        def operation():
+            pipe = self._client.pipeline()
+            pipe.set(self._prefix + "opened_at", repr(opened_at))
+            pipe.delete(self._prefix + "failures", self._prefix + "probe")
+            pipe.execute()
+        self._run("open", operation, lambda: self._fallback.open(opened_at))
+
+    def close(self) -> None:
+        def operation():
+            self._client.delete(self._prefix + "opened_at", self._prefix + "failures", self._prefix + "probe")
+        self._run("close", operation, self._fallback.close)
+
+    def incr_failures(self, window: float) -> int:
+        def operation():
+            pipe = self._client.pipeline()
+            pipe.incr(self._prefix + "failures")
+            # Ventana deslizante: fallos aislados separados por más de 'window' no se acumulan
+            pipe.expire(self._prefix + "failures", max(1, int(window)))
+            return int(pipe.execute()[0])
+        return self._run("incr_failures", operation, lambda: self._fallback.incr_failures(window))
+
+    def reset_failures(self) -> None:
+        self._run("reset_failures", lambda: self._client.delete(self._prefix + "failures"),
+                  self._fallback.reset_failures)
+
+    def acquire_probe(self, ttl: float) -> bool:
+        def operation():
+            # SET NX PX: una sola sonda en todo el clúster; expira si el worker muere a mitad
+            return bool(self._client.set(self._prefix + "probe", "1", nx=True, px=max(1, int(ttl * 1000))))
+        return self._run("acquire_probe", operation, lambda: self._fallback.acquire_probe(ttl))
+
+    def release_probe(self) -> None:
+        self._run("release_probe", lambda: self._client.delete(self._prefix + "probe"),
+                  self._fallback.release_probe)
+
+
+def get_breaker_storage(name: str):
+    """
+    Backend del breaker: Redis si CACHE_REDIS_URL está definida (y BREAKER_STORAGE no es
+    'memory'); si no, memoria del proceso.
+    """
+    backend = os.getenv("BREAKER_STORAGE", "redis" if os.getenv("CACHE_REDIS_URL") else "memory")
+    if backend == "redis":
+        from app.cache import _get_redis_client
+        return RedisBreakerStorage(name, _get_redis_client())
+    return MemoryBreakerStorage()
+
+
+class LatencyTracker:
+    """
+    Latencias recientes de operaciones exitosas, por operación (ventana deslizante).
+    El timeout adaptativo es el percentil indicado por un multiplicador, acotado.
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20, percentile: float = 99):
+        self.window = window
+        self.min_samples = min_samples
+        self.percentile = percentile
+        self._samples: Dict[str, deque] = {}
+        self._recorded: Dict[str, int] = {}
+        self._cached: Dict[str, Optional[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(operation)
+            if samples is None:
+                samples = self._samples[operation] = deque(maxlen=self.window)
+            samples.append(seconds)
+            recorded = self._recorded[operation] = self._recorded.get(operation, 0) + 1
+            # El percentil se recalcula cada 'min_samples' muestras, no en cada llamada
+            if recorded % self.min_samples == 0:
+                self._cached[operation] = self._compute(samples)
+
+    def value(self, operation: str) -> Optional[float]:
+        """Percentil observado de la operación; None mientras no haya muestras suficientes."""
+        return self._cached.get(operation)
+
+    def _compute(self, samples: deque) -> Optional[float]:
+        ordered: List[float] = sorted(samples)
+        rank = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return ordered[rank]
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker con estado compartido, sonda única en semiabierto y timeout adaptativo.
+
+    - Cerrado: todo pasa; 'fail_max' fallos (en todo el backend) dentro de 'failure_window' lo abren.
+    - Abierto: se rechaza de inmediato (CircuitBreakerError) hasta 'reset_timeout'.
+    - Semiabierto: pasado reset_timeout, UN solo llamador (en todo el clúster) prueba la base;
+      si funciona se cierra, si falla se reabre. El resto sigue recibiendo el rechazo inmediato.
+
+    'timeout_scope' (ej. pymongo.timeout) acota cada operación protegida a
+    multiplicador x p99 de su latencia observada, entre min_timeout y max_timeout.
+    Nunca retiene un lock mientras corre la operación: los hilos del worker no se serializan.
+    Sirve como decorador de funciones síncronas y corrutinas, o como 'with breaker.guard(...)'.
+    """
+
+    def __init__(self, name: str, fail_max: int = 3, reset_timeout: float = 10,
+                 exclude: Tuple[Type[BaseException], ...] = (), listeners: Optional[list] = None,
+                 storage=None, failure_window: float = 60, sync_interval: float = 1.0,
+                 timeout_scope: Optional[Callable[[Optional[float]], Any]] = None,
+                 min_timeout: float = 0.2, max_timeout: float = 2.0, timeout_multiplier: float = 4.0,
+                 latency: Optional[LatencyTracker] = None):
+        self.name = name
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.exclude = tuple(exclude)
+        self.listeners = list(listeners or [])
+        self.storage = storage if storage is not None else MemoryBreakerStorage()
+        self.failure_window = failure_window
+        # Cada cuánto se relee el estado compartido (entre lecturas se usa la copia local)
+        self.sync_interval = sync_interval
+        self.timeout_scope = timeout_scope
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.latency = latency if latency is not None else LatencyTracker()
+        # La sonda se libera sola si su dueño muere sin informar el resultado
+        self.probe_ttl = max_timeout * 2 + 1
+
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._opened_at: Optional[float] = None
+        self._synced_at = 0.0
+        self._has_failures = False
+
+    @property
+    def current_state(self) -> str:
+        self._sync()
+        return self._state
+
+    # ---------------------------------------------------------
+    # USO
+    # ---------------------------------------------------------
+    def __call__(self, func: Callable) -> Callable:
+        operation = func.__name__.lstrip("_").replace("protected_", "")
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with self.guard(operation):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.guard(operation):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        with self.guard(func.__name__):
+            return func(*args, **kwargs)
+
+    @contextmanager
+    def guard(self, operation: str, timeout: bool = True) -> Iterator[None]:
+        """
+        Protege el bloque: rechaza si el circuito está abierto, aplica el timeout
+        adaptativo (timeout=False para cursores largos) y cuenta el resultado.
+        """
+        probe = self._before_call()
+        scope = nullcontext()
+        if timeout and self.timeout_scope:
+            # La sonda usa el máximo: si la base volvió más lenta, el p99 viejo la haría fallar siempre
+            scope = self.timeout_scope(self.max_timeout if probe else self.timeout_for(operation))
+        started = time.perf_counter()
+        settled = False
+        try:
+            with scope:
+                yield
+        except self.exclude:
+            # Error del cliente (datos inválidos, duplicados): la base respondió bien
+            settled = True
+            self._on_success(probe)
+            raise
+        except Exception as e:
+            settled = True
+            self._on_failure(e, probe)
+            raise
+        else:
+            settled = True
+            self.latency.record(operation, time.perf_counter() - started)
+            self._on_success(probe)
+        finally:
+            if probe and not settled:
+                # Cancelado a mitad (GeneratorExit, CancelledError): sin resultado, vuelve a
+                # abierto con el mismo opened_at para que la próxima llamada pueda sondear
+                self.storage.release_probe()
+                self._set_state(STATE_OPEN, self._opened_at)
+
+    def timeout_for(self, operation: str) -> float:
+        """multiplicador x p99 observado, acotado; el máximo mientras no haya muestras."""
+        observed = self.latency.value(operation)
+        if observed is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, observed * self.timeout_multiplier))
+
+    # ---------------------------------------------------------
+    # TRANSICIONES
+    # ---------------------------------------------------------
+    def _before_call(self) -> bool:
+        """Retorna True si esta llamada es la sonda del estado semiabierto."""
+        self._sync()
+        if self._state == STATE_CLOSED:
+            return False
+        if self._state == STATE_HALF_OPEN or time.time() < (self._opened_at or 0) + self.reset_timeout:
+            raise CircuitBreakerError(f"Circuito '{self.name}' abierto")
+        if not self.storage.acquire_probe(self.probe_ttl):
+            # Otro worker/hilo ya está sondeando: fallback inmediato
+            raise CircuitBreakerError(f"Circuito '{self.name}' abierto (sonda en curso)")
+        self._set_state(STATE_HALF_OPEN, self._opened_at)
+        return True
+
+    def _on_success(self, probe: bool) -> None:
+        if probe:
+            self.storage.close()
+            self._has_failures = False
+            self._set_state(STATE_CLOSED, None)
+        elif self._has_failures:
+            # Solo se escribe en el backend si hubo fallos desde el último éxito
+            self._has_failures = False
+            self.storage.reset_failures()
+
+    def _on_failure(self, exc: BaseException, probe: bool) -> None:
+        for listener in self.listeners:
+            listener.failure(self, exc)
+        if probe:
+            self._open()
+            return
+        self._has_failures = True
+        if self.storage.incr_failures(self.failure_window) >= self.fail_max:
+            self._open()
+
+    def _open(self) -> None:
+        opened_at = time.time()
+        self.storage.open(opened_at)
+        self._set_state(STATE_OPEN, opened_at)
+
+    def _set_state(self, state: str, opened_at: Optional[float], observed: bool = False) -> None:
+        with self._lock:
+            old_state = self._state
+            self._state, self._opened_at = state, opened_at
+            self._synced_at = time.monotonic()
+        if old_state == state:
+            return
+        for listener in self.listeners:
+            # observed=True: el cambio lo hizo otro worker (solo se refleja el estado)
+            if observed:
+                listener.state_observed(self, state)
+            else:
+                listener.state_change(self, old_state, state)
+
+    def _sync(self) -> None:
+        """Relee el estado compartido como mucho cada sync_interval segundos."""
+        if time.monotonic() - self._synced_at < self.sync_interval:
+            return
+        opened_at = self.storage.load()
+        if opened_at is None:
+            state = STATE_CLOSED
+        elif self._state == STATE_HALF_OPEN and opened_at == self._opened_at:
+            state = STATE_HALF_OPEN  # Nuestra propia sonda sigue en curso
+        else:
+            state = STATE_OPEN
+        self._set_state(state, opened_at, observed=True)
+
+
+class BreakerListener:
+    """Interfaz de observadores del breaker (métricas, logs)."""
+
+    def state_change(self, breaker: CircuitBreaker, old_state: str, new_state: str) -> None:
+        pass
+
+    def state_observed(self, breaker: CircuitBreaker, state: str) -> None:
+        pass
+
+    def failure(self, breaker: CircuitBreaker, exc: BaseException) -> None:
+        pass
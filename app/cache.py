@@ -0,0 +1,229 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.metrics import record_cache_access
+
+# --- CACHÉS DE LA APLICACIÓN ---
+# Backend local (LRU + TTL, por proceso) o compartido (Redis) si se define CACHE_REDIS_URL.
+# Los valores deben ser serializables a JSON (dicts simples) para que ambos backends sean intercambiables.
+
+class LocalTTLCache:
+    """
+    Caché en memoria del proceso: acotada (LRU) y con expiración (TTL).
+    Segura para hilos (workers gthread).
+    """
+    # Cada worker tiene su copia: una invalidación no llega a los demás
+    shared = False
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 60, instrumented: bool = True):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.instrumented = instrumented
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Optional[Any]:
+        key = str(key)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                if self.instrumented:
+                    record_cache_access(self.name, False)
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            if self.instrumented:
+                record_cache_access(self.name, True)
+            return entry[1]
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None) -> None:
+        key = str(key)
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def add(self, key: Any, value: Any, ttl: Optional[float] = None) -> bool:
+        """Guarda el valor solo si la clave no existe (o expiró). Retorna True si lo guardó."""
+        key = str(key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] >= now:
+                return False
+            self._data[key] = (now + (ttl if ttl is not None else self.ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return True
+
+    def incr(self, key: Any, ttl: Optional[float] = None) -> int:
+        """Suma 1 al contador (lo crea en 1 con el TTL dado) y retorna el nuevo valor."""
+        key = str(key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < now:
+                entry = (now + (ttl if ttl is not None else self.ttl), 0)
+            entry = (entry[0], entry[1] + 1)
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return entry[1]
+
+    def delete(self, key: Any) -> None:
+        with self._lock:
+            self._data.pop(str(key), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": "local",
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class RedisCache:
+    """
+    Caché compartida entre workers y contenedores (Redis).
+    Si Redis falla, se comporta como un miss: nunca rompe el request.
+    """
+    shared = True
+
+    def __init__(self, name: str, client, ttl: float = 60, instrumented: bool = True):
+        self.name = name
+        self.ttl = ttl
+        self.instrumented = instrumented
+        self.hits = 0
+        self.misses = 0
+        self._client = client
+        self._prefix = f"uce:{name}:"
+
+    def get(self, key: Any) -> Optional[Any]:
+        try:
+            raw = self._client.get(self._prefix + str(key))
+        except Exception as e:
+            logging.error(f"Error Redis get ({self.name}): {e}")
+            raw = None
+        if raw is None:
+            self.misses += 1
+            if self.instrumented:
+                record_cache_access(self.name, False)
+            return None
+        self.hits += 1
+        if self.instrumented:
+            record_cache_access(self.name, True)
+        return json.loads(raw)
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None) -> None:
+        try:
+            seconds = max(1, int(ttl if ttl is not None else self.ttl))
+            self._client.set(self._prefix + str(key), json.dumps(value, default=str), ex=seconds)
+        except Exception as e:
+            logging.error(f"Error Redis set ({self.name}): {e}")
+
+    def add(self, key: Any, value: Any, ttl: Optional[float] = None) -> bool:
+        """SET NX: atómico entre workers. Si Redis falla, se reporta como no guardado."""
+        try:
+            seconds = max(1, int(ttl if ttl is not None else self.ttl))
+            return bool(self._client.set(self._prefix + str(key), json.dumps(value, default=str),
+                                         ex=seconds, nx=True))
+        except Exception as e:
+            logging.error(f"Error Redis add ({self.name}): {e}")
+            return False
+
+    def incr(self, key: Any, ttl: Optional[float] = None) -> int:
+        """INCR atómico; el TTL se fija solo al crear el contador. Si Redis falla, retorna 0."""
+        try:
+            seconds = max(1, int(ttl if ttl is not None else self.ttl))
+            pipe = self._client.pipeline(transaction=True)
+            pipe.set(self._prefix + str(key), 0, ex=seconds, nx=True)
+            pipe.incr(self._prefix + str(key))
+            return int(pipe.execute()[-1])
+        except Exception as e:
+            logging.error(f"Error Redis incr ({self.name}): {e}")
+            return 0
+
+    def delete(self, key: Any) -> None:
+        try:
+            self._client.delete(self._prefix + str(key))
+        except Exception as e:
+            logging.error(f"Error Redis delete ({self.name}): {e}")
+
+    def clear(self) -> None:
+        try:
+            for key in self._client.scan_iter(match=self._prefix + "*"):
+                self._client.delete(key)
+        except Exception as e:
+            logging.error(f"Error Redis clear ({self.name}): {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+_caches: Dict[str, Any] = {}
+_redis_client = None
+
+def _get_redis_client():
+    global _redis_client
+    if _redis_client is None:
+        # Dependencia opcional: solo se importa si se configura CACHE_REDIS_URL
+        import redis
+        _redis_client = redis.Redis.from_url(
+            os.environ["CACHE_REDIS_URL"], socket_timeout=0.5, socket_connect_timeout=0.5
+        )
+    return _redis_client
+
+def get_cache(name: str, maxsize: int = 1024, ttl: float = 60, instrumented: bool = True):
+    """
+    Retorna (creándola una sola vez por proceso) la caché con ese nombre.
+    Usa Redis si CACHE_REDIS_URL está definida; si no, una caché local LRU + TTL.
+    instrumented=False: no se reporta en uce_cache_requests_total. Es para estado
+    (contadores, trabajos) que no es una caché read-through y distorsionaría el hit ratio.
+    """
+    cache = _caches.get(name)
+    if cache is None:
+        if os.getenv("CACHE_REDIS_URL"):
+            cache = RedisCache(name, _get_redis_client(), ttl=ttl, instrumented=instrumented)
+        else:
+            cache = LocalTTLCache(name, maxsize=maxsize, ttl=ttl, instrumented=instrumented)
+        _caches[name] = cache
+    return cache
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Contadores de hit/miss de todas las cachés del proceso."""
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+# Caché de usuarios para Flask-Login (user_id -> campos de UserDTO)
+user_cache = get_cache(
+    "users",
+    maxsize=int(os.getenv("USER_CACHE_MAXSIZE", "4096")),
+    ttl=float(os.getenv("USER_CACHE_TTL", "300")),
+)
@@ -0,0 +1,64 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict
+
+from app.dao.factory import UCEFactory
+
+# --- VISTA MATERIALIZADA DE POSTULACIONES (SQL + NoSQL) ---
+# Cada postulación guarda una copia de título/empresa de su oferta en Mongo.
+# Se mantiene en tres momentos:
+#   1. Al postular (snapshot_fields).
+#   2. Al editar/eliminar la oferta (UCEFactory._sync_application_view).
+#   3. Reconciliación periódica para corregir desvíos (reconcile_application_view).
+
+def snapshot_fields(factory: UCEFactory, opportunity_id: str) -> Dict[str, Any]:
+    """
+    Columnas de la copia para una nueva postulación.
+    Si Mongo no responde, retorna {} y la reconciliación completará la copia.
+    """
+    try:
+        opp = factory.get_opportunity_dao().get_many([opportunity_id], strict=True).get(str(opportunity_id))
+    except Exception:
+        return {}
+    if not opp:
+        return {}
+    return {
+        "opportunity_title": opp.title,
+        "opportunity_company": opp.company_name,
+        "opportunity_synced_at": datetime.utcnow(),
+    }
+
+def reconcile_application_view(factory: UCEFactory, batch_size: int = 500) -> Dict[str, int]:
+    """
+    Recorre las ofertas referenciadas por postulaciones en lotes, consulta Mongo con $in
+    y corrige solo las copias que difieren. Si Mongo falla, se detiene sin tocar nada más;
+    si falla la copia de una oferta, se registra el error y se sigue con las demás.
+    """
+    app_dao = factory.get_application_dao()
+    opp_dao = factory.get_opportunity_dao()
+    stats = {"opportunities": 0, "rows_updated": 0, "errors": 0}
+
+    after = None
+    while True:
+        ids = app_dao.get_opportunity_ids(after=after, limit=batch_size)
+        if not ids:
+            break
+        found = opp_dao.get_many(ids, strict=True)
+        for opportunity_id in ids:
+            opp = found.get(opportunity_id)
+            title = opp.title if opp else None
+            company = opp.company_name if opp else None
+            try:
+                stats["rows_updated"] += app_dao.sync_opportunity_snapshot(opportunity_id, title, company)
+            except Exception as e:
+                logging.error(f"Error sincronizando la copia de la oferta {opportunity_id}: {e}")
+                stats["errors"] += 1
+        stats["opportunities"] += len(ids)
+        after = ids[-1]
+    return stats
+
+if __name__ == '__main__':
+    # Uso: python -m app.dao.application_view  (ej. desde un cron)
+    with UCEFactory() as factory:
+        result = reconcile_application_view(factory)
+    print(f"Reconciliación: {result['opportunities']} ofertas revisadas, {result['rows_updated']} postulaciones corregidas, {result['errors']} errores")
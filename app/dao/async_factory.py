@@ -0,0 +1,39 @@
+from app.dao.async_interfaces import (AsyncDAOFactory, AsyncStudentDAO, AsyncOpportunityDAO,
+                                      AsyncApplicationDAO, AsyncUserDAO)
+from app.dao.async_postgres_impl import (AsyncPostgresStudentDAO, AsyncPostgresApplicationDAO,
+                                         AsyncPostgresUserDAO)
+from app.dao.async_mongo_impl import AsyncMongoOpportunityDAO
+from app.db import get_async_sessionmaker, get_async_mongo_client, MONGO_URI
+
+class AsyncUCEFactory(AsyncDAOFactory):
+    """
+    Fábrica Híbrida asíncrona (modo ASGI).
+    Mismo rol que UCEFactory: una AsyncSession por request y el cliente Motor del worker.
+    """
+
+    def __init__(self):
+        self._sql_session = get_async_sessionmaker()()
+
+    def get_user_dao(self) -> AsyncUserDAO:
+        return AsyncPostgresUserDAO(self._sql_session)
+
+    def get_student_dao(self) -> AsyncStudentDAO:
+        return AsyncPostgresStudentDAO(self._sql_session)
+
+    def get_application_dao(self) -> AsyncApplicationDAO:
+        return AsyncPostgresApplicationDAO(self._sql_session)
+
+    def get_opportunity_dao(self) -> AsyncOpportunityDAO:
+        return AsyncMongoOpportunityDAO(get_async_mongo_client(MONGO_URI), on_change=self._sync_application_view)
+
+    async def _sync_application_view(self, opportunity_id: str, title, company_name) -> None:
+        await self.get_application_dao().sync_opportunity_snapshot(opportunity_id, title, company_name)
+
+    async def close(self):
+        await self._sql_session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
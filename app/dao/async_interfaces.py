@@ -0,0 +1,102 @@
+from abc import ABC, abstractmethod
+from typing import Any, List, Optional, Dict
+
+# --- INTERFACES ASÍNCRONAS (modo ASGI) ---
+# Mismo contrato que app.dao.interfaces, pero cada operación es una corrutina.
+# Permiten consultar PostgreSQL y MongoDB en paralelo dentro de un mismo request.
+
+class AsyncGenericDAO(ABC):
+    """
+    Versión asíncrona de GenericDAO.
+    """
+
+    @abstractmethod
+    async def create(self, data: Dict[str, Any]) -> Any:
+        pass
+
+    @abstractmethod
+    async def get(self, id: Any) -> Optional[Any]:
+        pass
+
+    @abstractmethod
+    async def get_all(self) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    async def get_page(self, limit: int = 50, after: Optional[str] = None,
+                       filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Paginación keyset: {"items": [...], "next_cursor": str o None}."""
+        pass
+
+    @abstractmethod
+    async def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        pass
+
+    @abstractmethod
+    async def update(self, id: Any, data: Dict[str, Any]) -> bool:
+        pass
+
+    @abstractmethod
+    async def delete(self, id: Any) -> bool:
+        pass
+
+
+class AsyncStudentDAO(AsyncGenericDAO):
+    """
+    Estudiantes (Dominio SQL), versión asíncrona.
+    """
+    pass
+
+
+class AsyncOpportunityDAO(AsyncGenericDAO):
+    """
+    Oportunidades (Dominio NoSQL), versión asíncrona.
+    """
+
+    @abstractmethod
+    async def get_many(self, ids: List[Any]) -> Dict[str, Any]:
+        """Varias oportunidades en una sola consulta ($in)."""
+        pass
+
+
+class AsyncUserDAO(AsyncGenericDAO):
+    @abstractmethod
+    async def get_by_email(self, email: str) -> Optional[Any]:
+        pass
+
+    @abstractmethod
+    async def validate_login(self, email: str, password: str) -> Optional[Any]:
+        pass
+
+
+class AsyncApplicationDAO(AsyncGenericDAO):
+    """
+    Postulaciones (Dominio SQL - Trazabilidad), versión asíncrona.
+    """
+    pass
+
+
+class AsyncDAOFactory(ABC):
+    """
+    Fábrica Abstracta asíncrona: mismo rol que AbstractDAOFactory.
+    """
+
+    @abstractmethod
+    def get_student_dao(self) -> AsyncStudentDAO:
+        pass
+
+    @abstractmethod
+    def get_opportunity_dao(self) -> AsyncOpportunityDAO:
+        pass
+
+    @abstractmethod
+    def get_application_dao(self) -> AsyncApplicationDAO:
+        pass
+
+    @abstractmethod
+    def get_user_dao(self) -> AsyncUserDAO:
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        pass
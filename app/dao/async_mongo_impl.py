@@ -0,0 +1,250 @@
+from datetime import datetime
+from dataclasses import asdict
+from typing import Dict, Any, Optional, List, Callable, Awaitable, Tuple
+from pymongo.errors import DuplicateKeyError
+from bson.objectid import ObjectId
+import logging
+
+from app.dao.async_interfaces import AsyncOpportunityDAO
+from app.dao.mongo_impl import (db_breaker, opportunity_cache, build_dedupe_key, MongoOpportunityDAO,
+                                DEDUPE_KEY_FIELD, UPDATED_AT_FIELD, PUBLIC_PROJECTION)
+from app.breaker import CircuitBreakerError
+from app.dto.models import OpportunityDTO
+from app.metrics import instrument_dao
+
+# Callback asíncrono de cambios: (opportunity_id, título, empresa); None/None = eliminada
+AsyncOpportunityChangeListener = Callable[[str, Optional[str], Optional[str]], Awaitable[None]]
+
+# db_breaker decora corrutinas igual que funciones: el estado, la sonda y el timeout
+# adaptativo (pymongo.timeout, que Motor propaga a su executor) se comparten con el DAO síncrono.
+# Las lecturas del estado compartido en Redis son síncronas pero raras (cada BREAKER_SYNC_INTERVAL y en fallos).
+
+@instrument_dao("mongo")
+class AsyncMongoOpportunityDAO(AsyncOpportunityDAO):
+    """
+    Oportunidades sobre Motor. Comparte circuit breaker y caché con MongoOpportunityDAO,
+    así ambos modos degradan igual (datos viejos o tarjeta de mantenimiento).
+    """
+    _cache_read = MongoOpportunityDAO._cache_read
+    _cache_write = MongoOpportunityDAO._cache_write
+    _map_to_dto = MongoOpportunityDAO._map_to_dto
+    _get_maintenance_card = MongoOpportunityDAO._get_maintenance_card
+    _get_maintenance_dto = MongoOpportunityDAO._get_maintenance_dto
+
+    def __init__(self, client, on_change: Optional[AsyncOpportunityChangeListener] = None):
+        self.client = client
+        self.on_change = on_change
+        self.collection = self.client['ucedb']['opportunities']
+
+    async def create(self, data: Dict[str, Any]) -> str:
+        return await self._protected_create(data)
+
+    @db_breaker
+    async def _protected_create(self, data: Dict[str, Any]) -> str:
+        doc = dict(data)
+        doc[DEDUPE_KEY_FIELD] = build_dedupe_key(data.get('title'), data.get('company_name'))
+        doc[UPDATED_AT_FIELD] = datetime.utcnow()
+        try:
+            result = await self.collection.insert_one(doc)
+        except DuplicateKeyError:
+            raise ValueError(f"Ya existe la oferta '{data.get('title')}' para '{data.get('company_name')}'.")
+        opportunity_cache.clear()
+        return str(result.inserted_id)
+
+    async def get_all(self) -> List[Dict[str, Any]]:
+        cached, fresh = self._cache_read("all")
+        if fresh:
+            return cached
+        try:
+            results = await self._protected_get_all()
+            self._cache_write("all", results)
+            return results
+        except CircuitBreakerError:
+            logging.warning("⚠️ Circuit Breaker ABIERTO.")
+            return cached if cached is not None else self._get_maintenance_card()
+        except Exception as e:
+            logging.error(f"Error Mongo get_all (async): {e}")
+            return cached if cached is not None else self._get_maintenance_card()
+
+    @db_breaker
+    async def _protected_get_all(self) -> List[Dict[str, Any]]:
+        return await self._find({})
+
+    async def get_page(self, limit: int = 50, after: Optional[str] = None,
+                       filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        after_oid = None
+        if after:
+            try:
+                after_oid = ObjectId(after)
+            except Exception:
+                raise ValueError("Cursor de paginación inválido.")
+
+        # Misma clave que el DAO síncrono: la caché se comparte entre ambos modos
+        cache_key = f"page:{limit}:{after or ''}:{sorted((filters or {}).items())}"
+        cached, fresh = self._cache_read(cache_key)
+        if fresh:
+            return cached
+        try:
+            page = await self._protected_get_page(limit, after_oid, filters)
+            self._cache_write(cache_key, page)
+            return page
+        except CircuitBreakerError:
+            logging.warning("⚠️ Circuit Breaker ABIERTO.")
+            if cached is not None:
+                return cached
+            return {"items": self._get_maintenance_card(), "next_cursor": None}
+        except Exception as e:
+            logging.error(f"Error Mongo get_page (async): {e}")
+            if cached is not None:
+                return cached
+            return {"items": self._get_maintenance_card(), "next_cursor": None}
+
+    @db_breaker
+    async def _protected_get_page(self, limit: int, after_oid: Optional[ObjectId],
+                                  filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        query = dict(filters or {})
+        if after_oid:
+            query["_id"] = {"$gt": after_oid}
+        items = await self._find(query, limit + 1)
+        next_cursor = items[limit - 1]['id'] if len(items) > limit else None
+        return {"items": items[:limit], "next_cursor": next_cursor}
+
+    async def _find(self, query: Dict[str, Any], limit: int = 0) -> List[Dict[str, Any]]:
+        cursor = self.collection.find(query, PUBLIC_PROJECTION).sort("_id", 1).limit(limit)
+        items = []
+        async for doc in cursor:
+            doc['id'] = str(doc.pop('_id'))
+            items.append(doc)
+        return items
+
+    async def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        try:
+            return await self._protected_count(filters)
+        except CircuitBreakerError:
+            logging.warning("⚠️ Circuit Breaker ABIERTO.")
+            return 0
+        except Exception as e:
+            logging.error(f"Error Mongo count (async): {e}")
+            return 0
+
+    @db_breaker
+    async def _protected_count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        if filters:
+            return await self.collection.count_documents(filters)
+        return await self.collection.estimated_document_count()
+
+    async def get(self, id: Any) -> Optional[OpportunityDTO]:
+        cache_key = f"doc:{id}"
+        cached, fresh = self._cache_read(cache_key)
+        if fresh:
+            return OpportunityDTO(**cached)
+        try:
+            oid = ObjectId(id)
+        except Exception:
+            return None
+        try:
+            doc = await self._protected_get(oid)
+            if not doc:
+                return None
+            dto = self._map_to_dto(doc)
+            self._cache_write(cache_key, asdict(dto))
+            return dto
+        except CircuitBreakerError:
+            return OpportunityDTO(**cached) if cached is not None else self._get_maintenance_dto(id)
+        except Exception as e:
+            logging.error(f"Error Mongo get individual (async): {e}")
+            return OpportunityDTO(**cached) if cached is not None else self._get_maintenance_dto(id)
+
+    @db_breaker
+    async def _protected_get(self, oid: ObjectId) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"_id": oid})
+
+    async def get_many(self, ids: List[Any]) -> Dict[str, OpportunityDTO]:
+        oids = set()
+        for id in ids:
+            try:
+                oids.add(ObjectId(id))
+            except Exception:
+                continue
+        if not oids:
+            return {}
+        try:
+            return await self._protected_get_many(list(oids))
+        except CircuitBreakerError:
+            return {str(id): self._get_maintenance_dto(id) for id in ids if id}
+        except Exception as e:
+            logging.error(f"Error Mongo get_many (async): {e}")
+            return {str(id): self._get_maintenance_dto(id) for id in ids if id}
+
+    @db_breaker
+    async def _protected_get_many(self, oids: List[ObjectId]) -> Dict[str, OpportunityDTO]:
+        cursor = self.collection.find({"_id": {"$in": oids}}, {"title": 1, "company_name": 1})
+        return {str(doc['_id']): self._map_to_dto(doc) async for doc in cursor}
+
+    async def update(self, id: Any, data: Dict[str, Any]) -> bool:
+        try:
+            oid = ObjectId(id)
+        except Exception:
+            return False
+        try:
+            matched, renamed = await self._protected_update(oid, data)
+        except DuplicateKeyError:
+            raise ValueError("Ya existe otra oferta con ese título para esa empresa.")
+        except CircuitBreakerError:
+            logging.warning("⚠️ Circuit Breaker ABIERTO.")
+            return False
+        except Exception as e:
+            logging.error(f"Error update Mongo (async): {e}")
+            return False
+        opportunity_cache.clear()
+        if renamed and matched:
+            await self._notify_change(id, *renamed)
+        return matched
+
+    @db_breaker
+    async def _protected_update(self, oid: ObjectId, data: Dict[str, Any]) -> Tuple[bool, Optional[Tuple[Any, Any]]]:
+        changes = {k: v for k, v in data.items() if k not in ('_id', DEDUPE_KEY_FIELD, UPDATED_AT_FIELD)}
+        changes[UPDATED_AT_FIELD] = datetime.utcnow()
+        renamed = None
+        if 'title' in changes or 'company_name' in changes:
+            current = await self.collection.find_one({"_id": oid}, {"title": 1, "company_name": 1})
+            if not current:
+                return False, None
+            renamed = (
+                changes.get('title', current.get('title')),
+                changes.get('company_name', current.get('company_name'))
+            )
+            changes[DEDUPE_KEY_FIELD] = build_dedupe_key(*renamed)
+        result = await self.collection.update_one({"_id": oid}, {"$set": changes})
+        return result.matched_count > 0, renamed
+
+    async def delete(self, id: Any) -> bool:
+        try:
+            oid = ObjectId(id)
+        except Exception:
+            return False
+        try:
+            deleted = await self._protected_delete(oid)
+        except CircuitBreakerError:
+            logging.warning("⚠️ Circuit Breaker ABIERTO.")
+            return False
+        except Exception as e:
+            logging.error(f"Error delete Mongo (async): {e}")
+            return False
+        opportunity_cache.clear()
+        if deleted:
+            await self._notify_change(id, None, None)
+        return deleted
+
+    @db_breaker
+    async def _protected_delete(self, oid: ObjectId) -> bool:
+        result = await self.collection.delete_one({"_id": oid})
+        return result.deleted_count > 0
+
+    async def _notify_change(self, id: Any, title: Optional[str], company_name: Optional[str]) -> None:
+        if not self.on_change:
+            return
+        try:
+            await self.on_change(str(id), title, company_name)
+        except Exception as e:
+            logging.error(f"Error sincronizando vista de postulaciones ({id}): {e}")
@@ -0,0 +1,259 @@
+import asyncio
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+import logging
+from sqlalchemy import select, func, tuple_, or_, update, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Imports de Interfaces y Modelos
+from app.dao.async_interfaces import AsyncStudentDAO, AsyncUserDAO, AsyncApplicationDAO
+from app.dao.postgres_impl import (_encode_cursor, _decode_cursor, _apply_filters,
+                                   PostgresStudentDAO, PostgresUserDAO, PostgresApplicationDAO)
+from app.models.sql import StudentModel, ApplicationModel, UserModel
+from app.dto.models import StudentDTO, UserDTO
+from app.cache import user_cache
+from app.metrics import instrument_dao
+from app.security import verify_password, needs_rehash, hash_password
+
+# Las consultas son las mismas que en postgres_impl, escritas con select() para AsyncSession.
+# Los mapeos fila -> DTO/dict se reutilizan tal cual desde las clases síncronas.
+
+@instrument_dao("postgres")
+class AsyncPostgresStudentDAO(AsyncStudentDAO):
+    """
+    Estudiantes sobre asyncpg.
+    """
+    _map_to_dto = PostgresStudentDAO._map_to_dto
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create(self, data: Dict[str, Any]) -> StudentDTO:
+        student = StudentModel(**data)
+        self.session.add(student)
+        await self.session.commit()
+        return self._map_to_dto(student)
+
+    async def get(self, id: Any) -> Optional[StudentDTO]:
+        student = await self.session.get(StudentModel, int(id))
+        if not student:
+            return None
+        return self._map_to_dto(student)
+
+    async def get_all(self) -> List[Dict[str, Any]]:
+        result = await self.session.execute(select(
+            StudentModel.id, StudentModel.name, StudentModel.email,
+            StudentModel.gpa, StudentModel.department
+        ))
+        return [dict(row._mapping) for row in result]
+
+    async def get_page(self, limit: int = 50, after: Optional[str] = None,
+                       filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        query = select(
+            StudentModel.id, StudentModel.name, StudentModel.email,
+            StudentModel.gpa, StudentModel.department
+        )
+        query = _apply_filters(query, StudentModel, filters)
+        if after:
+            try:
+                query = query.filter(StudentModel.id > int(after))
+            except ValueError:
+                raise ValueError("Cursor de paginación inválido.")
+        rows = (await self.session.execute(query.order_by(StudentModel.id).limit(limit + 1))).all()
+
+        items = [dict(row._mapping) for row in rows[:limit]]
+        next_cursor = str(items[-1]["id"]) if len(rows) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
+
+    async def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        query = _apply_filters(select(func.count(StudentModel.id)), StudentModel, filters)
+        return (await self.session.scalar(query)) or 0
+
+    async def update(self, id: Any, data: Dict[str, Any]) -> bool:
+        return False
+
+    async def delete(self, id: Any) -> bool:
+        return False
+
+
+@instrument_dao("postgres")
+class AsyncPostgresUserDAO(AsyncUserDAO):
+    """
+    Usuarios (Login y Auth) sobre asyncpg.
+    """
+    _map_to_dto = PostgresUserDAO._map_to_dto
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_by_email(self, email: str) -> Optional[UserDTO]:
+        user = await self.session.scalar(select(UserModel).filter_by(email=email).limit(1))
+        if not user:
+            return None
+        return self._map_to_dto(user)
+
+    async def validate_login(self, email: str, password_plaintext: str) -> Optional[UserDTO]:
+        user = await self.session.scalar(select(UserModel).filter_by(email=email).limit(1))
+        if not user:
+            return None
+        # El hashing bloquea (pool de procesos): se espera en un hilo para no frenar el event loop
+        if not await asyncio.to_thread(verify_password, user.password_hash, password_plaintext):
+            return None
+        if needs_rehash(user.password_hash):
+            try:
+                user.password_hash = await asyncio.to_thread(hash_password, password_plaintext)
+                await self.session.commit()
+            except Exception as e:
+                await self.session.rollback()
+                logging.error(f"No se pudo re-hashear la contraseña del usuario {user.id}: {e}")
+        return self._map_to_dto(user)
+
+    async def create(self, data: Dict[str, Any]) -> UserDTO:
+        user = UserModel(**data)
+        self.session.add(user)
+        await self.session.commit()
+        user_cache.delete(user.id)
+        return self._map_to_dto(user)
+
+    async def get(self, id: Any) -> Optional[UserDTO]:
+        user = await self.session.get(UserModel, int(id))
+        if not user:
+            return None
+        return self._map_to_dto(user)
+
+    async def get_all(self) -> List[Dict[str, Any]]: return []
+    async def get_page(self, limit=50, after=None, filters=None): return {"items": [], "next_cursor": None}
+
+    async def update(self, id: Any, data: Dict[str, Any]) -> bool:
+        try:
+            result = await self.session.execute(update(UserModel).filter_by(id=int(id)).values(**data))
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            return False
+        user_cache.delete(id)
+        return result.rowcount > 0
+
+    async def delete(self, id: Any) -> bool:
+        try:
+            result = await self.session.execute(delete(UserModel).filter_by(id=int(id)))
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            return False
+        user_cache.delete(id)
+        return result.rowcount > 0
+
+    async def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        query = _apply_filters(select(func.count(UserModel.id)), UserModel, filters)
+        return (await self.session.scalar(query)) or 0
+
+
+@instrument_dao("postgres")
+class AsyncPostgresApplicationDAO(AsyncApplicationDAO):
+    """
+    Postulaciones (Trazabilidad) sobre asyncpg.
+    """
+    _row_to_dict = PostgresApplicationDAO._row_to_dict
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create(self, data: Dict[str, Any]) -> Any:
+        existing_app = await self.session.scalar(
+            select(ApplicationModel.id).filter_by(
+                user_id=data['user_id'], opportunity_id=data['opportunity_id']
+            ).limit(1)
+        )
+        if existing_app:
+            raise ValueError("Ya has enviado una postulación a esta oportunidad.")
+
+        app = ApplicationModel(**data)
+        self.session.add(app)
+        try:
+            await self.session.commit()
+        except IntegrityError:
+            await self.session.rollback()
+            raise ValueError("Ya has enviado una postulación a esta oportunidad.")
+        return app.id
+
+    async def get(self, id: Any) -> Optional[Any]:
+        return None
+
+    async def get_all(self) -> List[Dict[str, Any]]:
+        result = await self.session.execute(self._joined_query().order_by(ApplicationModel.created_at.desc()))
+        return [self._row_to_dict(row) for row in result]
+
+    async def get_page(self, limit: int = 50, after: Optional[str] = None,
+                       filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        # Mismo keyset (created_at, id) descendente que la versión síncrona
+        query = _apply_filters(self._joined_query(), ApplicationModel, filters)
+        if after:
+            created_at, id = _decode_cursor(after)
+            query = query.filter(
+                tuple_(ApplicationModel.created_at, ApplicationModel.id) < (created_at, id)
+            )
+        query = query.order_by(ApplicationModel.created_at.desc(), ApplicationModel.id.desc()).limit(limit + 1)
+        rows = (await self.session.execute(query)).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = _encode_cursor(last.created_at, last.id)
+        return {"items": [self._row_to_dict(row) for row in rows[:limit]], "next_cursor": next_cursor}
+
+    def _joined_query(self):
+        return (
+            select(
+                ApplicationModel.id,
+                ApplicationModel.opportunity_id,
+                ApplicationModel.opportunity_title,
+                ApplicationModel.opportunity_company,
+                ApplicationModel.status,
+                ApplicationModel.created_at,
+                UserModel.name.label("user_name"),
+                UserModel.email.label("user_email"),
+            )
+            .select_from(ApplicationModel)
+            .outerjoin(UserModel, UserModel.id == ApplicationModel.user_id)
+        )
+
+    async def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        query = _apply_filters(select(func.count(ApplicationModel.id)), ApplicationModel, filters)
+        return (await self.session.scalar(query)) or 0
+
+    async def update(self, id: Any, data: Dict[str, Any]) -> bool:
+        try:
+            result = await self.session.execute(update(ApplicationModel).filter_by(id=int(id)).values(**data))
+            await self.session.commit()
+            return result.rowcount > 0
+        except Exception:
+            await self.session.rollback()
+            return False
+
+    async def delete(self, id: Any) -> bool:
+        return False
+
+    async def sync_opportunity_snapshot(self, opportunity_id: str, title: Optional[str],
+                                        company_name: Optional[str]) -> int:
+        stmt = (
+            update(ApplicationModel)
+            .where(
+                ApplicationModel.opportunity_id == str(opportunity_id),
+                or_(
+                    ApplicationModel.opportunity_title.is_distinct_from(title),
+                    ApplicationModel.opportunity_company.is_distinct_from(company_name),
+                )
+            )
+            .values(opportunity_title=title, opportunity_company=company_name,
+                    opportunity_synced_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            result = await self.session.execute(stmt)
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+        return result.rowcount
@@ -1,9 +1,7 @@
-import os
 from app.dao.interfaces import AbstractDAOFactory, StudentDAO, OpportunityDAO, ApplicationDAO, UserDAO
 from app.dao.postgres_impl import PostgresStudentDAO, PostgresApplicationDAO, PostgresUserDAO
 from app.dao.mongo_impl import MongoOpportunityDAO
-from app.db import SessionLocal
-# Eliminamos get_mongo_db de aquí porque ya no lo usaremos globalmente
+from app.db import SessionLocal, get_mongo_client, MONGO_URI
 
 class UCEFactory(AbstractDAOFactory):
     """
@@ -14,7 +12,7 @@ class UCEFactory(AbstractDAOFactory):
     def __init__(self):
         """
         Al instanciar la fábrica, abrimos solo la sesión SQL.
-        La conexión a Mongo se delegará al DAO específico para manejar Timeouts.
+        La conexión a Mongo usa el cliente compartido del worker (ver app.db).
         """
         # 1. Conexión SQL (PostgreSQL) - Esta sí la mantenemos abierta
         self._sql_session = SessionLocal()
@@ -37,20 +35,25 @@ class UCEFactory(AbstractDAOFactory):
 
     def get_opportunity_dao(self) -> OpportunityDAO:
         """
-        Inyecta la URI de conexión en el DAO de Oportunidades.
-        El DAO se encargará de crear la conexión 'Fail Fast' (2 segundos).
+        Inyecta el MongoClient compartido del worker en el DAO de Oportunidades.
+        El cliente se crea una sola vez por proceso (después del fork) y mantiene
+        la configuración 'Fail Fast' (2 segundos).
         """
-        # Obtenemos la URI del entorno o usamos la default de Docker
-        mongo_uri = os.getenv("MONGO_URI", "mongodb://mongo:27017/")
-        
-        # Pasamos el STRING, no el objeto de base de datos
-        return MongoOpportunityDAO(mongo_uri)
+        # Reutilizamos el pool del proceso (URI: MONGO_URI de app.db) en lugar de abrir un cliente por DAO
+        return MongoOpportunityDAO(get_mongo_client(MONGO_URI), on_change=self._sync_application_view)
 
     def get_application_dao(self) -> ApplicationDAO:
         # Importación local para evitar dependencias circulares si las hubiera
         from app.dao.postgres_impl import PostgresApplicationDAO
         return PostgresApplicationDAO(self._sql_session)
 
+    def _sync_application_view(self, opportunity_id: str, title, company_name) -> None:
+        """
+        Mantiene la vista materializada: al editar/eliminar una oferta en Mongo,
+        actualiza la copia de título/empresa en sus postulaciones (PostgreSQL).
+        """
+        self.get_application_dao().sync_opportunity_snapshot(opportunity_id, title, company_name)
+
     def close(self):
         """
         Método de limpieza para cerrar la sesión SQL.
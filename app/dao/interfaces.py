@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, List, Optional, Dict
+from typing import Any, List, Optional, Dict, Iterator
 
 class GenericDAO(ABC):
     """
@@ -34,7 +34,36 @@ class GenericDAO(ABC):
         """
         pass
 
-        
+    @abstractmethod
+    def stream(self, fields: Optional[List[str]] = None, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre todos los registros con un cursor del lado del servidor, por lotes.
+        A diferencia de get_all, la memoria usada no depende del tamaño de la tabla.
+        :param fields: Proyección (solo estos campos); None = todos los públicos.
+        """
+        pass
+
+    @abstractmethod
+    def get_page(self, limit: int = 50, after: Optional[str] = None,
+                 filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Paginación por cursor (keyset): nunca usa OFFSET.
+        :param limit: Máximo de registros de la página.
+        :param after: Cursor opaco devuelto por la página anterior (None = primera).
+        :param filters: Igualdades opcionales campo -> valor (ej. status, company_name).
+        :return: {"items": [...], "next_cursor": str o None si es la última página}.
+        :raises ValueError: Si el cursor no es válido.
+        """
+        pass
+
+    @abstractmethod
+    def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Cuenta los registros sin traerlos a memoria (COUNT en el motor).
+        :param filters: Igualdades opcionales campo -> valor.
+        """
+        pass
+
     @abstractmethod
     def update(self, id: Any, data: Dict[str, Any]) -> bool:
         """
@@ -55,7 +84,25 @@ class StudentDAO(GenericDAO):
     Interfaz específica para operaciones de Estudiantes (Dominio SQL).
     """
     # Aquí podríamos agregar métodos como get_by_email(email)
-    pass
+
+    @abstractmethod
+    def bulk_create(self, rows: List[Dict[str, Any]], batch_size: int = 1000,
+                    on_conflict: str = "skip") -> Dict[str, Dict[str, Any]]:
+        """
+        Inserta muchas filas en lotes (un INSERT multi-fila y un commit por lote).
+        :param on_conflict: 'skip' ignora emails existentes, 'update' los actualiza.
+        :return: {email: {"id", "status": created|updated|error}}; los emails
+                 omitidos por conflicto no aparecen en el resultado.
+        """
+        pass
+
+    @abstractmethod
+    def data_version(self) -> Optional[str]:
+        """
+        Marcador barato que cambia cuando cambian los datos (ej. conteo + id máximo).
+        Se usa como huella para reutilizar reportes ya generados.
+        """
+        pass
 
 
 class OpportunityDAO(GenericDAO):
@@ -63,7 +110,25 @@ class OpportunityDAO(GenericDAO):
     Interfaz específica para operaciones de Oportunidades (Dominio NoSQL).
     """
     # Aquí podríamos agregar métodos como search_by_tags(tags)
-    pass
+
+    @abstractmethod
+    def get_many(self, ids: List[Any], strict: bool = False) -> Dict[str, Any]:
+        """
+        Obtiene varias oportunidades en una sola consulta.
+        :param ids: Lista de IDs (los inválidos se ignoran).
+        :param strict: Si es True, los errores de la BD se propagan en lugar de
+                       devolver DTOs de mantenimiento (ej. para sincronizaciones).
+        :return: Diccionario {id: OpportunityDTO} solo con las encontradas.
+        """
+        pass
+
+    @abstractmethod
+    def data_version(self) -> Optional[str]:
+        """
+        Marcador barato que cambia cuando cambian los datos (conteo, id y fecha de
+        modificación máximos). Retorna None si la BD no está disponible.
+        """
+        pass
 
 class UserDAO(GenericDAO):
     @abstractmethod
@@ -83,7 +148,32 @@ class ApplicationDAO(GenericDAO):
     Interfaz para las solicitudes de pasantía (Dominio SQL - Trazabilidad).
     Fuente: Sección 4.2.1
     """
-    pass
+
+    @abstractmethod
+    def sync_opportunity_snapshot(self, opportunity_id: str, title: Optional[str],
+                                  company_name: Optional[str]) -> int:
+        """
+        Actualiza la copia local (título/empresa) de una oportunidad de Mongo en
+        todas sus postulaciones. None en ambos = la oferta ya no existe.
+        :return: Cantidad de postulaciones actualizadas.
+        """
+        pass
+
+    @abstractmethod
+    def bulk_update_status(self, status: str, ids: Optional[List[int]] = None,
+                           filters: Optional[Dict[str, Any]] = None) -> List[int]:
+        """
+        Cambia el estado de muchas postulaciones en una sola sentencia y transacción.
+        :param ids: IDs a actualizar, o bien
+        :param filters: Igualdades (ej. opportunity_id + status actual).
+        :return: IDs efectivamente actualizados.
+        """
+        pass
+
+    @abstractmethod
+    def get_opportunity_ids(self, after: Optional[str] = None, limit: int = 1000) -> List[str]:
+        """IDs de oportunidad distintos referenciados por postulaciones (ordenados, paginados)."""
+        pass
 
 
 class AbstractDAOFactory(ABC):
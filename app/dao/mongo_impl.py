@@ -1,25 +1,85 @@
-from typing import Dict, Any, Optional, List
-from pymongo import MongoClient
+import os
+import time
+from datetime import datetime
+from dataclasses import asdict
+from typing import Dict, Any, Optional, List, Tuple, Iterator, Callable
+import pymongo
+from pymongo import MongoClient, ASCENDING, UpdateOne
 from pymongo.collection import Collection
-from pymongo.errors import PyMongoError, ServerSelectionTimeoutError
+from pymongo.errors import PyMongoError, ServerSelectionTimeoutError, DuplicateKeyError
 from bson.objectid import ObjectId
 from app.dao.interfaces import OpportunityDAO
 from app.dto.models import OpportunityDTO
-import pybreaker
+from app.cache import get_cache
+from app.breaker import CircuitBreaker, CircuitBreakerError, get_breaker_storage
+from app.metrics import instrument_dao, BreakerMetricsListener
 import logging
 
 # --- CONFIGURACIÓN DEL CIRCUIT BREAKER ---
-db_breaker = pybreaker.CircuitBreaker(fail_max=3, reset_timeout=10)
+# Estado compartido entre workers y contenedores (Redis si hay CACHE_REDIS_URL, ver app.breaker):
+# un corte de Mongo lo abren 3 fallos en total, no 3 por worker.
+# ValueError / DuplicateKeyError (duplicados, datos inválidos) son errores del cliente: no abren el circuito.
+# Cada operación corre bajo pymongo.timeout adaptativo: MONGO_TIMEOUT_MULTIPLIER x su p99 observado,
+# entre MONGO_TIMEOUT_MIN_MS y el timeout de socket. Con Mongo caído, los fallos que abren el
+# circuito cuestan ~200ms y después cada request recibe el fallback de inmediato.
+db_breaker = CircuitBreaker(
+    "mongo",
+    fail_max=int(os.getenv("MONGO_BREAKER_FAIL_MAX", "3")),
+    reset_timeout=float(os.getenv("MONGO_BREAKER_RESET_TIMEOUT", "10")),
+    exclude=(ValueError, DuplicateKeyError),
+    listeners=[BreakerMetricsListener("mongo")],
+    storage=get_breaker_storage("mongo"),
+    sync_interval=float(os.getenv("BREAKER_SYNC_INTERVAL", "1")),
+    timeout_scope=pymongo.timeout,
+    min_timeout=int(os.getenv("MONGO_TIMEOUT_MIN_MS", "200")) / 1000,
+    max_timeout=int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "2000")) / 1000,
+    timeout_multiplier=float(os.getenv("MONGO_TIMEOUT_MULTIPLIER", "4")),
+)
 
+# Campo interno con la clave normalizada título + empresa (índice único)
+DEDUPE_KEY_FIELD = "dedupe_key"
+# Marca de última modificación (huella de datos para reportes)
+UPDATED_AT_FIELD = "updated_at"
+# Nunca exponemos los campos internos hacia la API
+PUBLIC_PROJECTION = {DEDUPE_KEY_FIELD: 0, UPDATED_AT_FIELD: 0}
+
+def build_dedupe_key(title: Any, company_name: Any) -> str:
+    """
+    Clave de duplicados: casefold + espacios colapsados de título y empresa.
+    Ej: '  Dev   Python ' / 'ACME' -> 'dev python\x1facme'
+    """
+    def normalize(value: Any) -> str:
+        return " ".join(str(value or "").split()).casefold()
+    # \x1f (Unit Separator) no aparece en texto normal: evita colisiones tipo 'a|b' + 'c'
+    return f"{normalize(title)}\x1f{normalize(company_name)}"
+
+# --- CACHÉ DEL CATÁLOGO (read-through + invalidación en escrituras) ---
+# Una entrada es "fresca" durante OPPORTUNITY_CACHE_TTL; después se sigue guardando hasta
+# OPPORTUNITY_CACHE_STALE_TTL para servirla si Mongo está caído (breaker abierto).
+OPPORTUNITY_CACHE_STALE_TTL = float(os.getenv("OPPORTUNITY_CACHE_STALE_TTL", "86400"))
+opportunity_cache = get_cache(
+    "opportunities",
+    maxsize=int(os.getenv("OPPORTUNITY_CACHE_MAXSIZE", "512")),
+    ttl=OPPORTUNITY_CACHE_STALE_TTL,
+)
+# Con Redis (docker-compose) la invalidación de una escritura llega a todos los workers.
+# Con la caché local solo limpia la del worker que escribió: los demás verían el catálogo
+# viejo hasta que venza la frescura, por eso esta baja a OPPORTUNITY_CACHE_LOCAL_TTL.
+OPPORTUNITY_CACHE_TTL = float(
+    os.getenv("OPPORTUNITY_CACHE_TTL", "60") if opportunity_cache.shared
+    else os.getenv("OPPORTUNITY_CACHE_LOCAL_TTL", "5")
+)
+
+# Callback de cambios: (opportunity_id, título, empresa); None/None = eliminada
+OpportunityChangeListener = Callable[[str, Optional[str], Optional[str]], None]
+
+@instrument_dao("mongo")
 class MongoOpportunityDAO(OpportunityDAO):
-    def __init__(self, connection_uri: str):
-        # Fail Fast: 2 segundos máximo
-        self.client = MongoClient(
-            connection_uri, 
-            serverSelectionTimeoutMS=2000,
-            connectTimeoutMS=2000,
-            socketTimeoutMS=2000
-        )
+    def __init__(self, client: MongoClient, on_change: Optional[OpportunityChangeListener] = None):
+        # Cliente compartido del worker (pool + Fail Fast de 2s configurados en app.db)
+        self.client = client
+        # La fábrica lo usa para mantener la vista materializada de postulaciones (SQL)
+        self.on_change = on_change
         self.db = self.client['ucedb']
         self.collection: Collection = self.db['opportunities']
 
@@ -31,56 +91,205 @@ class MongoOpportunityDAO(OpportunityDAO):
 
     @db_breaker
     def _protected_create(self, data: Dict[str, Any]) -> str:
-        # VALIDACIÓN DE DUPLICADOS
-        existing = self.collection.find_one({
-            "title": {"$regex": f"^{data.get('title')}$", "$options": "i"},
-            "company_name": {"$regex": f"^{data.get('company_name')}$", "$options": "i"}
-        })
-        if existing:
+        # VALIDACIÓN DE DUPLICADOS: el índice único sobre la clave normalizada
+        # resuelve la validación y la inserción en una sola operación atómica.
+        doc = dict(data)
+        doc[DEDUPE_KEY_FIELD] = build_dedupe_key(data.get('title'), data.get('company_name'))
+        doc[UPDATED_AT_FIELD] = datetime.utcnow()
+        try:
+            result = self.collection.insert_one(doc)
+        except DuplicateKeyError:
             raise ValueError(f"Ya existe la oferta '{data.get('title')}' para '{data.get('company_name')}'.")
-
-        result = self.collection.insert_one(data)
+        opportunity_cache.clear()
         return str(result.inserted_id)
 
     # ---------------------------------------------------------
     # GET ALL (Lista de Ofertas)
     # ---------------------------------------------------------
     def get_all(self) -> List[Dict[str, Any]]:
+        cached, fresh = self._cache_read("all")
+        if fresh:
+            return cached
         try:
-            return self._protected_get_all()
+            results = self._protected_get_all()
+            self._cache_write("all", results)
+            return results
         
-        except pybreaker.CircuitBreakerError:
+        except CircuitBreakerError:
             logging.warning("⚠️ Circuit Breaker ABIERTO.")
-            return self._get_maintenance_card()
+            return cached if cached is not None else self._get_maintenance_card()
             
         except Exception as e:
             # Capturamos el Timeout de 2s aquí
             logging.error(f"Error Mongo get_all: {e}")
-            return self._get_maintenance_card() 
+            return cached if cached is not None else self._get_maintenance_card() 
 
     @db_breaker
     def _protected_get_all(self) -> List[Dict[str, Any]]:
         # ¡SIN TRY/EXCEPT! Si falla, explota para activar el Breaker
-        cursor = self.collection.find({})
+        cursor = self.collection.find({}, PUBLIC_PROJECTION)
         results = []
         for doc in cursor:
             doc['id'] = str(doc.pop('_id'))
             results.append(doc)
         return results
 
+    # ---------------------------------------------------------
+    # STREAM (Cursor por lotes para reportes / exportación)
+    # ---------------------------------------------------------
+    def stream(self, fields: Optional[List[str]] = None, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        # Proyección: solo traemos de Mongo los campos que se van a usar
+        projection = {f: 1 for f in fields} if fields else PUBLIC_PROJECTION
+        yielded = False
+        last_id = None
+        try:
+            # Keyset por _id, un lote por consulta: el breaker protege cada lote y nunca queda
+            # tomado mientras el consumidor procesa (una sonda no debe durar lo que dura un reporte)
+            while True:
+                batch = self._protected_stream_batch(projection, last_id, batch_size)
+                for doc in batch:
+                    last_id = doc.pop('_id')
+                    doc['id'] = str(last_id)
+                    yielded = True
+                    yield doc
+                if len(batch) < batch_size:
+                    break
+
+        except CircuitBreakerError:
+            logging.warning("⚠️ Circuit Breaker ABIERTO.")
+            if not yielded:
+                yield from self._get_maintenance_card()
+
+        except Exception as e:
+            logging.error(f"Error Mongo stream: {e}")
+            if not yielded:
+                yield from self._get_maintenance_card()
+
+    @db_breaker
+    def _protected_stream_batch(self, projection: Dict[str, Any], after_id: Optional[ObjectId],
+                                batch_size: int) -> List[Dict[str, Any]]:
+        query = {"_id": {"$gt": after_id}} if after_id is not None else {}
+        return list(self.collection.find(query, projection).sort("_id", 1).limit(batch_size))
+
+    # ---------------------------------------------------------
+    # GET PAGE (Paginación por cursor sobre _id)
+    # ---------------------------------------------------------
+    def get_page(self, limit: int = 50, after: Optional[str] = None,
+                 filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        # El cursor inválido se valida antes del breaker: es error del cliente, no de la BD
+        after_oid = None
+        if after:
+            try:
+                after_oid = ObjectId(after)
+            except Exception:
+                raise ValueError("Cursor de paginación inválido.")
+
+        cache_key = f"page:{limit}:{after or ''}:{sorted((filters or {}).items())}"
+        cached, fresh = self._cache_read(cache_key)
+        if fresh:
+            return cached
+        try:
+            page = self._protected_get_page(limit, after_oid, filters)
+            self._cache_write(cache_key, page)
+            return page
+
+        except CircuitBreakerError:
+            logging.warning("⚠️ Circuit Breaker ABIERTO.")
+            if cached is not None:
+                return cached # Datos viejos antes que la tarjeta de mantenimiento
+            return {"items": self._get_maintenance_card(), "next_cursor": None}
+
+        except Exception as e:
+            logging.error(f"Error Mongo get_page: {e}")
+            if cached is not None:
+                return cached
+            return {"items": self._get_maintenance_card(), "next_cursor": None}
+
+    @db_breaker
+    def _protected_get_page(self, limit: int, after_oid: Optional[ObjectId],
+                            filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        query = dict(filters or {})
+        if after_oid:
+            query["_id"] = {"$gt": after_oid}
+
+        # limit + 1 para saber si hay otra página sin hacer un COUNT
+        cursor = self.collection.find(query, PUBLIC_PROJECTION).sort("_id", 1).limit(limit + 1)
+        items = []
+        for doc in cursor:
+            doc['id'] = str(doc.pop('_id'))
+            items.append(doc)
+
+        next_cursor = items[limit - 1]['id'] if len(items) > limit else None
+        return {"items": items[:limit], "next_cursor": next_cursor}
+
+    # ---------------------------------------------------------
+    # COUNT (Métricas del Dashboard)
+    # ---------------------------------------------------------
+    def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        try:
+            return self._protected_count(filters)
+
+        except CircuitBreakerError:
+            logging.warning("⚠️ Circuit Breaker ABIERTO.")
+            return 0
+
+        except Exception as e:
+            logging.error(f"Error Mongo count: {e}")
+            return 0
+
+    @db_breaker
+    def _protected_count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        if filters:
+            return self.collection.count_documents(filters)
+        # Sin filtros usamos la metadata de la colección (O(1))
+        return self.collection.estimated_document_count()
+
+    # ---------------------------------------------------------
+    # DATA VERSION (Huella para caché de reportes)
+    # ---------------------------------------------------------
+    def data_version(self) -> Optional[str]:
+        try:
+            return self._protected_data_version()
+        except CircuitBreakerError:
+            return None
+        except Exception as e:
+            logging.error(f"Error Mongo data_version: {e}")
+            return None
+
+    @db_breaker
+    def _protected_data_version(self) -> str:
+        # Cubre altas (id máximo), bajas (conteo) y ediciones (updated_at máximo)
+        total = self.collection.count_documents({})
+        last_id = self.collection.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+        last_update = self.collection.find_one(
+            {UPDATED_AT_FIELD: {"$exists": True}}, {UPDATED_AT_FIELD: 1}, sort=[(UPDATED_AT_FIELD, -1)]
+        )
+        return ":".join([
+            str(total),
+            str(last_id["_id"]) if last_id else "0",
+            last_update[UPDATED_AT_FIELD].isoformat() if last_update else "0",
+        ])
+
     # ---------------------------------------------------------
     # GET (Una Oferta)
     # ---------------------------------------------------------
     def get(self, id: Any) -> Optional[OpportunityDTO]:
+        cache_key = f"doc:{id}"
+        cached, fresh = self._cache_read(cache_key)
+        if fresh:
+            return OpportunityDTO(**cached)
         try:
-            return self._protected_get(id)
+            dto = self._protected_get(id)
+            if dto:
+                self._cache_write(cache_key, asdict(dto))
+            return dto
             
-        except pybreaker.CircuitBreakerError:
-            return self._get_maintenance_dto(id)
+        except CircuitBreakerError:
+            return OpportunityDTO(**cached) if cached is not None else self._get_maintenance_dto(id)
             
         except Exception as e:
             logging.error(f"Error Mongo get individual: {e}")
-            return self._get_maintenance_dto(id)
+            return OpportunityDTO(**cached) if cached is not None else self._get_maintenance_dto(id)
 
     @db_breaker
     def _protected_get(self, id: Any) -> Optional[OpportunityDTO]:
@@ -95,23 +304,88 @@ class MongoOpportunityDAO(OpportunityDAO):
             return None
         return self._map_to_dto(doc)
 
+    # ---------------------------------------------------------
+    # GET MANY (Lote de Ofertas, evita N+1)
+    # ---------------------------------------------------------
+    def get_many(self, ids: List[Any], strict: bool = False) -> Dict[str, OpportunityDTO]:
+        if strict:
+            return self._protected_get_many(ids)
+        try:
+            return self._protected_get_many(ids)
+
+        except CircuitBreakerError:
+            return {str(id): self._get_maintenance_dto(id) for id in ids if id}
+
+        except Exception as e:
+            logging.error(f"Error Mongo get_many: {e}")
+            return {str(id): self._get_maintenance_dto(id) for id in ids if id}
+
+    @db_breaker
+    def _protected_get_many(self, ids: List[Any]) -> Dict[str, OpportunityDTO]:
+        oids = set()
+        for id in ids:
+            try:
+                oids.add(ObjectId(id))
+            except Exception:
+                continue # ID inválido: se queda sin enriquecer
+
+        if not oids:
+            return {}
+
+        # Una sola consulta $in, proyectando solo los campos que se muestran
+        cursor = self.collection.find(
+            {"_id": {"$in": list(oids)}},
+            {"title": 1, "company_name": 1}
+        )
+        return {str(doc['_id']): self._map_to_dto(doc) for doc in cursor}
+
     # ---------------------------------------------------------
     # UPDATE (IMPLEMENTADO ✅)
     # ---------------------------------------------------------
     def update(self, id: Any, data: Dict[str, Any]) -> bool:
         """
         Actualiza una oferta existente.
-        No usamos decorador aquí para manejar el error manualmente en la API.
+        Si cambia el título o la empresa, recalcula la clave de duplicados.
+        Lanza ValueError si el cambio choca con otra oferta existente.
+        Con el circuito abierto retorna False de inmediato.
         """
         try:
             oid = ObjectId(id)
-            # $set asegura que solo se actualicen los campos enviados
-            result = self.collection.update_one({"_id": oid}, {"$set": data})
-            # matched_count > 0 significa que encontró el ID, aunque no haya cambios
-            return result.matched_count > 0
+        except Exception:
+            return False
+        try:
+            matched, renamed = self._protected_update(oid, data)
+        except DuplicateKeyError:
+            raise ValueError("Ya existe otra oferta con ese título para esa empresa.")
+        except CircuitBreakerError:
+            logging.warning("⚠️ Circuit Breaker ABIERTO.")
+            return False
         except Exception as e:
             logging.error(f"Error update Mongo: {e}")
             return False
+        opportunity_cache.clear()
+        if renamed and matched:
+            self._notify_change(id, *renamed)
+        return matched
+
+    @db_breaker
+    def _protected_update(self, oid: ObjectId, data: Dict[str, Any]) -> Tuple[bool, Optional[Tuple[Any, Any]]]:
+        changes = {k: v for k, v in data.items() if k not in ('_id', DEDUPE_KEY_FIELD, UPDATED_AT_FIELD)}
+        changes[UPDATED_AT_FIELD] = datetime.utcnow()
+        renamed = None
+        if 'title' in changes or 'company_name' in changes:
+            current = self.collection.find_one({"_id": oid}, {"title": 1, "company_name": 1})
+            if not current:
+                return False, None
+            renamed = (
+                changes.get('title', current.get('title')),
+                changes.get('company_name', current.get('company_name'))
+            )
+            changes[DEDUPE_KEY_FIELD] = build_dedupe_key(*renamed)
+        # $set asegura que solo se actualicen los campos enviados
+        result = self.collection.update_one({"_id": oid}, {"$set": changes})
+        # matched_count > 0 significa que encontró el ID, aunque no haya cambios
+        return result.matched_count > 0, renamed
 
     # ---------------------------------------------------------
     # DELETE (IMPLEMENTADO ✅)
@@ -119,18 +393,93 @@ class MongoOpportunityDAO(OpportunityDAO):
     def delete(self, id: Any) -> bool:
         """
         Elimina una oferta por ID.
+        Con el circuito abierto retorna False de inmediato.
         """
         try:
             oid = ObjectId(id)
-            result = self.collection.delete_one({"_id": oid})
-            return result.deleted_count > 0
+        except Exception:
+            return False
+        try:
+            deleted = self._protected_delete(oid)
+        except CircuitBreakerError:
+            logging.warning("⚠️ Circuit Breaker ABIERTO.")
+            return False
         except Exception as e:
             logging.error(f"Error delete Mongo: {e}")
             return False
+        opportunity_cache.clear()
+        if deleted:
+            self._notify_change(id, None, None)
+        return deleted
+
+    @db_breaker
+    def _protected_delete(self, oid: ObjectId) -> bool:
+        return self.collection.delete_one({"_id": oid}).deleted_count > 0
+
+    # ---------------------------------------------------------
+    # ÍNDICES (idempotente, invocado desde init_db)
+    # ---------------------------------------------------------
+    def ensure_indexes(self) -> None:
+        # La clave debe existir en todos los documentos antes de crear el índice único
+        self.backfill_dedupe_keys()
+        # Reemplazado por la clave normalizada
+        if "uq_opportunities_title_company" in self.collection.index_information():
+            self.collection.drop_index("uq_opportunities_title_company")
+        # create_index no hace nada si el índice ya existe con la misma definición
+        self.collection.create_index(
+            [(DEDUPE_KEY_FIELD, ASCENDING)],
+            name="uq_opportunities_dedupe_key",
+            unique=True
+        )
+        # Soporta el max(updated_at) de data_version sin recorrer la colección
+        self.collection.create_index([(UPDATED_AT_FIELD, ASCENDING)], name="ix_opportunities_updated_at")
+
+    def backfill_dedupe_keys(self, batch_size: int = 1000) -> int:
+        """
+        Migración única: calcula la clave en documentos antiguos que no la tienen.
+        Es idempotente (solo toca documentos sin clave). Retorna cuántos actualizó.
+        """
+        updated = 0
+        batch = []
+        cursor = self.collection.find(
+            {DEDUPE_KEY_FIELD: {"$exists": False}}, {"title": 1, "company_name": 1}
+        )
+        for doc in cursor:
+            key = build_dedupe_key(doc.get('title'), doc.get('company_name'))
+            batch.append(UpdateOne({"_id": doc['_id']}, {"$set": {DEDUPE_KEY_FIELD: key}}))
+            if len(batch) >= batch_size:
+                updated += self.collection.bulk_write(batch, ordered=False).modified_count
+                batch = []
+        if batch:
+            updated += self.collection.bulk_write(batch, ordered=False).modified_count
+        return updated
+
+    def explain_duplicate_check(self) -> Dict[str, Any]:
+        """Plan de ejecución de la búsqueda por clave de duplicados."""
+        return self.collection.find({DEDUPE_KEY_FIELD: ""}).limit(1).explain()
 
     # ---------------------------------------------------------
     # HELPERS
     # ---------------------------------------------------------
+    def _notify_change(self, id: Any, title: Optional[str], company_name: Optional[str]) -> None:
+        # Un fallo aquí no revierte el cambio en Mongo: la reconciliación corrige el desvío
+        if not self.on_change:
+            return
+        try:
+            self.on_change(str(id), title, company_name)
+        except Exception as e:
+            logging.error(f"Error sincronizando vista de postulaciones ({id}): {e}")
+
+    def _cache_read(self, key: str) -> Tuple[Optional[Any], bool]:
+        """Retorna (valor o None, es_fresco). Un valor no fresco solo sirve como respaldo."""
+        entry = opportunity_cache.get(key)
+        if entry is None:
+            return None, False
+        return entry["value"], (time.time() - entry["stored_at"]) < OPPORTUNITY_CACHE_TTL
+
+    def _cache_write(self, key: str, value: Any) -> None:
+        opportunity_cache.set(key, {"value": value, "stored_at": time.time()})
+
     def _map_to_dto(self, doc: Dict[str, Any]) -> OpportunityDTO:
         return OpportunityDTO(
             id=str(doc['_id']),
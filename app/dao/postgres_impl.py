@@ -1,12 +1,49 @@
-from typing import Dict, Any, Optional, List
+import base64
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Tuple, Iterator
+import logging
+from sqlalchemy import func, tuple_, or_, literal_column, update, bindparam, any_, Integer
+from sqlalchemy.dialects.postgresql import insert as pg_insert, ARRAY
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from werkzeug.security import check_password_hash
 
 # Imports de Interfaces y Modelos
-from app.dao.interfaces import StudentDAO, UserDAO, GenericDAO
+from app.dao.interfaces import StudentDAO, UserDAO, ApplicationDAO
 from app.models.sql import StudentModel, ApplicationModel, UserModel
 from app.dto.models import StudentDTO, UserDTO
+from app.cache import user_cache
+from app.metrics import instrument_dao
+from app.security import verify_password, needs_rehash, hash_password
 
+def _encode_cursor(created_at: datetime, id: int) -> str:
+    """Cursor opaco para el keyset (created_at, id)."""
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(id)
+    except Exception:
+        raise ValueError("Cursor de paginación inválido.")
+
+def _stream_columns(session: Session, model, fields: List[str], batch_size: int) -> Iterator[Dict[str, Any]]:
+    """SELECT solo de las columnas pedidas con cursor del servidor (yield_per), ordenado por PK."""
+    columns = [getattr(model, field_name) for field_name in fields]
+    query = session.query(*columns).order_by(model.id).yield_per(batch_size)
+    for row in query:
+        yield dict(row._mapping)
+
+def _apply_filters(query, model, filters: Optional[Dict[str, Any]]):
+    """Aplica igualdades campo -> valor explícitamente sobre 'model' (seguro con JOINs)."""
+    for field_name, value in (filters or {}).items():
+        column = getattr(model, field_name, None)
+        if column is None:
+            raise ValueError(f"Filtro no soportado: {field_name}")
+        query = query.filter(column == value)
+    return query
+
+@instrument_dao("postgres")
 class PostgresStudentDAO(StudentDAO):
     """
     Implementación para Estudiantes (Datos Académicos para reportes).
@@ -20,6 +57,40 @@ class PostgresStudentDAO(StudentDAO):
         self.session.commit()
         return self._map_to_dto(student)
 
+    def bulk_create(self, rows: List[Dict[str, Any]], batch_size: int = 1000,
+                    on_conflict: str = "skip") -> Dict[str, Dict[str, Any]]:
+        results = {}
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            # INSERT ... VALUES (...), (...) ON CONFLICT (email): un round trip por lote
+            stmt = pg_insert(StudentModel).values(batch)
+            if on_conflict == "update":
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[StudentModel.email],
+                    set_={
+                        "name": stmt.excluded.name,
+                        "gpa": stmt.excluded.gpa,
+                        "department": stmt.excluded.department,
+                        "updated_at": datetime.utcnow(),
+                    }
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=[StudentModel.email])
+            # xmax = 0 solo en filas recién insertadas (distingue alta de actualización)
+            stmt = stmt.returning(
+                StudentModel.id, StudentModel.email, literal_column("xmax = 0").label("inserted")
+            )
+            try:
+                for row in self.session.execute(stmt):
+                    results[row.email] = {"id": row.id, "status": "created" if row.inserted else "updated"}
+                self.session.commit()
+            except Exception as e:
+                self.session.rollback()
+                logging.error(f"Error en lote de estudiantes ({start}-{start + len(batch)}): {e}")
+                for data in batch:
+                    results[data["email"]] = {"id": None, "status": "error", "error": "Error al insertar el lote"}
+        return results
+
     def get(self, id: Any) -> Optional[StudentDTO]:
         student = self.session.query(StudentModel).filter_by(id=int(id)).first()
         if not student:
@@ -40,6 +111,41 @@ class PostgresStudentDAO(StudentDAO):
             for s in students
         ]
 
+    def stream(self, fields: Optional[List[str]] = None, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        fields = fields or ["id", "name", "email", "gpa", "department"]
+        return _stream_columns(self.session, StudentModel, fields, batch_size)
+
+    def get_page(self, limit: int = 50, after: Optional[str] = None,
+                 filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        # Keyset sobre la PK: WHERE id > :after ORDER BY id LIMIT :limit + 1
+        query = self.session.query(
+            StudentModel.id, StudentModel.name, StudentModel.email,
+            StudentModel.gpa, StudentModel.department
+        )
+        query = _apply_filters(query, StudentModel, filters)
+        if after:
+            try:
+                query = query.filter(StudentModel.id > int(after))
+            except ValueError:
+                raise ValueError("Cursor de paginación inválido.")
+        rows = query.order_by(StudentModel.id).limit(limit + 1).all()
+
+        items = [dict(row._mapping) for row in rows[:limit]]
+        next_cursor = str(items[-1]["id"]) if len(rows) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
+
+    def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        query = self.session.query(func.count(StudentModel.id))
+        query = _apply_filters(query, StudentModel, filters)
+        return query.scalar() or 0
+
+    def data_version(self) -> Optional[str]:
+        # Altas (conteo + id máximo) y ediciones de la carga masiva (updated_at máximo)
+        total, max_id, last_update = self.session.query(
+            func.count(StudentModel.id), func.max(StudentModel.id), func.max(StudentModel.updated_at)
+        ).one()
+        return f"{total}:{max_id or 0}:{last_update.isoformat() if last_update else 0}"
+
     def update(self, id: Any, data: Dict[str, Any]) -> bool:
         return False
 
@@ -55,6 +161,7 @@ class PostgresStudentDAO(StudentDAO):
             department=student.department
         )
 
+@instrument_dao("postgres")
 class PostgresUserDAO(UserDAO):
     """
     Implementación para Usuarios (Login y Auth).
@@ -72,14 +179,23 @@ class PostgresUserDAO(UserDAO):
         user = self.session.query(UserModel).filter_by(email=email).first()
         if not user:
             return None
-        if check_password_hash(user.password_hash, password_plaintext):
-            return self._map_to_dto(user)
-        return None
+        if not verify_password(user.password_hash, password_plaintext):
+            return None
+        if needs_rehash(user.password_hash):
+            # Parámetros de hashing cambiaron: actualizamos el hash de forma transparente
+            try:
+                user.password_hash = hash_password(password_plaintext)
+                self.session.commit()
+            except Exception as e:
+                self.session.rollback()
+                logging.error(f"No se pudo re-hashear la contraseña del usuario {user.id}: {e}")
+        return self._map_to_dto(user)
 
     def create(self, data: Dict[str, Any]) -> UserDTO:
         user = UserModel(**data)
         self.session.add(user)
         self.session.commit()
+        user_cache.delete(user.id)
         return self._map_to_dto(user)
 
     def get(self, id: Any) -> Optional[UserDTO]:
@@ -90,8 +206,34 @@ class PostgresUserDAO(UserDAO):
 
     # Helpers de GenericDAO
     def get_all(self) -> List[Dict[str, Any]]: return []
-    def update(self, id, data): pass
-    def delete(self, id): pass
+    def stream(self, fields=None, batch_size=1000): return iter([])
+    def get_page(self, limit=50, after=None, filters=None): return {"items": [], "next_cursor": None}
+
+    def update(self, id: Any, data: Dict[str, Any]) -> bool:
+        try:
+            rows_updated = self.session.query(UserModel).filter_by(id=int(id)).update(data)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            return False
+        # Invalidación explícita: el loader de Flask-Login no debe servir datos viejos
+        user_cache.delete(id)
+        return rows_updated > 0
+
+    def delete(self, id: Any) -> bool:
+        try:
+            rows_deleted = self.session.query(UserModel).filter_by(id=int(id)).delete()
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            return False
+        user_cache.delete(id)
+        return rows_deleted > 0
+
+    def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        query = self.session.query(func.count(UserModel.id))
+        query = _apply_filters(query, UserModel, filters)
+        return query.scalar() or 0
 
     def _map_to_dto(self, user: UserModel) -> UserDTO:
         return UserDTO(
@@ -101,7 +243,8 @@ class PostgresUserDAO(UserDAO):
             role=user.role
         )
 
-class PostgresApplicationDAO(GenericDAO):
+@instrument_dao("postgres")
+class PostgresApplicationDAO(ApplicationDAO):
     """
     Implementación para Postulaciones (Trazabilidad).
     """
@@ -123,7 +266,12 @@ class PostgresApplicationDAO(GenericDAO):
         # 2. Si no existe, procedemos a crearla
         app = ApplicationModel(**data)
         self.session.add(app)
-        self.session.commit()
+        try:
+            self.session.commit()
+        except IntegrityError:
+            # Carrera entre réplicas: el índice único (user_id, opportunity_id) lo impide
+            self.session.rollback()
+            raise ValueError("Ya has enviado una postulación a esta oportunidad.")
         return app.id
 
     # --- IMPLEMENTACIÓN OBLIGATORIA DE LA INTERFAZ ---
@@ -133,27 +281,82 @@ class PostgresApplicationDAO(GenericDAO):
 
     def get_all(self) -> List[Dict[str, Any]]:
         # --- CORREGIDO: Aquí es donde va la lógica de APLICACIONES ---
-        # 1. Consultamos la base de datos real
-        apps = self.session.query(ApplicationModel).order_by(ApplicationModel.created_at.desc()).all()
-        
-        result = []
-        for app in apps:
-            # 2. Obtenemos datos del usuario gracias a la relación
-            if app.user:
-                user_info = f"{app.user.name} ({app.user.email})"
-            else:
-                user_info = "Usuario Desconocido"
+        rows = self._joined_query().order_by(ApplicationModel.created_at.desc()).all()
+        return [self._row_to_dict(row) for row in rows]
 
-            # 3. Construimos el diccionario para el Frontend
-            result.append({
-                "id": app.id,
-                "student": user_info,
-                "opportunity_id": app.opportunity_id,
-                "status": app.status,
-                "created_at": app.created_at.strftime("%Y-%m-%d %H:%M") 
-            })
-            
-        return result
+    def get_page(self, limit: int = 50, after: Optional[str] = None,
+                 filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        # Keyset sobre (created_at, id) descendente: estable aunque se inserten filas nuevas
+        query = self._joined_query()
+        query = _apply_filters(query, ApplicationModel, filters)
+        if after:
+            created_at, id = _decode_cursor(after)
+            query = query.filter(
+                tuple_(ApplicationModel.created_at, ApplicationModel.id) < (created_at, id)
+            )
+        rows = (
+            query.order_by(ApplicationModel.created_at.desc(), ApplicationModel.id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = _encode_cursor(last.created_at, last.id)
+        return {"items": [self._row_to_dict(row) for row in rows[:limit]], "next_cursor": next_cursor}
+
+    def stream(self, fields: Optional[List[str]] = None, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        # Mismo JOIN proyectado que get_all, pero con cursor del servidor.
+        # 'fields' filtra las claves del diccionario ya armado para el Frontend.
+        query = self._joined_query().order_by(ApplicationModel.id).yield_per(batch_size)
+        for row in query:
+            item = self._row_to_dict(row)
+            yield {k: item[k] for k in fields} if fields else item
+
+    def _joined_query(self):
+        """
+        Una sola consulta con JOIN, proyectando solo las columnas necesarias.
+        Evita el N+1 de la relación perezosa 'app.user' y no materializa entidades ORM.
+        """
+        return (
+            self.session.query(
+                ApplicationModel.id,
+                ApplicationModel.opportunity_id,
+                ApplicationModel.opportunity_title,
+                ApplicationModel.opportunity_company,
+                ApplicationModel.status,
+                ApplicationModel.created_at,
+                UserModel.name.label("user_name"),
+                UserModel.email.label("user_email"),
+            )
+            .select_from(ApplicationModel)
+            .outerjoin(UserModel, UserModel.id == ApplicationModel.user_id)
+        )
+
+    def _row_to_dict(self, row) -> Dict[str, Any]:
+        # Datos del usuario ya vienen en la misma fila
+        if row.user_name is not None:
+            user_info = f"{row.user_name} ({row.user_email})"
+        else:
+            user_info = "Usuario Desconocido"
+
+        # Construimos el diccionario para el Frontend
+        return {
+            "id": row.id,
+            "student": user_info,
+            "opportunity_id": row.opportunity_id,
+            "opportunity_title": row.opportunity_title,
+            "company_name": row.opportunity_company,
+            "status": row.status,
+            "created_at": row.created_at.strftime("%Y-%m-%d %H:%M") 
+        }
+
+    def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        # SELECT count(*) directo, sin cargar filas ni la relación 'user'
+        query = self.session.query(func.count(ApplicationModel.id))
+        query = _apply_filters(query, ApplicationModel, filters)
+        return query.scalar() or 0
 
     def update(self, id: Any, data: Dict[str, Any]) -> bool:
         # data espera: {"status": "aprobada"}
@@ -169,6 +372,59 @@ class PostgresApplicationDAO(GenericDAO):
     def delete(self, id: Any) -> bool:
         return False
 
+    def bulk_update_status(self, status: str, ids: Optional[List[int]] = None,
+                           filters: Optional[Dict[str, Any]] = None) -> List[int]:
+        stmt = update(ApplicationModel).values(status=status)
+        if ids is not None:
+            # WHERE id = ANY(:ids): un solo parámetro de tipo arreglo, sin importar cuántos IDs
+            stmt = stmt.where(ApplicationModel.id == any_(bindparam("ids", [int(i) for i in ids], type_=ARRAY(Integer))))
+        for field_name, value in (filters or {}).items():
+            column = getattr(ApplicationModel, field_name, None)
+            if column is None:
+                raise ValueError(f"Filtro no soportado: {field_name}")
+            stmt = stmt.where(column == value)
+        stmt = stmt.returning(ApplicationModel.id).execution_options(synchronize_session=False)
+        try:
+            updated = [row.id for row in self.session.execute(stmt)]
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return updated
+
+    # --- VISTA MATERIALIZADA (título/empresa de Mongo) ---
+
+    def sync_opportunity_snapshot(self, opportunity_id: str, title: Optional[str],
+                                  company_name: Optional[str]) -> int:
+        # Un UPDATE por oferta, apoyado en el índice ix_applications_opportunity_id.
+        # Solo toca filas cuya copia difiere: el conteo devuelto es el desvío corregido.
+        # El UPDATE va dentro del try: si falla, la sesión compartida no queda en una
+        # transacción abortada para las ofertas siguientes
+        try:
+            rows_updated = self.session.query(ApplicationModel).filter(
+                ApplicationModel.opportunity_id == str(opportunity_id),
+                or_(
+                    ApplicationModel.opportunity_title.is_distinct_from(title),
+                    ApplicationModel.opportunity_company.is_distinct_from(company_name),
+                )
+            ).update({
+                "opportunity_title": title,
+                "opportunity_company": company_name,
+                "opportunity_synced_at": datetime.utcnow(),
+            }, synchronize_session=False)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return rows_updated
+
+    def get_opportunity_ids(self, after: Optional[str] = None, limit: int = 1000) -> List[str]:
+        query = self.session.query(ApplicationModel.opportunity_id).distinct()
+        if after:
+            query = query.filter(ApplicationModel.opportunity_id > after)
+        rows = query.order_by(ApplicationModel.opportunity_id).limit(limit).all()
+        return [row.opportunity_id for row in rows]
+
     # Agrega esto dentro de PostgresApplicationDAO
     def get_by_user_id(self, user_id: int) -> List[Dict[str, Any]]:
         # Filtramos por el ID del usuario actual
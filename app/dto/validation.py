@@ -0,0 +1,61 @@
+import io
+import csv
+from typing import Any, Dict, List, Optional, Tuple
+
+# --- VALIDACIÓN DE CARGAS MASIVAS ---
+# Fuente de filas: arreglo JSON o CSV con encabezados name,email,gpa,department.
+
+STUDENT_FIELDS = ("name", "email", "gpa", "department")
+
+def parse_csv_rows(text: str) -> List[Dict[str, Any]]:
+    """Lee un CSV con encabezados (acepta BOM de Excel) como lista de diccionarios."""
+    return list(csv.DictReader(io.StringIO(text.lstrip("\ufeff"))))
+
+def validate_student_row(raw: Any) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Valida y normaliza una fila de estudiante.
+    :return: (datos listos para StudentModel, None) o (None, mensaje de error).
+    """
+    if not isinstance(raw, dict):
+        return None, "La fila debe ser un objeto"
+
+    name = str(raw.get("name") or "").strip()
+    email = str(raw.get("email") or "").strip()
+    department = str(raw.get("department") or "").strip()
+    if not name or not email or not department:
+        return None, "name, email y department son obligatorios"
+    if "@" not in email:
+        return None, "email inválido"
+    if len(name) > 100 or len(email) > 100 or len(department) > 50:
+        return None, "Campo demasiado largo"
+
+    try:
+        gpa = float(raw.get("gpa"))
+    except (TypeError, ValueError):
+        return None, "gpa debe ser numérico"
+    if not 0 <= gpa <= 10:
+        return None, "gpa fuera de rango (0-10)"
+
+    return {"name": name, "email": email, "gpa": gpa, "department": department}, None
+
+def validate_student_rows(raw_rows: List[Any]) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[Dict[str, Any]]]:
+    """
+    Valida todas las filas. Los emails repetidos dentro de la misma carga se rechazan
+    (solo la primera aparición se inserta).
+    :return: (filas válidas como (índice, datos), reporte por fila con las rechazadas ya resueltas)
+    """
+    valid = []
+    report: List[Dict[str, Any]] = [None] * len(raw_rows)
+    seen_emails = set()
+    for index, raw in enumerate(raw_rows):
+        data, error = validate_student_row(raw)
+        if error:
+            email = raw.get("email") if isinstance(raw, dict) else None
+            report[index] = {"row": index + 1, "email": email, "status": "invalid", "error": error}
+        elif data["email"] in seen_emails:
+            report[index] = {"row": index + 1, "email": data["email"], "status": "duplicate",
+                             "error": "Email repetido en la misma carga"}
+        else:
+            seen_emails.add(data["email"])
+            valid.append((index, data))
+    return valid, report
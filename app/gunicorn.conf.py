@@ -0,0 +1,130 @@
+"""
+Configuración de gunicorn para producción (todo ajustable por variables de entorno).
+Uso: gunicorn -c app/gunicorn.conf.py
+
+- SERVING_MODE=sync (por defecto) sirve app.main:create_app(); SERVING_MODE=async sirve app.asgi:asgi_app.
+- El arranque único (esquema, índices, admin inicial) es un comando aparte:
+  flask --app app.main:create_app bootstrap. Con BOOTSTRAP_ON_START=true lo corre el maestro (on_starting).
+- Cada worker reinicia los pools de PostgreSQL/Mongo después del fork (post_fork).
+"""
+import os
+import shutil
+import multiprocessing
+
+def _cpu_count() -> int:
+    # Respeta el cpuset del contenedor (sched_getaffinity) cuando está disponible
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return multiprocessing.cpu_count()
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+SERVING_MODE = os.getenv("SERVING_MODE", "sync")
+
+# --- MÉTRICAS MULTIPROCESO ---
+# Debe definirse antes de importar la app (prometheus_client lo lee al importarse).
+# Aquí solo se crea: este archivo se vuelve a leer en --check-config y en cada recarga (HUP)
+# del maestro, y vaciarlo borraría los archivos de los workers vivos. Se vacía en on_starting.
+METRICS_DIR = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/uce_metrics")
+os.makedirs(METRICS_DIR, exist_ok=True)
+
+def _reset_metrics_dir() -> None:
+    """Descarta los archivos de métricas de una ejecución anterior (solo al arrancar el maestro)."""
+    for name in os.listdir(METRICS_DIR):
+        path = os.path.join(METRICS_DIR, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+# --- APLICACIÓN Y WORKERS ---
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+if SERVING_MODE == "async":
+    wsgi_app = "app.asgi:asgi_app"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "app.main:create_app()"
+    # gthread: hilos por worker (I/O de BD); gevent: green threads; sync: un request por worker
+    worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+
+# Cachés, trabajos de reportes, límites de login y circuit breaker se comparten vía Redis.
+# Sin CACHE_REDIS_URL ese estado es por proceso: un solo worker (escala con hilos) para no
+# servir datos inconsistentes según qué worker atienda. docker-compose define Redis.
+SHARED_STATE = bool(os.getenv("CACHE_REDIS_URL"))
+workers = int(os.getenv("GUNICORN_WORKERS", str(_cpu_count() * 2 + 1 if SHARED_STATE else 1)))
+# La app lo lee (ej. la cola de reportes acepta estado local solo con un worker)
+os.environ["UCE_WEB_WORKERS"] = str(workers)
+# Con gthread, DB_POOL_SIZE + DB_MAX_OVERFLOW debe cubrir los hilos de cada worker
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "1000"))
+
+# --- RECICLAJE Y TIEMPOS ---
+# max_requests con jitter: los workers se reciclan (fugas de memoria) sin reiniciarse todos a la vez
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", str(max_requests // 10)))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+# Nginx mantiene conexiones vivas hacia los workers
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# preload: el código se importa una vez en el maestro y los workers lo comparten (copy-on-write).
+# Nunca con gevent: el maestro importaría psycopg2, pymongo y los pools de hilos antes del
+# monkey-patching, que gevent aplica recién en cada worker.
+preload_app = _env_bool("GUNICORN_PRELOAD", "true") and worker_class != "gevent"
+# El heartbeat de los workers en memoria: /tmp del contenedor puede ser lento (overlayfs)
+worker_tmp_dir = os.getenv("GUNICORN_WORKER_TMP_DIR", "/dev/shm" if os.path.isdir("/dev/shm") else None)
+
+# --- LOGS ---
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = os.getenv("GUNICORN_ERROR_LOG", "-")
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+# --- ARRANQUE ÚNICO (opcional; por defecto lo hace el servicio bootstrap de docker-compose) ---
+BOOTSTRAP_ENABLED = _env_bool("BOOTSTRAP_ON_START", "false")
+BOOTSTRAP_RETRIES = int(os.getenv("BOOTSTRAP_RETRIES", "10"))
+BOOTSTRAP_RETRY_DELAY = float(os.getenv("BOOTSTRAP_RETRY_DELAY", "3"))
+
+# --- HOOKS ---
+
+def on_starting(server):
+    """Maestro, antes de crear workers: métricas limpias, arranque único opcional y liberación de conexiones."""
+    _reset_metrics_dir()
+
+    from app.db import engine, close_mongo_clients
+    from app.security import shutdown_hash_pool
+
+    if BOOTSTRAP_ENABLED:
+        from app.main import bootstrap
+        bootstrap(BOOTSTRAP_RETRIES, BOOTSTRAP_RETRY_DELAY)
+
+    # El maestro no atiende requests: suelta conexiones y procesos antes del fork
+    engine.dispose()
+    close_mongo_clients()
+    shutdown_hash_pool()
+
+def post_fork(server, worker):
+    """Worker recién creado: pools de conexiones propios, nunca los sockets del maestro."""
+    from app.db import engine
+    # close=False: no cerrar conexiones heredadas, solo olvidarlas (pertenecen al padre)
+    engine.dispose(close=False)
+    # Los MongoClient y los pools de hashing/reportes se recrean solos al detectar el nuevo PID
+
+    if worker_class == "gevent":
+        # psycopg2 es C puro: sin este parche bloquearía todo el worker en cada consulta
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+
+def child_exit(server, worker):
+    """Maestro: un worker terminó; sus gauges 'live' dejan de sumarse en /metrics."""
+    from app.metrics import mark_worker_dead
+    mark_worker_dead(worker.pid)
+
+def worker_exit(server, worker):
+    """Apagado ordenado del worker: cierra sus conexiones a PostgreSQL y Mongo."""
+    from app.db import engine, close_mongo_clients
+    close_mongo_clients()
+    engine.dispose()
@@ -1,29 +1,75 @@
+import os
+import time
 import socket
-from flask import Flask, jsonify, request, send_file, render_template, redirect, url_for
+import logging
+from dataclasses import asdict
+import click
+from flask import (Flask, Blueprint, jsonify, request, send_file, render_template, redirect, url_for, g,
+                   Response, stream_with_context, make_response)
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 # Imports propios
 from app.db import init_db
 from app.dao.factory import UCEFactory
-from app.reporting.generator import generate_combined_report
-
-app = Flask(__name__)
-app.secret_key = "super_secreto_uce_key"
+from app.dao.application_view import snapshot_fields
+from app.dto.models import UserDTO
+from app.dto.validation import parse_csv_rows, validate_student_rows
+from app.cache import user_cache, get_cache_stats
+from app.security import (hash_password, HashingBusyError, login_retry_after,
+                          register_login_failure, register_login_success)
+from app.reporting.jobs import submit_report_job, get_job, ReportQueueUnavailable
+from app.reporting.export import EXPORT_SCHEMAS, EXPORT_FORMATS, EXPORT_BATCH_SIZE, iter_export
+from app.metrics import observe_request, render_metrics
+from app.profiling import init_app as init_profiling
+
+# Rutas de la aplicación; create_app() las registra en cada instancia de Flask
+web = Blueprint('web', __name__)
+
+# --- FÁBRICA POR REQUEST ---
+def get_factory() -> UCEFactory:
+    """
+    Retorna la fábrica (y su única sesión SQL) del request actual.
+    La comparten load_user, las vistas y el generador de reportes, así cada
+    request toma una sola conexión del pool.
+    """
+    if 'factory' not in g:
+        g.factory = UCEFactory()
+    return g.factory
+
+# --- MÉTRICAS POR RUTA ---
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+def observe_request_latency(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        # La plantilla de la ruta (no la URL real) mantiene acotada la cardinalidad
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        observe_request(route, request.method, response.status_code, time.perf_counter() - started)
+    return response
+
+def close_factory(exc):
+    factory = g.pop('factory', None)
+    if factory is not None:
+        factory.close()
 
 # --- CONFIGURACIÓN DE LOGIN ---
 login_manager = LoginManager()
-login_manager.init_app(app)
-login_manager.login_view = 'login' 
+login_manager.login_view = 'web.login'
 
 @login_manager.user_loader
 def load_user(user_id):
-    factory = UCEFactory()
-    try:
-        user_dao = factory.get_user_dao()
-        return user_dao.get(user_id)
-    finally:
-        factory.close()
+    # Read-through: solo vamos a Postgres si el usuario no está en caché
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return UserDTO(**cached)
+
+    user_dao = get_factory().get_user_dao()
+    user = user_dao.get(user_id)
+    if user:
+        user_cache.set(user_id, asdict(user))
+    return user
 
 def create_initial_admin():
     factory = UCEFactory()
@@ -32,7 +78,7 @@ def create_initial_admin():
         admin_email = "admin@uce.edu.ec"
         if not user_dao.get_by_email(admin_email):
             print(f"--- Creando Admin Inicial ({admin_email}) ---")
-            hashed_pw = generate_password_hash("admin123")
+            hashed_pw = hash_password("admin123")
             user_dao.create({
                 "email": admin_email,
                 "password_hash": hashed_pw,
@@ -44,56 +90,145 @@ def create_initial_admin():
     finally:
         factory.close()
 
-with app.app_context():
-    init_db()
-    create_initial_admin()
+def bootstrap(retries: int = 1, retry_delay: float = 3) -> None:
+    """
+    Trabajo de arranque que debe correr UNA sola vez (esquema, índices, admin inicial).
+    Nunca corre al importar ni al crear la app: se ejecuta con el comando explícito
+    'flask --app app.main:create_app bootstrap' (en docker-compose, el servicio bootstrap).
+    """
+    for attempt in range(1, retries + 1):
+        try:
+            init_db()
+            create_initial_admin()
+            return
+        except Exception as e:
+            # Postgres suele tardar más que la app en aceptar conexiones (docker-compose)
+            if attempt == retries:
+                raise
+            logging.error(f"Arranque fallido (intento {attempt}/{retries}): {e}")
+            time.sleep(retry_delay)
+
+@click.command('bootstrap')
+@click.option('--retries', default=int(os.getenv("BOOTSTRAP_RETRIES", "10")), show_default=True,
+              help="Reintentos mientras las bases de datos no aceptan conexiones")
+@click.option('--retry-delay', default=float(os.getenv("BOOTSTRAP_RETRY_DELAY", "3")), show_default=True,
+              help="Segundos entre reintentos")
+def bootstrap_command(retries, retry_delay):
+    """Crea esquema, índices y admin inicial (idempotente)."""
+    bootstrap(retries, retry_delay)
+    click.echo("Arranque completado.")
+
+# --- PAGINACIÓN (KEYSET) ---
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def get_page_args():
+    """Lee ?limit= y ?after= de la query string, acotando el tamaño de página."""
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        limit = DEFAULT_PAGE_SIZE
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    return limit, request.args.get('after') or None
+
+# --- HISTORIAL DEL ESTUDIANTE (compartido con el modo ASGI) ---
+def _get_val(obj, key, default=None):
+    if isinstance(obj, dict):
+        return obj.get(key, default)
+    return getattr(obj, key, default)
+
+def missing_opportunity_ids(apps):
+    """IDs de oferta de las filas que aún no tienen copia de título/empresa."""
+    return [_get_val(app, 'opportunity_id') for app in apps
+            if not _get_val(app, 'opportunity_title') and _get_val(app, 'opportunity_id')]
+
+def format_my_application(app, opps_by_id):
+    opp_title = "Oferta no disponible"
+    opp_company = "Empresa desconocida"
+
+    opp = opps_by_id.get(str(_get_val(app, 'opportunity_id')))
+    if _get_val(app, 'opportunity_title'):
+        opp_title = _get_val(app, 'opportunity_title')
+        opp_company = _get_val(app, 'company_name') or opp_company
+    elif opp:
+        opp_title = opp.title
+        opp_company = opp.company_name
+
+    raw_date = _get_val(app, 'created_at')
+    formatted_date = "N/A"
+    if raw_date:
+        if hasattr(raw_date, 'strftime'):
+            formatted_date = raw_date.strftime('%Y-%m-%d')
+        else:
+            formatted_date = str(raw_date)[:10]
+
+    return {
+        'id': str(_get_val(app, 'id')),
+        'date': formatted_date,
+        'status': _get_val(app, 'status', 'Desconocido'),
+        'opportunity_title': opp_title,
+        'company_name': opp_company
+    }
 
 # --- RUTAS PÚBLICAS Y GENERALES ---
 
-@app.route('/')
+@web.route('/')
 def home():
     if current_user.is_authenticated:
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('web.dashboard'))
     else:
-        return redirect(url_for('login'))
+        return redirect(url_for('web.login'))
 
-@app.route('/login', methods=['GET', 'POST'])
+@web.route('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
         email = request.form.get('email')
         password = request.form.get('password')
-        factory = UCEFactory()
+        # remote_addr ya es la IP del cliente si la app está detrás de un proxy de confianza
+        # (ProxyFix en create_app); nunca se leen cabeceras que el cliente pueda inventar
+        client_ip = request.remote_addr
+
+        # Throttling antes de tocar la BD o calcular el hash
+        retry_after = login_retry_after(email, client_ip)
+        if retry_after:
+            response = make_response((render_template(
+                'login.html', error=f"Demasiados intentos. Intente en {retry_after} segundos."), 429))
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+
+        user_dao = get_factory().get_user_dao()
         try:
-            user_dao = factory.get_user_dao()
             user = user_dao.validate_login(email, password)
-            if user:
-                login_user(user)
-                return redirect(url_for('dashboard'))
-            else:
-                return render_template('login.html', error="Credenciales inválidas")
-        finally:
-            factory.close()
+        except HashingBusyError as e:
+            return render_template('login.html', error=str(e)), 503
+        if user:
+            register_login_success(email, client_ip)
+            login_user(user)
+            return redirect(url_for('web.dashboard'))
+        else:
+            register_login_failure(email, client_ip)
+            return render_template('login.html', error="Credenciales inválidas")
     return render_template('login.html')
 
-@app.route('/logout')
+@web.route('/logout')
 @login_required
 def logout():
     logout_user()
-    return redirect(url_for('login'))
+    return redirect(url_for('web.login'))
 
-@app.route('/register', methods=['GET', 'POST'])
+@web.route('/register', methods=['GET', 'POST'])
 def register():
     if request.method == 'POST':
         name = request.form.get('name')
         email = request.form.get('email')
         password = request.form.get('password')
-        factory = UCEFactory()
+        factory = get_factory()
         try:
             user_dao = factory.get_user_dao()
             if user_dao.get_by_email(email):
                 return render_template('register.html', error="El correo ya está registrado.")
             
-            hashed_pw = generate_password_hash(password)
+            hashed_pw = hash_password(password)
             user_dao.create({
                 "email": email,
                 "password_hash": hashed_pw,
@@ -101,49 +236,97 @@ def register():
                 "role": "student" 
             })
             return render_template('login.html', error="¡Cuenta creada! Por favor inicia sesión.")
+        except HashingBusyError as e:
+            return render_template('register.html', error=str(e)), 503
         except Exception as e:
             return render_template('register.html', error=f"Error del sistema: {str(e)}")
-        finally:
-            factory.close()
     return render_template('register.html')
 
-@app.route('/dashboard')
+@web.route('/dashboard')
 @login_required
 def dashboard():
     container_id = socket.gethostname()
     return render_template('index.html', user=current_user, node_id=container_id)
 
-@app.route('/admin/opportunities-view')
+@web.route('/admin/opportunities-view')
 @login_required
 def admin_opportunities_view():
     """Renderiza la nueva página de gestión de ofertas (CRUD)"""
     if current_user.role != 'admin':
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('web.dashboard'))
     return render_template('admin_opportunities.html', user=current_user)
 
 # --- API: GESTIÓN DE ESTUDIANTES (SQL) ---
 
-@app.route('/api/students', methods=['POST'])
+@web.route('/api/students', methods=['POST'])
 @login_required
 def create_student():
     if current_user.role != 'admin':
         return jsonify({"error": "No autorizado"}), 403
     data = request.json
-    factory = UCEFactory()
+    factory = get_factory()
     try:
         student_dao = factory.get_student_dao()
         new_student = student_dao.create(data)
         return jsonify(new_student.__dict__), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 400
-    finally:
-        factory.close()
+
+MAX_BULK_ROWS = int(os.getenv("MAX_BULK_ROWS", "100000"))
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+
+@web.route('/api/students/bulk', methods=['POST'])
+@login_required
+def bulk_create_students():
+    """
+    Carga masiva de estudiantes: arreglo JSON, CSV en el cuerpo (text/csv) o archivo 'file'.
+    ?on_conflict=skip|update decide qué hacer con emails ya registrados.
+    Retorna un resumen y el resultado de cada fila.
+    """
+    if current_user.role != 'admin':
+        return jsonify({"error": "No autorizado"}), 403
+
+    on_conflict = request.args.get('on_conflict', 'skip')
+    if on_conflict not in ('skip', 'update'):
+        return jsonify({"error": "on_conflict debe ser 'skip' o 'update'"}), 400
+
+    upload = request.files.get('file')
+    if upload:
+        raw_rows = parse_csv_rows(upload.read().decode('utf-8', errors='replace'))
+    elif request.mimetype == 'text/csv':
+        raw_rows = parse_csv_rows(request.get_data(as_text=True))
+    else:
+        raw_rows = request.get_json(silent=True)
+    if not isinstance(raw_rows, list):
+        return jsonify({"error": "Se espera un arreglo JSON o un CSV"}), 400
+    if len(raw_rows) > MAX_BULK_ROWS:
+        return jsonify({"error": f"Máximo {MAX_BULK_ROWS} filas por carga"}), 413
+
+    valid, report = validate_student_rows(raw_rows)
+    factory = get_factory()
+    try:
+        student_dao = factory.get_student_dao()
+        outcomes = student_dao.bulk_create([data for _, data in valid],
+                                           batch_size=BULK_BATCH_SIZE, on_conflict=on_conflict)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    for index, data in valid:
+        # Sin resultado = el email ya existía y se omitió (ON CONFLICT DO NOTHING)
+        outcome = outcomes.get(data["email"], {"id": None, "status": "duplicate",
+                                               "error": "El email ya está registrado"})
+        report[index] = {"row": index + 1, "email": data["email"], **outcome}
+
+    summary = {}
+    for item in report:
+        summary[item["status"]] = summary.get(item["status"], 0) + 1
+    return jsonify({"total": len(report), "summary": summary, "results": report}), 200
 
 # --- API: GESTIÓN DE OPORTUNIDADES (MONGO) ---
 
-@app.route('/api/opportunities', methods=['GET', 'POST'])
+@web.route('/api/opportunities', methods=['GET', 'POST'])
 def handle_opportunities():
-    factory = UCEFactory()
+    factory = get_factory()
     try:
         opp_dao = factory.get_opportunity_dao()
 
@@ -162,15 +345,24 @@ def handle_opportunities():
                 return jsonify({"error": str(e)}), 409
         
         else:
-            opportunities = opp_dao.get_all()
-            return jsonify(opportunities), 200
+            limit, after = get_page_args()
+            filters = {}
+            if request.args.get('company'):
+                filters['company_name'] = request.args['company']
+            try:
+                page = opp_dao.get_page(limit=limit, after=after, filters=filters)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            # ETag del contenido: si el catálogo no cambió, If-None-Match responde 304 sin cuerpo
+            response = jsonify(page)
+            response.cache_control.no_cache = True
+            response.add_etag()
+            return response.make_conditional(request)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        factory.close()
 
-@app.route('/api/opportunities/<id>', methods=['PUT', 'DELETE'])
+@web.route('/api/opportunities/<id>', methods=['PUT', 'DELETE'])
 @login_required
 def modify_opportunity(id):
     """
@@ -179,7 +371,7 @@ def modify_opportunity(id):
     if current_user.role != 'admin':
         return jsonify({"error": "No autorizado"}), 403
 
-    factory = UCEFactory()
+    factory = get_factory()
     try:
         opp_dao = factory.get_opportunity_dao()
 
@@ -194,7 +386,10 @@ def modify_opportunity(id):
         # --- PUT (Update) ---
         elif request.method == 'PUT':
             data = request.json
-            success = opp_dao.update(id, data)
+            try:
+                success = opp_dao.update(id, data)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 409
             if success:
                 return jsonify({"message": "Oferta actualizada correctamente"}), 200
             else:
@@ -202,12 +397,10 @@ def modify_opportunity(id):
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        factory.close()
 
 # --- API: GESTIÓN DE POSTULACIONES (SQL) ---
 
-@app.route('/api/applications', methods=['POST'])
+@web.route('/api/applications', methods=['POST'])
 @login_required 
 def apply_opportunity():
     data = request.json
@@ -216,70 +409,64 @@ def apply_opportunity():
     if not opp_id:
         return jsonify({"error": "Falta opportunity_id"}), 400
 
-    factory = UCEFactory()
+    factory = get_factory()
     try:
         app_dao = factory.get_application_dao()
         app_id = app_dao.create({
             "user_id": current_user.id,
             "opportunity_id": opp_id,
-            "status": "enviada"
+            "status": "enviada",
+            # Copia de título/empresa: las lecturas posteriores no necesitan consultar Mongo
+            **snapshot_fields(factory, opp_id)
         })
         return jsonify({"message": "Postulación exitosa", "ref": app_id}), 201
     except ValueError as e:
         return jsonify({"error": str(e)}), 409 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        factory.close()
 
-@app.route('/api/applications/all', methods=['GET'])
+@web.route('/api/applications/all', methods=['GET'])
 @login_required
 def get_applications_list():
     if current_user.role != 'admin':
         return jsonify({"error": "No autorizado"}), 403
-    factory = UCEFactory()
+    limit, after = get_page_args()
+    filters = {key: request.args[key] for key in ('status', 'opportunity_id') if request.args.get(key)}
+    factory = get_factory()
     try:
         app_dao = factory.get_application_dao()
-        apps = app_dao.get_all()
-        return jsonify(apps), 200
+        page = app_dao.get_page(limit=limit, after=after, filters=filters)
+        return jsonify(page), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        factory.close()
 
-@app.route('/api/my-applications', methods=['GET'])
+@web.route('/api/my-applications', methods=['GET'])
 @login_required
 def get_my_applications():
     """
-    Retorna historial del estudiante.
+    Retorna historial del estudiante, paginado por cursor (?limit=&after=&status=).
     CORRECCIÓN APLICADA: Conversión de tipos (str vs int) en el ID.
     """
     if current_user.role != 'student':
         return jsonify([]), 403
     
-    factory = UCEFactory()
+    limit, after = get_page_args()
+    factory = get_factory()
     try:
         app_dao = factory.get_application_dao()
         
-        def get_val(obj, key, default=None):
-            if isinstance(obj, dict):
-                return obj.get(key, default)
-            return getattr(obj, key, default)
-
-        # 1. Obtener postulaciones
-        apps = []
+        # 1. Obtener la página de postulaciones del estudiante (filtrada en la BD)
+        filters = {"user_id": current_user.id}
+        if request.args.get('status'):
+            filters['status'] = request.args['status']
         try:
-            # Si el DAO tiene método optimizado, lo usamos
-            apps = app_dao.get_by_user_id(current_user.id)
-        except AttributeError:
-            # Fallback: Traemos todas y filtramos asegurando TIPOS
-            all_apps = app_dao.get_all()
-            # ---> AQUÍ ESTÁ LA CORRECCIÓN CLAVE <---
-            # Convertimos ambos IDs a string para evitar fallos de comparación (int vs str)
-            apps = [a for a in all_apps if str(get_val(a, 'user_id')) == str(current_user.id)]
-
-        data = []
-        
+            page = app_dao.get_page(limit=limit, after=after, filters=filters)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        apps = page["items"]
+
         # 2. Configurar DAO de Oportunidades (Mongo)
         opp_dao = None
         try:
@@ -287,46 +474,24 @@ def get_my_applications():
         except:
             pass 
 
-        for app in apps:
-            opp_title = "Oferta no disponible"
-            opp_company = "Empresa desconocida"
-
-            # Enriquecer con Mongo
-            opp_id = get_val(app, 'opportunity_id')
-            if opp_dao and opp_id:
-                try:
-                    opp = opp_dao.get(opp_id)
-                    if opp:
-                        opp_title = opp.title
-                        opp_company = opp.company_name
-                except Exception:
-                    pass 
-            
-            raw_date = get_val(app, 'application_date')
-            formatted_date = "N/A"
-            if raw_date:
-                if hasattr(raw_date, 'strftime'):
-                    formatted_date = raw_date.strftime('%Y-%m-%d')
-                else:
-                    formatted_date = str(raw_date)[:10]
-
-            data.append({
-                'id': str(get_val(app, 'id')), 
-                'date': formatted_date,
-                'status': get_val(app, 'status', 'Desconocido'),
-                'opportunity_title': opp_title,
-                'company_name': opp_company
-            })
-            
-        return jsonify(data)
+        # 3. La mayoría de filas ya traen título/empresa (vista materializada).
+        #    Solo las que aún no tienen copia se enriquecen con Mongo, en UNA consulta ($in).
+        opps_by_id = {}
+        missing_ids = missing_opportunity_ids(apps)
+        if opp_dao and missing_ids:
+            try:
+                opps_by_id = opp_dao.get_many(missing_ids)
+            except Exception:
+                pass
+
+        data = [format_my_application(app, opps_by_id) for app in apps]
+        return jsonify({"items": data, "next_cursor": page["next_cursor"]})
 
     except Exception as e:
-        print(f"Error CRÍTICO en my-applications: {e}")
-        return jsonify([]) 
-    finally:
-        factory.close()
+        logging.error(f"Error CRÍTICO en my-applications: {e}")
+        return jsonify({"items": [], "next_cursor": None}) 
 
-@app.route('/api/applications/<int:app_id>/status', methods=['PUT'])
+@web.route('/api/applications/<int:app_id>/status', methods=['PUT'])
 @login_required
 def update_application_status(app_id):
     if current_user.role != 'admin':
@@ -338,7 +503,7 @@ def update_application_status(app_id):
     if new_status not in ['aprobada', 'rechazada']:
         return jsonify({"error": "Estado no válido"}), 400
 
-    factory = UCEFactory()
+    factory = get_factory()
     try:
         app_dao = factory.get_application_dao()
         success = app_dao.update(app_id, {"status": new_status})
@@ -348,45 +513,100 @@ def update_application_status(app_id):
             return jsonify({"error": "No se encontró la postulación"}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        factory.close()
+
+@web.route('/api/applications/status', methods=['PUT'])
+@login_required
+def bulk_update_application_status():
+    """
+    Cambio de estado masivo en una sola transacción.
+    Body: {"status": "aprobada", "ids": [1, 2, 3]}
+       o  {"status": "rechazada", "filter": {"opportunity_id": "...", "status": "enviada"}}
+    """
+    if current_user.role != 'admin':
+        return jsonify({"error": "No tiene permisos de administrador"}), 403
+
+    data = request.json or {}
+    new_status = data.get('status')
+    if new_status not in ['aprobada', 'rechazada']:
+        return jsonify({"error": "Estado no válido"}), 400
+
+    ids = data.get('ids')
+    filters = data.get('filter')
+    if ids is not None:
+        if not isinstance(ids, list) or not ids:
+            return jsonify({"error": "ids debe ser una lista no vacía"}), 400
+        if len(ids) > MAX_BULK_ROWS:
+            # Mismo límite (y código) que la carga masiva de estudiantes
+            return jsonify({"error": f"Máximo {MAX_BULK_ROWS} ids por solicitud"}), 413
+        try:
+            ids = sorted({int(i) for i in ids})
+        except (TypeError, ValueError):
+            return jsonify({"error": "ids debe contener enteros"}), 400
+    elif isinstance(filters, dict) and filters.get('opportunity_id'):
+        filters = {k: filters[k] for k in ('opportunity_id', 'status') if filters.get(k)}
+    else:
+        return jsonify({"error": "Envíe 'ids' o 'filter' con opportunity_id"}), 400
+
+    factory = get_factory()
+    try:
+        app_dao = factory.get_application_dao()
+        updated = app_dao.bulk_update_status(new_status, ids=ids, filters=None if ids is not None else filters)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    if ids is not None:
+        updated_set = set(updated)
+        results = [{"id": i, "status": "updated" if i in updated_set else "not_found"} for i in ids]
+    else:
+        results = [{"id": i, "status": "updated"} for i in updated]
+    return jsonify({"new_status": new_status, "updated": len(updated), "results": results}), 200
 
 # --- VISTAS ADMIN ---
 
-@app.route('/admin/applications-view')
+@web.route('/admin/applications-view')
 @login_required
 def admin_applications_view():
     if current_user.role != 'admin':
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('web.dashboard'))
     return render_template('applications.html', user=current_user)
 
 # --- REPORTES Y MÉTRICAS ---
 
-@app.route('/api/stats', methods=['GET'])
+@web.route('/api/cache/stats', methods=['GET'])
+@login_required
+def get_cache_metrics():
+    """Contadores de hit/miss de las cachés de este worker."""
+    if current_user.role != 'admin':
+        return jsonify({}), 403
+    return jsonify(get_cache_stats())
+
+@web.route('/api/stats', methods=['GET'])
 @login_required
 def get_dashboard_stats():
     if current_user.role != 'admin':
         return jsonify({}), 403
 
-    factory = UCEFactory()
+    factory = get_factory()
     try:
         try:
             std_dao = factory.get_student_dao()
-            total_students = len(std_dao.get_all())
-        except: total_students = 0
+            total_students = std_dao.count()
+        except Exception as e:
+            logging.error(f"Error contando estudiantes: {e}")
+            total_students = 0
 
         try:
             app_dao = factory.get_application_dao()
-            total_apps = len(app_dao.get_all())
-        except: total_apps = 0
+            total_apps = app_dao.count()
+        except Exception as e:
+            logging.error(f"Error contando postulaciones: {e}")
+            total_apps = 0
 
         try:
             opp_dao = factory.get_opportunity_dao()
-            raw_opps = opp_dao.get_all()
-            if len(raw_opps) == 1 and raw_opps[0].get('id') == 'maintenance':
-                total_opps = 0
-            else:
-                total_opps = len(raw_opps)
+            total_opps = opp_dao.count()
         except Exception:
             total_opps = 0
 
@@ -396,21 +616,127 @@ def get_dashboard_stats():
             "applications": total_apps
         })
     except Exception as e:
+        logging.error(f"Error en /api/stats: {e}")
         return jsonify({"students": 0, "opportunities": 0, "applications": 0})
-    finally:
-        factory.close()
 
-@app.route('/api/reports/combined', methods=['GET'])
+def job_to_json(job):
+    """Estado público del trabajo (sin rutas internas del servidor)."""
+    data = {"job_id": job["id"], "status": job["status"],
+            "status_url": url_for('web.get_report_job', job_id=job["id"])}
+    if job["status"] == "done":
+        data["download_url"] = url_for('web.download_report', job_id=job["id"])
+    if job.get("error"):
+        data["error"] = job["error"]
+    return data
+
+@web.route('/api/reports/combined', methods=['POST'])
+@login_required
+def request_report():
+    """Encola el reporte combinado (202). Pedidos simultáneos comparten el mismo trabajo."""
+    if current_user.role != 'admin':
+        return jsonify({"error": "No autorizado"}), 403
+    try:
+        job = submit_report_job("combined")
+        return jsonify(job_to_json(job)), 202
+    except ReportQueueUnavailable as e:
+        logging.error(f"Cola de reportes no disponible: {e}")
+        return jsonify({"error": "La generación de reportes no está disponible"}), 503
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# GET síncrono anterior: espera al trabajo como mucho esto antes de responder 202
+REPORT_GET_WAIT_SECONDS = float(os.getenv("REPORT_GET_WAIT_SECONDS", "25"))
+
+@web.route('/api/reports/combined', methods=['GET'])
+@login_required
 def get_report():
+    """
+    Compatibilidad con el endpoint síncrono anterior: encola (o reutiliza) el trabajo y,
+    si termina dentro de REPORT_GET_WAIT_SECONDS, descarga el PDF; si no, 202 con el trabajo.
+    """
+    if current_user.role != 'admin':
+        return jsonify({"error": "No autorizado"}), 403
     try:
-        pdf_path = generate_combined_report()
-        return send_file(pdf_path, as_attachment=True, download_name="reporte_uce.pdf")
+        job = submit_report_job("combined")
+    except ReportQueueUnavailable as e:
+        logging.error(f"Cola de reportes no disponible: {e}")
+        return jsonify({"error": "La generación de reportes no está disponible"}), 503
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/test-architecture', methods=['GET'])
+    deadline = time.monotonic() + REPORT_GET_WAIT_SECONDS
+    while job["status"] in ("pending", "running") and time.monotonic() < deadline:
+        time.sleep(0.2)
+        job = get_job(job["id"]) or job
+    if job["status"] == "done":
+        return download_report(job["id"])
+    if job["status"] == "error":
+        return jsonify(job_to_json(job)), 500
+    response = jsonify(job_to_json(job))
+    response.headers['Location'] = url_for('web.get_report_job', job_id=job["id"])
+    response.headers['Retry-After'] = "2"
+    return response, 202
+
+@web.route('/api/reports/jobs/<job_id>', methods=['GET'])
+@login_required
+def get_report_job(job_id):
+    if current_user.role != 'admin':
+        return jsonify({"error": "No autorizado"}), 403
+    job = get_job(job_id)
+    if not job:
+        return jsonify({"error": "Trabajo no encontrado"}), 404
+    return jsonify(job_to_json(job)), 200
+
+@web.route('/api/reports/jobs/<job_id>/download', methods=['GET'])
+@login_required
+def download_report(job_id):
+    if current_user.role != 'admin':
+        return jsonify({"error": "No autorizado"}), 403
+    job = get_job(job_id)
+    if not job:
+        return jsonify({"error": "Trabajo no encontrado"}), 404
+    if job["status"] != "done":
+        return jsonify(job_to_json(job)), 409
+    try:
+        return send_file(job["path"], as_attachment=True, download_name="reporte_uce.pdf")
+    except FileNotFoundError:
+        return jsonify({"error": "El archivo del reporte ya no está disponible"}), 410
+
+@web.route('/api/export/<dataset>', methods=['GET'])
+@login_required
+def export_dataset(dataset):
+    """
+    Exportación en streaming: /api/export/<students|applications>?format=<csv|ndjson|parquet>
+    Las filas se leen con cursores del servidor y se envían por bloques.
+    """
+    if current_user.role != 'admin':
+        return jsonify({"error": "No autorizado"}), 403
+    fmt = request.args.get('format', 'csv')
+    if dataset not in EXPORT_SCHEMAS or fmt not in EXPORT_FORMATS:
+        return jsonify({"error": "Dataset o formato no soportado"}), 400
+
+    factory = get_factory()
+    if dataset == 'students':
+        dao = factory.get_student_dao()
+    else:
+        dao = factory.get_application_dao()
+    fields = [name for name, _ in EXPORT_SCHEMAS[dataset]]
+    rows = dao.stream(fields=fields, batch_size=EXPORT_BATCH_SIZE)
+
+    # stream_with_context mantiene viva la sesión del request hasta terminar de enviar
+    response = Response(stream_with_context(iter_export(rows, dataset, fmt)), mimetype=EXPORT_FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename="{dataset}.{fmt}"'
+    return response
+
+@web.route('/metrics', methods=['GET'])
+def metrics():
+    """Métricas en formato Prometheus, agregadas de todos los workers del contenedor."""
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
+
+@web.route('/api/test-architecture', methods=['GET'])
 def test_full_flow():
-    factory = UCEFactory()
+    factory = get_factory()
     try:
         return jsonify({
             "message": "Conexión exitosa a ambos orígenes de datos",
@@ -419,8 +745,31 @@ def test_full_flow():
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        factory.close()
+
+# --- FÁBRICA DE LA APLICACIÓN ---
+# Proxies de confianza delante de la app (nginx = 1). 0: la app se expone directamente
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+
+def create_app() -> Flask:
+    """
+    Crea la app Flask sin tocar las bases de datos (nada de I/O al arrancar un worker).
+    gunicorn: 'app.main:create_app()'; CLI: 'flask --app app.main:create_app bootstrap'.
+    """
+    app = Flask(__name__)
+    app.secret_key = "super_secreto_uce_key"
+    if TRUSTED_PROXY_HOPS:
+        # Solo los últimos N saltos de X-Forwarded-For (los agregó nginx): el resto lo escribe el cliente
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS)
+    # Server-Timing + log de requests lentos / N+1 (opt-in con DB_PROFILING=true)
+    init_profiling(app)
+    app.before_request(start_request_timer)
+    app.after_request(observe_request_latency)
+    app.teardown_appcontext(close_factory)
+    login_manager.init_app(app)
+    app.register_blueprint(web)
+    app.cli.add_command(bootstrap_command)
+    return app
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000)
\ No newline at end of file
+    bootstrap()
+    create_app().run(host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,243 @@
+import os
+import time
+import types
+import inspect
+import functools
+import threading
+from typing import Any, Tuple
+
+from prometheus_client import (Counter, Gauge, Histogram, CollectorRegistry, REGISTRY,
+                               CONTENT_TYPE_LATEST, generate_latest, multiprocess)
+from pymongo import monitoring
+
+from app.breaker import BreakerListener, STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN
+
+# --- MÉTRICAS (formato Prometheus, expuestas en /metrics) ---
+# Con gunicorn cada worker es un proceso: si PROMETHEUS_MULTIPROC_DIR está definido
+# (lo define gunicorn.conf.py), los valores se escriben en ese directorio y /metrics
+# los agrega de todos los workers vivos, sin importar cuál atienda el scrape.
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+REQUEST_LATENCY = Histogram(
+    "uce_http_request_duration_seconds", "Latencia de requests HTTP por ruta y estado",
+    ["route", "method", "status"], buckets=LATENCY_BUCKETS,
+)
+DAO_LATENCY = Histogram(
+    "uce_dao_call_duration_seconds", "Duración de cada método DAO",
+    ["store", "dao", "method", "outcome"], buckets=LATENCY_BUCKETS,
+)
+
+# Pool de SQLAlchemy (PostgreSQL)
+SQL_POOL_CONNECTIONS = Gauge(
+    "uce_sql_pool_connections", "Conexiones abiertas del pool SQL", multiprocess_mode="livesum")
+SQL_POOL_CHECKED_OUT = Gauge(
+    "uce_sql_pool_checked_out", "Conexiones SQL prestadas a requests", multiprocess_mode="livesum")
+SQL_POOL_OVERFLOW = Gauge(
+    "uce_sql_pool_overflow", "Conexiones SQL abiertas por encima de pool_size", multiprocess_mode="livesum")
+SQL_CONNECTION_HELD = Histogram(
+    "uce_sql_connection_held_seconds", "Tiempo que un request retiene una conexión SQL",
+    buckets=LATENCY_BUCKETS,
+)
+
+# Pool de MongoClient (eventos CMAP de PyMongo)
+MONGO_POOL_CONNECTIONS = Gauge(
+    "uce_mongo_pool_connections", "Conexiones abiertas de los pools Mongo", multiprocess_mode="livesum")
+MONGO_POOL_CHECKED_OUT = Gauge(
+    "uce_mongo_pool_checked_out", "Conexiones Mongo prestadas a operaciones", multiprocess_mode="livesum")
+MONGO_CHECKOUT_WAIT = Histogram(
+    "uce_mongo_pool_checkout_wait_seconds", "Espera para obtener una conexión Mongo del pool",
+    buckets=LATENCY_BUCKETS,
+)
+MONGO_CHECKOUT_FAILURES = Counter(
+    "uce_mongo_pool_checkout_failures_total", "Fallos al obtener una conexión Mongo", ["reason"])
+
+# Circuit breaker (0 = cerrado, 1 = semiabierto, 2 = abierto)
+BREAKER_STATE_VALUES = {STATE_CLOSED: 0, STATE_HALF_OPEN: 1, STATE_OPEN: 2}
+BREAKER_STATE = Gauge(
+    "uce_circuit_breaker_state", "Estado del circuit breaker", ["breaker"], multiprocess_mode="livemax")
+BREAKER_TRANSITIONS = Counter(
+    "uce_circuit_breaker_transitions_total", "Cambios de estado del circuit breaker",
+    ["breaker", "from_state", "to_state"])
+BREAKER_FAILURES = Counter(
+    "uce_circuit_breaker_failures_total", "Fallos contados por el circuit breaker", ["breaker"])
+
+# Cachés read-through (ofertas, usuarios): hit ratio = hits / (hits + misses) por etiqueta 'cache',
+# agregado entre workers. El estado guardado en caché (login_attempts, report_jobs) no se reporta.
+CACHE_REQUESTS = Counter("uce_cache_requests_total", "Lecturas de cachés read-through", ["cache", "result"])
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Cuerpo y content-type del endpoint /metrics."""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def mark_worker_dead(pid: int) -> None:
+    """Hook child_exit de gunicorn: descarta los gauges 'live' del worker que terminó."""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
+
+def observe_request(route: str, method: str, status: int, seconds: float) -> None:
+    REQUEST_LATENCY.labels(route, method, str(status)).observe(seconds)
+
+def record_cache_access(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+# --- DAOs ---
+
+def _timed_iter(iterator, start: float, labels: Tuple[str, str, str]):
+    """Mide un stream completo: desde la llamada hasta que el consumidor lo agota."""
+    outcome = "error"
+    try:
+        yield from iterator
+        outcome = "ok"
+    finally:
+        DAO_LATENCY.labels(*labels, outcome).observe(time.perf_counter() - start)
+
+def _timed(fn, labels: Tuple[str, str, str]):
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await fn(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                DAO_LATENCY.labels(*labels, outcome).observe(time.perf_counter() - start)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            DAO_LATENCY.labels(*labels, "error").observe(time.perf_counter() - start)
+            raise
+        if isinstance(result, types.GeneratorType):
+            return _timed_iter(result, start, labels)
+        DAO_LATENCY.labels(*labels, "ok").observe(time.perf_counter() - start)
+        return result
+    return wrapper
+
+def instrument_dao(store: str):
+    """
+    Decorador de clase: mide cada método público del DAO (sync, async o stream).
+    Ej: @instrument_dao("postgres") sobre PostgresStudentDAO.
+    """
+    def decorate(cls):
+        for name, attr in list(vars(cls).items()):
+            if name.startswith("_") or not inspect.isfunction(attr):
+                continue
+            setattr(cls, name, _timed(attr, (store, cls.__name__, name)))
+        return cls
+    return decorate
+
+# --- POOL SQL ---
+
+def instrument_engine(engine) -> None:
+    """Registra eventos del pool de SQLAlchemy para los gauges de conexiones."""
+    from sqlalchemy import event
+    pool = engine.pool
+
+    def update_overflow():
+        overflow = getattr(pool, "overflow", None)
+        if overflow is not None:
+            SQL_POOL_OVERFLOW.set(max(overflow(), 0))
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        SQL_POOL_CONNECTIONS.inc()
+
+    @event.listens_for(pool, "close")
+    def on_close(dbapi_connection, connection_record):
+        SQL_POOL_CONNECTIONS.dec()
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        SQL_POOL_CHECKED_OUT.inc()
+        update_overflow()
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is None:
+            return
+        SQL_CONNECTION_HELD.observe(time.perf_counter() - started)
+        SQL_POOL_CHECKED_OUT.dec()
+        update_overflow()
+
+# --- POOL MONGO ---
+
+class MongoPoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Listener CMAP de PyMongo: conexiones abiertas/prestadas y espera de checkout."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, "started", None)
+        if started is not None:
+            MONGO_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+            self._local.started = None
+        MONGO_POOL_CHECKED_OUT.inc()
+
+    def connection_check_out_failed(self, event):
+        self._local.started = None
+        MONGO_CHECKOUT_FAILURES.labels(str(event.reason)).inc()
+
+    def connection_checked_in(self, event):
+        MONGO_POOL_CHECKED_OUT.dec()
+
+    def connection_created(self, event):
+        MONGO_POOL_CONNECTIONS.inc()
+
+    def connection_closed(self, event):
+        MONGO_POOL_CONNECTIONS.dec()
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+# --- CIRCUIT BREAKER ---
+
+class BreakerMetricsListener(BreakerListener):
+    """Publica el estado y las transiciones de un app.breaker.CircuitBreaker."""
+
+    def __init__(self, name: str):
+        self.name = name
+        BREAKER_STATE.labels(name).set(0)
+
+    def state_change(self, breaker: Any, old_state: str, new_state: str) -> None:
+        # Solo las transiciones que provocó este worker: la suma entre workers no se duplica
+        BREAKER_TRANSITIONS.labels(self.name, old_state, new_state).inc()
+        BREAKER_STATE.labels(self.name).set(BREAKER_STATE_VALUES.get(new_state, 0))
+
+    def state_observed(self, breaker: Any, state: str) -> None:
+        # Cambio hecho por otro worker/contenedor (estado compartido): solo se refleja
+        BREAKER_STATE.labels(self.name).set(BREAKER_STATE_VALUES.get(state, 0))
+
+    def failure(self, breaker: Any, exc: BaseException) -> None:
+        BREAKER_FAILURES.labels(self.name).inc()
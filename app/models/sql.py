@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Index
 from sqlalchemy.orm import declarative_base, relationship
 from datetime import datetime
 
@@ -33,6 +33,13 @@ class StudentModel(Base):
     email = Column(String(100), unique=True, nullable=False)
     gpa = Column(Float, nullable=False)
     department = Column(String(50), nullable=False)
+    # Última alta o edición (la carga masiva con on_conflict="update" lo actualiza)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # max(updated_at) de data_version sin recorrer la tabla
+        Index('ix_students_updated_at', 'updated_at'),
+    )
 
 
 
@@ -46,5 +53,22 @@ class ApplicationModel(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False) # Quién aplicó
     opportunity_id = Column(String(50), nullable=False) # ID de Mongo (string)
+    # Vista materializada: copia de título/empresa de Mongo para leer sin cruzar bases.
+    # NULL = aún no sincronizada (o la oferta ya no existe); la reconciliación la completa.
+    # Text: los títulos en Mongo no tienen límite de largo
+    opportunity_title = Column(Text, nullable=True)
+    opportunity_company = Column(Text, nullable=True)
+    opportunity_synced_at = Column(DateTime, nullable=True)
     status = Column(String(20), default='pending') # pending, accepted, rejected
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Chequeo de duplicados en PostgresApplicationDAO.create (y garantía en la BD)
+        Index('uq_applications_user_opportunity', 'user_id', 'opportunity_id', unique=True),
+        # Historial del estudiante: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index('ix_applications_user_created', 'user_id', 'created_at', 'id'),
+        # Listado del admin: keyset sobre (created_at, id)
+        Index('ix_applications_created_id', 'created_at', 'id'),
+        # Filtro por oferta (?opportunity_id=)
+        Index('ix_applications_opportunity_id', 'opportunity_id'),
+    )
\ No newline at end of file
@@ -0,0 +1,179 @@
+import os
+import time
+import logging
+import contextvars
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+# --- PERFILADO DE CONSULTAS POR REQUEST (opt-in: DB_PROFILING=true) ---
+# Cada request acumula sus sentencias SQL (eventos de cursor de SQLAlchemy) y comandos
+# Mongo (command monitoring de PyMongo). Al terminar se envía el resumen en la cabecera
+# Server-Timing y se registra en el log si supera los umbrales o si hay sentencias
+# idénticas repetidas (patrón N+1). Desactivado, no se registra ningún hook.
+PROFILING_ENABLED = os.getenv("DB_PROFILING", "false").lower() in ("1", "true", "yes")
+PROFILE_SLOW_REQUEST_MS = float(os.getenv("PROFILE_SLOW_REQUEST_MS", "500"))
+PROFILE_SLOW_STATEMENT_MS = float(os.getenv("PROFILE_SLOW_STATEMENT_MS", "100"))
+PROFILE_MAX_STATEMENTS = int(os.getenv("PROFILE_MAX_STATEMENTS", "30"))
+# Misma sentencia (sin contar parámetros) repetida N veces en un request = posible N+1
+PROFILE_N_PLUS_ONE_THRESHOLD = int(os.getenv("PROFILE_N_PLUS_ONE_THRESHOLD", "5"))
+PROFILE_TOP_STATEMENTS = int(os.getenv("PROFILE_TOP_STATEMENTS", "3"))
+
+class RequestProfile:
+    """Sentencias ejecutadas durante un request: (origen, sentencia, milisegundos)."""
+
+    def __init__(self):
+        self.statements: List[Tuple[str, str, float]] = []
+        # request_id de PyMongo -> sentencia, entre 'started' y 'succeeded/failed'
+        self.pending_commands: Dict[int, str] = {}
+
+    def record(self, source: str, statement: str, elapsed_ms: float) -> None:
+        self.statements.append((source, statement, elapsed_ms))
+
+    def total_ms(self, source: str) -> float:
+        return sum(ms for src, _, ms in self.statements if src == source)
+
+    def count(self, source: str) -> int:
+        return sum(1 for src, _, _ in self.statements if src == source)
+
+    def slowest(self, n: int) -> List[Tuple[str, str, float]]:
+        return sorted(self.statements, key=lambda s: s[2], reverse=True)[:n]
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Sentencias idénticas ejecutadas 'threshold' veces o más (candidatas a N+1)."""
+        counts = Counter(f"{src}: {stmt}" for src, stmt, _ in self.statements)
+        return [(stmt, n) for stmt, n in counts.most_common() if n >= threshold]
+
+# ContextVar: aislada por hilo (gthread) y por tarea de asyncio (modo ASGI)
+_current_profile: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar(
+    "uce_request_profile", default=None
+)
+
+def start_profile() -> Optional[contextvars.Token]:
+    if not PROFILING_ENABLED:
+        return None
+    return _current_profile.set(RequestProfile())
+
+def finish_profile(token: Optional[contextvars.Token], route: str, elapsed_ms: float) -> Optional[str]:
+    """
+    Cierra el perfil del request: registra en el log si corresponde y retorna
+    el valor de la cabecera Server-Timing (None si el perfilado está apagado).
+    """
+    if token is None:
+        return None
+    profile = _current_profile.get()
+    _current_profile.reset(token)
+    if profile is None:
+        return None
+
+    _log_if_needed(profile, route, elapsed_ms)
+    sql_count, mongo_count = profile.count("sql"), profile.count("mongo")
+    return ", ".join([
+        f'sql;dur={profile.total_ms("sql"):.1f};desc="{sql_count} sentencias"',
+        f'mongo;dur={profile.total_ms("mongo"):.1f};desc="{mongo_count} comandos"',
+        f"total;dur={elapsed_ms:.1f}",
+    ])
+
+def _log_if_needed(profile: RequestProfile, route: str, elapsed_ms: float) -> None:
+    for statement, times in profile.repeated(PROFILE_N_PLUS_ONE_THRESHOLD):
+        logging.warning(f"Posible N+1 en {route}: {times}x {statement[:300]}")
+
+    slow_statements = [s for s in profile.statements if s[2] >= PROFILE_SLOW_STATEMENT_MS]
+    if (elapsed_ms >= PROFILE_SLOW_REQUEST_MS or slow_statements
+            or len(profile.statements) > PROFILE_MAX_STATEMENTS):
+        top = "; ".join(
+            f"[{src} {ms:.1f}ms] {stmt[:200]}" for src, stmt, ms in profile.slowest(PROFILE_TOP_STATEMENTS)
+        )
+        logging.warning(
+            f"Request lento {route}: {elapsed_ms:.1f}ms, "
+            f"SQL {profile.count('sql')} ({profile.total_ms('sql'):.1f}ms), "
+            f"Mongo {profile.count('mongo')} ({profile.total_ms('mongo'):.1f}ms). Más lentas: {top}"
+        )
+
+# --- SQLALCHEMY ---
+
+def attach_engine(engine) -> None:
+    """Registra before/after_cursor_execute en el engine (no-op si el perfilado está apagado)."""
+    if not PROFILING_ENABLED:
+        return
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["profile_started"].pop()
+        profile = _current_profile.get()
+        if profile is not None:
+            # Texto con placeholders: el mismo SELECT con distinto id cuenta como repetido
+            profile.record("sql", " ".join(statement.split()), (time.perf_counter() - started) * 1000)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        # Sin after_cursor_execute: descartamos el inicio pendiente
+        stack = exception_context.connection.info.get("profile_started") if exception_context.connection else None
+        if stack:
+            stack.pop()
+
+# --- PYMONGO ---
+
+class MongoCommandProfiler(monitoring.CommandListener):
+    """
+    Command monitoring de PyMongo. La forma del comando (colección + campos del filtro,
+    sin valores) identifica consultas repetidas, ej. un find_one por postulación.
+    """
+
+    def started(self, event):
+        profile = _current_profile.get()
+        if profile is None:
+            return
+        command = event.command
+        collection = command.get(event.command_name)
+        filter_doc = command.get("filter") or command.get("query") or {}
+        shape = sorted(filter_doc.keys()) if isinstance(filter_doc, dict) else []
+        profile.pending_commands[event.request_id] = f"{event.command_name} {collection} {shape}"
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+    def _finish(self, event: Any) -> None:
+        profile = _current_profile.get()
+        if profile is None:
+            return
+        statement = profile.pending_commands.pop(event.request_id, None)
+        if statement is not None:
+            profile.record("mongo", statement, event.duration_micros / 1000)
+
+def mongo_listeners() -> list:
+    return [MongoCommandProfiler()] if PROFILING_ENABLED else []
+
+# --- FLASK ---
+
+def init_app(app) -> None:
+    """Abre/cierra el perfil en cada request y agrega la cabecera Server-Timing."""
+    if not PROFILING_ENABLED:
+        return
+    from flask import g, request
+
+    @app.before_request
+    def start_request_profile():
+        g.profile_token = start_profile()
+        g.profile_started = time.perf_counter()
+
+    @app.after_request
+    def finish_request_profile(response):
+        token = g.pop('profile_token', None)
+        started = g.pop('profile_started', None)
+        if token is None or started is None:
+            return response
+        route = request.url_rule.rule if request.url_rule else request.path
+        header = finish_profile(token, f"{request.method} {route}", (time.perf_counter() - started) * 1000)
+        if header:
+            response.headers['Server-Timing'] = header
+        return response
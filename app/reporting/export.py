@@ -0,0 +1,104 @@
+import io
+import csv
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+# --- EXPORTACIÓN EN STREAMING ---
+# Los datos llegan desde DAO.stream() (cursores del servidor) y se escriben por bloques:
+# la memoria usada no depende del tamaño de la tabla.
+EXPORT_BATCH_SIZE = 1000
+
+# dataset -> columnas exportadas con su tipo Arrow (para Parquet)
+EXPORT_SCHEMAS: Dict[str, List[Tuple[str, str]]] = {
+    "students": [("id", "int64"), ("name", "string"), ("email", "string"),
+                 ("gpa", "double"), ("department", "string")],
+    "applications": [("id", "int64"), ("student", "string"), ("opportunity_id", "string"),
+                     ("opportunity_title", "string"), ("company_name", "string"),
+                     ("status", "string"), ("created_at", "string")],
+}
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+def iter_csv(rows: Iterable[Dict[str, Any]], fields: List[str]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+    writer.writeheader()
+    for i, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if i % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    yield buffer.getvalue()
+
+def iter_ndjson(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row, ensure_ascii=False, default=str))
+        if len(lines) >= EXPORT_BATCH_SIZE:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+class _ChunkSink:
+    """Destino de escritura que acumula bytes hasta que el generador los entrega."""
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+def iter_parquet(rows: Iterable[Dict[str, Any]], dataset: str, row_group_size: int = 10000) -> Iterator[bytes]:
+    """Un row group de Parquet por lote; cada lote se envía apenas se escribe."""
+    # Importación local: pyarrow es pesado y solo lo usa esta exportación
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(name, pa.type_for_alias(type_name)) for name, type_name in EXPORT_SCHEMAS[dataset]])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    try:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= row_group_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                batch = []
+                yield sink.drain()
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+    finally:
+        writer.close()
+    yield sink.drain()
+
+def iter_export(rows: Iterable[Dict[str, Any]], dataset: str, fmt: str) -> Iterator[Any]:
+    fields = [name for name, _ in EXPORT_SCHEMAS[dataset]]
+    if fmt == "csv":
+        return iter_csv(rows, fields)
+    if fmt == "ndjson":
+        return iter_ndjson(rows)
+    return iter_parquet(rows, dataset)
@@ -2,78 +2,205 @@ import pandas as pd
 from fpdf import FPDF
 from app.dao.factory import UCEFactory
 import os
+import time
+import hashlib
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List
 
-def generate_combined_report() -> str:
+# --- CACHÉ DE REPORTES (direccionada por contenido) ---
+# Cada PDF se guarda con el nombre de la huella de sus datos de origen: mientras los datos
+# no cambien, se reutiliza el mismo archivo en lugar de regenerarlo.
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "uce_reports"))
+REPORT_CACHE_MAX_AGE = float(os.getenv("REPORT_CACHE_MAX_AGE", "86400"))
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+# Reporte degradado (Mongo caído, sin ofertas): se reutiliza solo por poco tiempo
+REPORT_OFFLINE_MAX_AGE = float(os.getenv("REPORT_OFFLINE_MAX_AGE", "60"))
+OFFLINE_PREFIX = "offline-"
+
+def get_source_fingerprint(factory: UCEFactory) -> str:
     """
-    Genera un PDF combinando datos de SQL y NoSQL.
-    Retorna la ruta del archivo generado.
-    Fuente: Sección 6.5 del informe.
+    Huella de los datos del reporte (Postgres + Mongo).
+    Si Mongo no responde, la huella depende solo de los estudiantes y lleva el prefijo
+    'offline-': durante una caída todos los pedidos comparten el mismo PDF degradado.
+    """
+    student_version = factory.get_student_dao().data_version()
+    opp_version = factory.get_opportunity_dao().data_version()
+    raw = f"combined|{student_version}|{opp_version if opp_version is not None else 'offline'}"
+    digest = hashlib.sha256(raw.encode()).hexdigest()[:32]
+    return digest if opp_version is not None else OFFLINE_PREFIX + digest
+
+def _is_degraded(path: str) -> bool:
+    return os.path.basename(path).startswith(f"combined-{OFFLINE_PREFIX}")
+
+def _max_age(path: str) -> float:
+    return REPORT_OFFLINE_MAX_AGE if _is_degraded(path) else REPORT_CACHE_MAX_AGE
+
+def evict_report_cache(keep: str = None) -> None:
+    """
+    Borra reportes más viejos que su edad máxima (REPORT_CACHE_MAX_AGE, o REPORT_OFFLINE_MAX_AGE
+    si son degradados) y, si sobra tamaño, los menos recientes.
     """
-    factory = UCEFactory()
-    
     try:
-        # 1. Obtener Datos SQL (Estudiantes)
-        student_dao = factory.get_student_dao()
-        students_list = student_dao.get_all()
-        # Convertir a DataFrame de Pandas
-        students_df = pd.DataFrame(students_list)
-
-        # 2. Obtener Datos Mongo (Oportunidades)
-        opp_dao = factory.get_opportunity_dao()
-        opp_list = opp_dao.get_all()
-        
-        # Aplanar estructura JSON anidada (ej. requirements)
-        # Fuente: Sección 6.5 [cite: 338]
-        if opp_list:
-            opportunities_df = pd.json_normalize(opp_list)
-        else:
-            opportunities_df = pd.DataFrame()
+        entries = []
+        for name in os.listdir(REPORT_CACHE_DIR):
+            if not name.endswith(".pdf"):
+                continue
+            path = os.path.join(REPORT_CACHE_DIR, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+    except OSError:
+        return
 
-        # 3. Generar PDF con FPDF
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", 'B', 16)
-        pdf.cell(200, 10, txt="Reporte Integrado UCE (Poliglota)", ln=1, align="C")
-        
-        # Sección SQL
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(200, 10, txt=f"Estudiantes Registrados (Origen: PostgreSQL)", ln=1)
-        pdf.set_font("Arial", size=10)
-        
-        if not students_df.empty:
-            for index, row in students_df.iterrows():
-                line = f"ID: {row['id']} | {row['name']} | GPA: {row['gpa']} | Dept: {row['department']}"
-                pdf.cell(0, 10, txt=line, ln=1)
+    now = time.time()
+    entries.sort()  # Más antiguos primero
+    total = sum(size for _, size, _ in entries)
+    for mtime, size, path in entries:
+        if path == keep:
+            continue
+        if now - mtime > _max_age(path) or total > REPORT_CACHE_MAX_BYTES:
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+# --- RENDERIZADO DEL PDF ---
+# (clave, encabezado, ancho en mm). El ancho útil de una página A4 es 190 mm.
+STUDENT_COLUMNS = [("id", "ID", 20), ("name", "Nombre", 75), ("gpa", "GPA", 20), ("department", "Departamento", 75)]
+OPPORTUNITY_COLUMNS = [("title", "Título", 110), ("company_name", "Empresa", 80)]
+ROW_HEIGHT = 6
+RENDER_CHUNK_SIZE = 2000
+# Ancho aproximado de un carácter en Arial 9 (mm), para recortar sin medir cada texto
+CHAR_WIDTH_MM = 1.9
+
+def _chunked(records: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _format_chunk(records: List[Dict[str, Any]], columns) -> List[tuple]:
+    """
+    Formatea un lote columna por columna (operaciones vectorizadas de pandas)
+    y retorna las filas ya como tuplas de texto listas para imprimir.
+    """
+    df = pd.DataFrame.from_records(records, columns=[key for key, _, _ in columns])
+    formatted = []
+    for key, _, width in columns:
+        if key == "gpa":
+            text = pd.to_numeric(df[key], errors="coerce").round(2).astype("string")
         else:
-            pdf.cell(0, 10, txt="No hay estudiantes registrados.", ln=1)
+            text = df[key].astype("string")
+        text = (
+            text.fillna("N/A")
+            .str.slice(0, int(width / CHAR_WIDTH_MM))
+            # FPDF 1.7 solo admite latin-1: reemplazamos lo que no se pueda codificar
+            .str.encode("latin-1", errors="replace")
+            .str.decode("latin-1")
+        )
+        formatted.append(text.tolist())
+    return list(zip(*formatted))
+
+def _table_header(pdf: FPDF, columns) -> None:
+    pdf.set_font("Arial", 'B', 9)
+    pdf.set_fill_color(230, 230, 230)
+    for _, label, width in columns:
+        pdf.cell(width, ROW_HEIGHT + 1, txt=label, border=1, fill=True)
+    pdf.ln()
+    pdf.set_font("Arial", size=9)
 
-        pdf.ln(10) # Salto de línea
+def _render_table(pdf: FPDF, records: Iterable[Dict[str, Any]], columns, empty_text: str) -> int:
+    """Dibuja la tabla por lotes; repite el encabezado en cada salto de página."""
+    rendered = 0
+    for chunk in _chunked(records, RENDER_CHUNK_SIZE):
+        if rendered == 0:
+            _table_header(pdf, columns)
+        for row in _format_chunk(chunk, columns):
+            if pdf.get_y() + ROW_HEIGHT > pdf.page_break_trigger:
+                pdf.add_page()
+                _table_header(pdf, columns)
+            for text, (_, _, width) in zip(row, columns):
+                pdf.cell(width, ROW_HEIGHT, txt=text, border=1)
+            pdf.ln()
+        rendered += len(chunk)
 
-        # Sección NoSQL
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(200, 10, txt=f"Oportunidades Disponibles (Origen: MongoDB)", ln=1)
+    if rendered == 0:
         pdf.set_font("Arial", size=10)
+        pdf.cell(0, 10, txt=empty_text, ln=1)
+    return rendered
 
-        if not opportunities_df.empty:
-            for index, row in opportunities_df.iterrows():
-                # Manejo seguro de columnas dinámicas
-                title = row.get('title', 'N/A')
-                company = row.get('company_name', 'N/A')
-                # Pandas usa NaN para valores faltantes, lo convertimos a string
-                pdf.cell(0, 10, txt=f"* {title} ({company})", ln=1)
-        else:
-            pdf.cell(0, 10, txt="No hay oportunidades registradas.", ln=1)
+def render_combined_pdf(students: Iterable[Dict[str, Any]], opportunities: Iterable[Dict[str, Any]]) -> FPDF:
+    """Construye el PDF a partir de iterables de filas (no necesita listas completas en memoria)."""
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    pdf.set_font("Arial", 'B', 16)
+    pdf.cell(0, 10, txt="Reporte Integrado UCE (Poliglota)", ln=1, align="C")
 
-        
-        # Guardar archivo
-        # CAMBIO: Usamos ruta relativa o absoluta segura (/tmp)
-        # Como estamos en /code, guardar en "reporte_uce.pdf" lo deja en la raíz del proyecto
-        output_path = "reporte_uce.pdf" 
-        
-        pdf.output(output_path)
+    # Sección SQL
+    pdf.set_font("Arial", 'B', 12)
+    pdf.cell(0, 10, txt="Estudiantes Registrados (Origen: PostgreSQL)", ln=1)
+    _render_table(pdf, students, STUDENT_COLUMNS, "No hay estudiantes registrados.")
+
+    pdf.ln(10) # Salto de línea
+
+    # Sección NoSQL
+    pdf.set_font("Arial", 'B', 12)
+    pdf.cell(0, 10, txt="Oportunidades Disponibles (Origen: MongoDB)", ln=1)
+    _render_table(pdf, opportunities, OPPORTUNITY_COLUMNS, "No hay oportunidades registradas.")
+    return pdf
+
+def generate_combined_report(factory: UCEFactory = None) -> str:
+    """
+    Genera (o reutiliza) un PDF combinando datos de SQL y NoSQL.
+    Retorna la ruta absoluta del archivo en la caché de reportes.
+    Si se recibe la fábrica del request, se reutiliza su sesión (y no se cierra aquí).
+    Fuente: Sección 6.5 del informe.
+    """
+    owns_factory = factory is None
+    if owns_factory:
+        factory = UCEFactory()
+    
+    try:
+        os.makedirs(REPORT_CACHE_DIR, exist_ok=True)
+        output_path = os.path.join(REPORT_CACHE_DIR, f"combined-{get_source_fingerprint(factory)}.pdf")
+        if os.path.exists(output_path) and time.time() - os.path.getmtime(output_path) <= _max_age(output_path):
+            # Mismos datos de origen: reutilizamos el PDF. El degradado no se refresca:
+            # vence REPORT_OFFLINE_MAX_AGE después de generado y se vuelve a intentar con Mongo
+            if not _is_degraded(output_path):
+                os.utime(output_path)
+            return output_path
+
+        # 1. Datos SQL (Estudiantes) y 2. Datos Mongo (Oportunidades):
+        # se recorren con cursores por lotes, proyectando solo las columnas impresas.
+        students = factory.get_student_dao().stream(fields=[c[0] for c in STUDENT_COLUMNS])
+        opportunities = factory.get_opportunity_dao().stream(fields=[c[0] for c in OPPORTUNITY_COLUMNS])
+
+        # 3. Generar PDF con FPDF
+        pdf = render_combined_pdf(students, opportunities)
+
+        # Guardar archivo de forma atómica: temporal en el mismo directorio + rename.
+        # Un request concurrente nunca ve (ni descarga) un PDF a medio escribir.
+        fd, tmp_path = tempfile.mkstemp(dir=REPORT_CACHE_DIR, suffix=".tmp")
+        os.close(fd)
+        try:
+            pdf.output(tmp_path)
+            os.replace(tmp_path, output_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        evict_report_cache(keep=output_path)
         
         # IMPORTANTE: Devolver la ruta absoluta para que Flask la encuentre
         return os.path.abspath(output_path)
 
     finally:
-        factory.close()
\ No newline at end of file
+        if owns_factory:
+            factory.close()
\ No newline at end of file
@@ -0,0 +1,102 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+
+from app.cache import get_cache
+
+# --- COLA DE REPORTES EN SEGUNDO PLANO ---
+# Los PDFs se generan en un pool de hilos del worker, fuera del ciclo del request.
+# El estado de cada trabajo vive en la caché de la app. Con varios workers debe ser compartida
+# (CACHE_REDIS_URL): el sondeo del estado puede llegar a cualquier worker o réplica detrás de nginx.
+# Con un solo proceso (desarrollo, gunicorn sin Redis) basta la caché local.
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+REPORT_JOB_TTL = float(os.getenv("REPORT_JOB_TTL", "3600"))
+# Tiempo máximo de un trabajo: si el worker que lo generaba murió, pasado este plazo se encola otro
+REPORT_JOB_MAX_SECONDS = float(os.getenv("REPORT_JOB_MAX_SECONDS", "600"))
+# Procesos web que atienden requests: lo exporta app/gunicorn.conf.py; fuera de gunicorn es uno
+WEB_WORKERS = int(os.getenv("UCE_WEB_WORKERS", "1"))
+# Estado local permitido: automático con un solo worker; REPORT_JOBS_ALLOW_LOCAL=true lo fuerza
+REPORT_JOBS_ALLOW_LOCAL = (os.getenv("REPORT_JOBS_ALLOW_LOCAL", "false").lower() in ("1", "true", "yes")
+                           or WEB_WORKERS <= 1)
+
+# Estado, no caché: el sondeo de los trabajos no cuenta en las métricas de hit ratio
+report_jobs = get_cache("report_jobs", maxsize=256, ttl=REPORT_JOB_TTL, instrumented=False)
+
+_executor = None
+_executor_pid = None
+_lock = threading.Lock()
+
+class ReportQueueUnavailable(Exception):
+    """Varios workers sin estado compartido (falta CACHE_REDIS_URL): el sondeo daría 404."""
+
+def _get_executor() -> ThreadPoolExecutor:
+    # Se crea después del fork: los hilos no sobreviven al fork de gunicorn
+    global _executor, _executor_pid
+    with _lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=REPORT_WORKERS, thread_name_prefix="report")
+            _executor_pid = os.getpid()
+        return _executor
+
+def _active_key(kind: str) -> str:
+    return f"active:{kind}"
+
+def submit_report_job(kind: str = "combined") -> Dict[str, Any]:
+    """
+    Encola la generación del reporte y retorna el estado del trabajo.
+    Si ya hay un trabajo idéntico pendiente o en curso (en cualquier worker), se reutiliza.
+    """
+    if not report_jobs.shared and not REPORT_JOBS_ALLOW_LOCAL:
+        raise ReportQueueUnavailable(f"Con {WEB_WORKERS} workers los reportes requieren CACHE_REDIS_URL")
+
+    job_id = uuid.uuid4().hex
+    # De-duplicación atómica entre workers: solo uno gana la clave del tipo de reporte
+    if not report_jobs.add(_active_key(kind), job_id, ttl=REPORT_JOB_MAX_SECONDS):
+        active_id = report_jobs.get(_active_key(kind))
+        job = report_jobs.get(active_id) if active_id else None
+        if job and job["status"] in ("pending", "running"):
+            return job
+        # El trabajo activo ya terminó (o expiró): se libera la clave y se reintenta una vez
+        report_jobs.delete(_active_key(kind))
+        if not report_jobs.add(_active_key(kind), job_id, ttl=REPORT_JOB_MAX_SECONDS):
+            active_id = report_jobs.get(_active_key(kind))
+            job = report_jobs.get(active_id) if active_id else None
+            if job:
+                return job
+            raise ReportQueueUnavailable("No se pudo registrar el trabajo del reporte")
+
+    job = {"id": job_id, "kind": kind, "status": "pending", "created_at": time.time()}
+    report_jobs.set(job_id, job)
+    _get_executor().submit(_run_job, job_id, kind)
+    return job
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    job = report_jobs.get(job_id)
+    # Un trabajo que nunca terminó (worker reiniciado) no debe quedar "en curso" para siempre
+    if job and job["status"] in ("pending", "running") and time.time() - job["created_at"] > REPORT_JOB_MAX_SECONDS:
+        job = {**job, "status": "error", "error": "El trabajo se interrumpió; vuelva a solicitar el reporte"}
+    return job
+
+def _run_job(job_id: str, kind: str) -> None:
+    job = dict(report_jobs.get(job_id) or {"id": job_id, "kind": kind, "created_at": time.time()})
+    job["status"] = "running"
+    report_jobs.set(job_id, job)
+    try:
+        # Importación diferida: pandas y fpdf solo se cargan en el worker que genera un reporte
+        from app.reporting.generator import generate_combined_report
+        # Sin fábrica del request: el hilo abre y cierra su propia sesión
+        job["path"] = generate_combined_report()
+        job["status"] = "done"
+    except Exception as e:
+        logging.error(f"Error generando reporte {job_id}: {e}")
+        job["status"] = "error"
+        job["error"] = str(e)
+    finally:
+        job["finished_at"] = time.time()
+        report_jobs.set(job_id, job)
+        if report_jobs.get(_active_key(kind)) == job_id:
+            report_jobs.delete(_active_key(kind))
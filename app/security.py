@@ -0,0 +1,149 @@
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from app.cache import get_cache
+
+# --- HASHING DE CONTRASEÑAS FUERA DEL WORKER ---
+# scrypt/pbkdf2 consumen CPU a propósito. Se ejecutan en un pool de procesos acotado para
+# que un pico de logins no sature los workers web; con HASH_WORKERS=0 se hace en línea.
+PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", "2"))
+# Máximo de hashes en espera por worker web antes de rechazar (503) en lugar de encolar
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", str(max(HASH_WORKERS, 1) * 4)))
+HASH_TIMEOUT = float(os.getenv("HASH_TIMEOUT", "10"))
+
+class HashingBusyError(Exception):
+    """El pool de hashing está saturado: el request debe reintentarse más tarde."""
+    pass
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+_pending = threading.BoundedSemaphore(HASH_MAX_PENDING)
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    global _executor, _executor_pid
+    if HASH_WORKERS <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            # 'spawn': procesos hijos limpios, sin heredar hilos ni conexiones del worker
+            context = multiprocessing.get_context(os.getenv("HASH_MP_CONTEXT", "spawn"))
+            _executor = ProcessPoolExecutor(max_workers=HASH_WORKERS, mp_context=context)
+            _executor_pid = os.getpid()
+        return _executor
+
+def shutdown_hash_pool() -> None:
+    """Termina el pool de hashing del proceso actual (ej: el maestro tras el arranque)."""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is not None and _executor_pid == os.getpid():
+            _executor.shutdown(wait=True)
+        _executor = None
+        _executor_pid = None
+
+def _reset_executor(broken: ProcessPoolExecutor) -> None:
+    # Un hijo murió (OOM, kill): el pool queda inservible y se recrea en la próxima llamada
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+            _executor_pid = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+def _run(fn, *args):
+    executor = _get_executor()
+    if executor is None:
+        return fn(*args)
+    # Sin espera: si ya hay HASH_MAX_PENDING en curso se responde 503 de inmediato
+    if not _pending.acquire(blocking=False):
+        raise HashingBusyError("Servicio de autenticación saturado, intente más tarde.")
+    try:
+        future = executor.submit(fn, *args)
+        try:
+            return future.result(timeout=HASH_TIMEOUT)
+        except FuturesTimeoutError:
+            future.cancel()
+            raise HashingBusyError("Servicio de autenticación saturado, intente más tarde.")
+    except BrokenProcessPool as e:
+        logging.error(f"Pool de hashing caído, se recrea: {e}")
+        _reset_executor(executor)
+        raise HashingBusyError("Servicio de autenticación no disponible, intente más tarde.")
+    finally:
+        _pending.release()
+
+def hash_password(password: str) -> str:
+    return _run(generate_password_hash, password, PASSWORD_HASH_METHOD)
+
+def verify_password(password_hash: str, password: str) -> bool:
+    return _run(check_password_hash, password_hash, password)
+
+@lru_cache(maxsize=1)
+def _current_hash_prefix() -> str:
+    # Werkzeug guarda el método expandido ("pbkdf2" -> "pbkdf2:sha256:600000"):
+    # se toma el prefijo de un hash real, calculado una sola vez por proceso
+    return generate_password_hash("", PASSWORD_HASH_METHOD).split("$", 1)[0]
+
+def needs_rehash(password_hash: str) -> bool:
+    """True si el hash se generó con parámetros distintos a PASSWORD_HASH_METHOD."""
+    return password_hash.split("$", 1)[0] != _current_hash_prefix()
+
+# --- LIMITACIÓN DE INTENTOS DE LOGIN ---
+# Se consulta ANTES de calcular el hash: el tráfico de fuerza bruta no gasta CPU de hashing.
+# Ventana fija: un contador por clave y ventana, incrementado de forma atómica (INCR en Redis),
+# así los workers concurrentes no pierden fallos.
+LOGIN_WINDOW_SECONDS = float(os.getenv("LOGIN_WINDOW_SECONDS", "300"))
+# Primero la IP; luego la cuenta desde esa IP (límite bajo, solo bloquea a ese cliente) y la
+# cuenta en total (límite alto, fuerza bruta distribuida). Así nadie bloquea una cuenta ajena
+# con unos pocos fallos, y rotar IPs sigue acotado por el límite global de la cuenta.
+LOGIN_MAX_ATTEMPTS_PER_IP = int(os.getenv("LOGIN_MAX_ATTEMPTS_PER_IP", "20"))
+LOGIN_MAX_ATTEMPTS_PER_ACCOUNT = int(os.getenv("LOGIN_MAX_ATTEMPTS_PER_ACCOUNT", "5"))
+LOGIN_MAX_ATTEMPTS_PER_ACCOUNT_GLOBAL = int(os.getenv("LOGIN_MAX_ATTEMPTS_PER_ACCOUNT_GLOBAL", "50"))
+
+# Contadores, no caché: sin métricas de hit ratio
+login_attempts = get_cache("login_attempts", maxsize=65536, ttl=LOGIN_WINDOW_SECONDS, instrumented=False)
+
+def _window(now: float) -> Tuple[int, float]:
+    """Número de la ventana actual y el instante en que termina."""
+    window = int(now // LOGIN_WINDOW_SECONDS)
+    return window, (window + 1) * LOGIN_WINDOW_SECONDS
+
+def _account(email: str) -> str:
+    return (email or '').strip().lower()
+
+def _keys(email: str, ip: str, window: int) -> Tuple[Tuple[str, int], ...]:
+    # El orden importa: la IP se evalúa antes que la cuenta
+    return (
+        (f"ip:{ip}:{window}", LOGIN_MAX_ATTEMPTS_PER_IP),
+        (f"account:{_account(email)}:ip:{ip}:{window}", LOGIN_MAX_ATTEMPTS_PER_ACCOUNT),
+        (f"account:{_account(email)}:{window}", LOGIN_MAX_ATTEMPTS_PER_ACCOUNT_GLOBAL),
+    )
+
+def login_retry_after(email: str, ip: str) -> int:
+    """Segundos que faltan para poder reintentar (0 = permitido)."""
+    now = time.time()
+    window, reset_at = _window(now)
+    for key, limit in _keys(email, ip, window):
+        if (login_attempts.get(key) or 0) >= limit:
+            return int(reset_at - now) + 1
+    return 0
+
+def register_login_failure(email: str, ip: str) -> None:
+    now = time.time()
+    window, reset_at = _window(now)
+    for key, _ in _keys(email, ip, window):
+        login_attempts.incr(key, ttl=reset_at - now)
+
+def register_login_success(email: str, ip: str) -> None:
+    # Solo se limpia la cuenta desde esta IP: la IP conserva sus fallos contra otras cuentas
+    # y el total de la cuenta, los fallos de otros clientes
+    window, _ = _window(time.time())
+    login_attempts.delete(_keys(email, ip, window)[1][0])
@@ -0,0 +1,263 @@
+"""
+Prueba de carga de la API (p50/p95/p99 y throughput) con detección de regresiones.
+
+Dos modos:
+  --mode client : la app Flask real en este proceso, vía app.test_client() (sin red).
+  --mode http   : generador de carga HTTP contra un servidor levantado (nginx/gunicorn).
+
+Endpoints medidos: /api/opportunities, /api/my-applications, /api/applications/all,
+/api/stats y /api/reports/combined (encolar + esperar a que el trabajo termine).
+Se autentica con las cuentas que crea benchmarks.seed.
+
+Uso (desde la raíz del repositorio, con datos sembrados por benchmarks.seed):
+    python -m benchmarks.api_load --mode client --requests 500 --concurrency 8
+    python -m benchmarks.api_load --mode http --base-url http://localhost --save-baseline
+    python -m benchmarks.api_load --mode http --base-url http://localhost   # compara con la línea base
+
+Con --mongomock (solo modo client; pip install mongomock) Mongo se reemplaza por uno en memoria y se
+siembra en el mismo proceso (--seed-opportunities); PostgreSQL sigue siendo real porque
+los DAOs usan SQL propio de Postgres (ON CONFLICT, = ANY, xmax).
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.seed import ADMIN_EMAIL, STUDENT_EMAIL, BENCH_PASSWORD
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# nombre -> (rol con el que se autentica, método, ruta)
+ENDPOINTS: Dict[str, Tuple[Optional[str], str, str]] = {
+    "opportunities": (None, "GET", "/api/opportunities?limit=50"),
+    "my_applications": ("student", "GET", "/api/my-applications?limit=50"),
+    "applications_all": ("admin", "GET", "/api/applications/all?limit=50"),
+    "stats": ("admin", "GET", "/api/stats"),
+    "reports_combined": ("admin", "POST", "/api/reports/combined"),
+}
+CREDENTIALS = {"admin": ADMIN_EMAIL, "student": STUDENT_EMAIL}
+REPORT_POLL_INTERVAL = 0.2
+REPORT_TIMEOUT = 300
+
+# --- CLIENTES ---
+
+class TestClientSession:
+    """Sesión sobre el test client de Flask (la app completa, sin servidor ni red)."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def login(self, email: str) -> None:
+        # Login correcto = redirección al dashboard; incorrecto = 200 con el formulario
+        response = self.client.post("/login", data={"email": email, "password": BENCH_PASSWORD})
+        if response.status_code != 302:
+            raise RuntimeError(f"Login falló para {email}: {response.status_code}")
+
+    def request(self, method: str, path: str) -> Tuple[int, bytes]:
+        response = self.client.open(path, method=method)
+        return response.status_code, response.data
+
+
+class HttpSession:
+    """Sesión HTTP con cookies (solo biblioteca estándar)."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+
+    def login(self, email: str) -> None:
+        data = urllib.parse.urlencode({"email": email, "password": BENCH_PASSWORD}).encode()
+        request = urllib.request.Request(self.base_url + "/login", data=data, method="POST")
+        try:
+            with self.opener.open(request, timeout=60) as response:
+                # urllib sigue la redirección: si terminamos en /login, las credenciales fallaron
+                failed = "/login" in response.geturl()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            failed, status = True, e.code
+        if failed:
+            raise RuntimeError(f"Login falló para {email}: {status}")
+
+    def request(self, method: str, path: str) -> Tuple[int, bytes]:
+        return self._open(method, path, b"" if method == "POST" else None)
+
+    def _open(self, method: str, path: str, data: Optional[bytes]) -> Tuple[int, bytes]:
+        request = urllib.request.Request(self.base_url + path, data=data, method=method)
+        try:
+            with self.opener.open(request, timeout=60) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+# --- MEDICIÓN ---
+
+def call_endpoint(session, name: str) -> int:
+    """Ejecuta una llamada completa; el reporte espera hasta que el trabajo termina."""
+    _, method, path = ENDPOINTS[name]
+    status, body = session.request(method, path)
+    if name != "reports_combined" or status != 202:
+        return status
+
+    job = json.loads(body)
+    deadline = time.monotonic() + REPORT_TIMEOUT
+    while time.monotonic() < deadline:
+        status, body = session.request("GET", job["status_url"])
+        state = json.loads(body).get("status") if status == 200 else "error"
+        if state == "done":
+            return 200
+        if state == "error":
+            return 500
+        time.sleep(REPORT_POLL_INTERVAL)
+    return 504
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Percentil por rango más cercano (valores ya ordenados)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+def run_endpoint(make_session, name: str, requests: int, concurrency: int, warmup: int) -> Dict[str, float]:
+    role = ENDPOINTS[name][0]
+    local = threading.local()
+
+    def session():
+        # Una sesión (cookies + login) por hilo, como navegadores independientes
+        if not hasattr(local, "session"):
+            local.session = make_session()
+            if role:
+                local.session.login(CREDENTIALS[role])
+        return local.session
+
+    def one_call(_):
+        start = time.perf_counter()
+        status = call_endpoint(session(), name)
+        return time.perf_counter() - start, status
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one_call, range(warmup)))
+        start = time.perf_counter()
+        results = list(pool.map(one_call, range(requests)))
+        wall = time.perf_counter() - start
+
+    latencies = sorted(elapsed for elapsed, _ in results)
+    errors = sum(1 for _, status in results if status >= 400)
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "throughput_rps": requests / wall if wall else 0.0,
+    }
+
+# --- LÍNEA BASE ---
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float) -> List[str]:
+    """Regresión: p95 más alto o throughput más bajo que la línea base, fuera de la tolerancia."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']:.1f}ms > base {base['p95_ms']:.1f}ms")
+        if current["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {current['throughput_rps']:.1f}/s < base {base['throughput_rps']:.1f}/s")
+        if current["errors"] > base.get("errors", 0):
+            regressions.append(f"{name}: {current['errors']} errores (base {base.get('errors', 0)})")
+    return regressions
+
+def print_table(results: Dict[str, Dict[str, float]]) -> None:
+    print(f"{'endpoint':<18}{'req':>7}{'err':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for name, r in results.items():
+        print(f"{name:<18}{r['requests']:>7}{r['errors']:>6}{r['p50_ms']:>10.1f}"
+              f"{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['throughput_rps']:>10.1f}")
+
+# --- MODO CLIENT ---
+
+def use_mongomock(count: int) -> None:
+    """Reemplaza el MongoClient compartido por uno de mongomock y siembra ofertas en él."""
+    import random
+    import mongomock
+    import app.db
+    import app.dao.factory
+    from benchmarks.seed import seed_opportunities
+
+    client = mongomock.MongoClient()
+    app.db.get_mongo_client = app.dao.factory.get_mongo_client = lambda uri=None: client
+    seed_opportunities(client["ucedb"]["opportunities"], count, random.Random(42))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mode", choices=["client", "http"], default="client")
+    parser.add_argument("--base-url", default="http://localhost")
+    parser.add_argument("--endpoints", nargs="+", choices=list(ENDPOINTS), default=list(ENDPOINTS))
+    parser.add_argument("--requests", type=int, default=300, help="Requests medidos por endpoint")
+    parser.add_argument("--report-requests", type=int, default=10,
+                        help="Requests para /api/reports/combined (cada uno espera el PDF)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--mongomock", action="store_true", help="Mongo en memoria (solo --mode client)")
+    parser.add_argument("--seed-opportunities", type=int, default=5000)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Guarda estos resultados como línea base")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Margen antes de marcar regresión (0.2 = 20%%)")
+    parser.add_argument("--output", help="Archivo JSON con los resultados")
+    args = parser.parse_args()
+
+    if args.mode == "client":
+        if args.mongomock:
+            use_mongomock(args.seed_opportunities)
+        from app.main import create_app
+        app = create_app()
+        make_session = lambda: TestClientSession(app)
+    else:
+        make_session = lambda: HttpSession(args.base_url)
+
+    results = {}
+    for name in args.endpoints:
+        requests = args.report_requests if name == "reports_combined" else args.requests
+        warmup = min(args.warmup, requests)
+        print(f"Midiendo {name} ({requests} requests, concurrencia {args.concurrency})...")
+        results[name] = run_endpoint(make_session, name, requests, args.concurrency, warmup)
+    print_table(results)
+
+    document = {"mode": args.mode, "concurrency": args.concurrency, "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"Línea base guardada en {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("Sin línea base: ejecute con --save-baseline para crearla.")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if (baseline.get("mode"), baseline.get("concurrency")) != (args.mode, args.concurrency):
+        print("Aviso: la línea base se midió con otro modo o concurrencia.")
+    regressions = compare(results, baseline["results"], args.tolerance)
+    if regressions:
+        print("REGRESIONES:")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    print("Sin regresiones respecto a la línea base.")
+
+if __name__ == "__main__":
+    main()
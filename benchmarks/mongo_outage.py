@@ -0,0 +1,51 @@
+"""
+Costo por request de una caída de Mongo (circuit breaker + timeout adaptativo).
+
+Apunta el DAO real a un Mongo inalcanzable y mide la latencia de get_page desde varios
+hilos: los primeros fallos abren el circuito y el resto debe responder el fallback en
+milisegundos. Sin servidor ni datos: solo necesita las dependencias de la app.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.mongo_outage --requests 200 --threads 8
+    CACHE_REDIS_URL=redis://localhost:6379/0 python -m benchmarks.mongo_outage   # estado compartido
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pymongo import MongoClient
+
+from app.db import MONGO_CLIENT_OPTIONS
+from app.dao.mongo_impl import MongoOpportunityDAO, db_breaker, opportunity_cache
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--uri", default="mongodb://127.0.0.1:1/", help="Mongo inalcanzable")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    dao = MongoOpportunityDAO(MongoClient(args.uri, connect=False, **MONGO_CLIENT_OPTIONS))
+    opportunity_cache.clear()
+
+    def one_call(i):
+        start = time.perf_counter()
+        # Páginas distintas: ninguna respuesta sale de la caché
+        dao.get_page(limit=10 + i)
+        return (time.perf_counter() - start) * 1000, db_breaker.current_state
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        results = list(pool.map(one_call, range(args.requests)))
+    wall = time.perf_counter() - start
+
+    latencies = sorted(ms for ms, _ in results)
+    rejected = sum(1 for _, state in results if state != "closed")
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))]
+    print(f"requests={args.requests} hilos={args.threads} total={wall:.2f}s")
+    print(f"p50={pct(50):.2f}ms p95={pct(95):.2f}ms p99={pct(99):.2f}ms máx={latencies[-1]:.2f}ms")
+    print(f"con circuito abierto: {rejected}  estado final: {db_breaker.current_state}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark del renderizado del reporte combinado (sin bases de datos).
+
+Compara la implementación anterior (listas completas + json_normalize + iterrows)
+con la actual (lotes desde iteradores + formato vectorizado + tabla con saltos de página).
+
+Uso (desde la raíz del repositorio, con las dependencias de app/requirements.txt):
+    python -m benchmarks.report_render --students 100000 --opportunities 2000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+from fpdf import FPDF
+
+from app.reporting.generator import render_combined_pdf
+
+DEPARTMENTS = ["Ingeniería en Sistemas", "Ingeniería Civil", "Computación", "Diseño Industrial", "Mecánica"]
+
+def fake_students(n: int):
+    rnd = random.Random(42)
+    for i in range(1, n + 1):
+        yield {
+            "id": i,
+            "name": f"Estudiante {i}",
+            "email": f"estudiante{i}@uce.edu.ec",
+            "gpa": round(rnd.uniform(6, 10), 2),
+            "department": rnd.choice(DEPARTMENTS),
+        }
+
+def fake_opportunities(n: int):
+    rnd = random.Random(7)
+    for i in range(n):
+        yield {
+            "id": f"{i:024x}",
+            "title": f"Pasantía {i}",
+            "company_name": f"Empresa {i % 300}",
+            "description": "Oferta generada para benchmark",
+            "requirements": {"skills": ["Python", "SQL"], "nivel": rnd.randint(1, 5), "remoto": bool(i % 2)},
+        }
+
+def legacy_render(students_list, opp_list) -> FPDF:
+    """Copia del renderizado original (previo a la optimización), como línea base."""
+    students_df = pd.DataFrame(students_list)
+    opportunities_df = pd.json_normalize(opp_list) if opp_list else pd.DataFrame()
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", 'B', 16)
+    pdf.cell(200, 10, txt="Reporte Integrado UCE (Poliglota)", ln=1, align="C")
+    pdf.set_font("Arial", size=10)
+    for index, row in students_df.iterrows():
+        line = f"ID: {row['id']} | {row['name']} | GPA: {row['gpa']} | Dept: {row['department']}"
+        pdf.cell(0, 10, txt=line, ln=1)
+    pdf.ln(10)
+    for index, row in opportunities_df.iterrows():
+        pdf.cell(0, 10, txt=f"* {row.get('title', 'N/A')} ({row.get('company_name', 'N/A')})", ln=1)
+    return pdf
+
+def measure(label: str, build):
+    path = os.path.join(tempfile.gettempdir(), f"bench_{label}.pdf")
+    tracemalloc.start()
+    start = time.perf_counter()
+    pdf = build()
+    pdf.output(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = os.path.getsize(path)
+    os.remove(path)
+    print(f"{label:<8} tiempo={elapsed:8.2f}s  memoria_pico={peak / 2**20:8.1f} MiB  pdf={size / 2**20:6.1f} MiB")
+    return elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--opportunities", type=int, default=2_000)
+    args = parser.parse_args()
+
+    print(f"Estudiantes: {args.students}  Oportunidades: {args.opportunities}")
+    # El legado recibía listas completas (get_all); el actual consume iteradores (stream)
+    before = measure("antes", lambda: legacy_render(
+        list(fake_students(args.students)), list(fake_opportunities(args.opportunities))))
+    after = measure("despues", lambda: render_combined_pdf(
+        fake_students(args.students),
+        ({"title": o["title"], "company_name": o["company_name"]} for o in fake_opportunities(args.opportunities))))
+    print(f"Mejora: {before[0] / after[0]:.1f}x tiempo, {before[1] / max(after[1], 1):.1f}x memoria pico")
+
+if __name__ == "__main__":
+    main()
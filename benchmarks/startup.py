@@ -0,0 +1,91 @@
+"""
+Tiempo de importación y memoria (RSS) de un worker al cargar la aplicación.
+
+Cada medición corre en un intérprete nuevo: importa app.main, crea la app
+(create_app() si existe) y reporta segundos, RSS y si pandas/fpdf quedaron cargados.
+Con --compare REF mide además otra versión del repositorio (git worktree temporal),
+ej. el commit anterior a la carga diferida, para comparar antes / después.
+
+Uso (desde la raíz del repositorio, con las dependencias de app/requirements.txt):
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --runs 5 --compare HEAD~1
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Se ejecuta en el intérprete hijo: no debe depender de nada de este módulo
+PROBE = r"""
+import json, sys, time
+start = time.perf_counter()
+import app.main as main
+imported = time.perf_counter()
+if hasattr(main, "create_app"):
+    main.create_app()
+created = time.perf_counter()
+rss_kb = 0
+with open("/proc/self/status") as f:
+    for line in f:
+        if line.startswith("VmRSS:"):
+            rss_kb = int(line.split()[1])
+print(json.dumps({
+    "import_s": imported - start,
+    "total_s": created - start,
+    "rss_mb": rss_kb / 1024,
+    "modules": len(sys.modules),
+    "pandas": "pandas" in sys.modules,
+    "fpdf": "fpdf" in sys.modules,
+}))
+"""
+
+def measure(root: str, runs: int) -> dict:
+    env = dict(os.environ, PYTHONPATH=root)
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", PROBE], cwd=root, env=env,
+                             capture_output=True, text=True, check=True)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    # Mediana: la primera importación paga la caché de disco del sistema operativo
+    return {
+        "import_s": statistics.median(s["import_s"] for s in samples),
+        "total_s": statistics.median(s["total_s"] for s in samples),
+        "rss_mb": statistics.median(s["rss_mb"] for s in samples),
+        "modules": samples[-1]["modules"],
+        "pandas": samples[-1]["pandas"],
+        "fpdf": samples[-1]["fpdf"],
+    }
+
+def print_row(label: str, r: dict) -> None:
+    print(f"{label:<12}{r['import_s'] * 1000:>11.0f}{r['total_s'] * 1000:>11.0f}{r['rss_mb']:>10.1f}"
+          f"{r['modules']:>9}{str(r['pandas']):>8}{str(r['fpdf']):>7}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--compare", metavar="REF", help="Otra versión (commit/rama) a medir")
+    args = parser.parse_args()
+
+    results = {"actual": measure(REPO_ROOT, args.runs)}
+    if args.compare:
+        worktree = tempfile.mkdtemp(prefix="uce-startup-")
+        try:
+            subprocess.run(["git", "worktree", "add", "--detach", worktree, args.compare],
+                           cwd=REPO_ROOT, check=True, capture_output=True)
+            results[args.compare] = measure(worktree, args.runs)
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=REPO_ROOT, capture_output=True)
+            shutil.rmtree(worktree, ignore_errors=True)
+
+    print(f"{'versión':<12}{'import ms':>11}{'total ms':>11}{'RSS MB':>10}{'módulos':>9}{'pandas':>8}{'fpdf':>7}")
+    for label, r in results.items():
+        print_row(label, r)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Base de datos de prueba: SQLite en memoria, o TEST_DATABASE_URL para un PostgreSQL real.
+"""
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.sql import Base
+
+# SQL propio de PostgreSQL (ON CONFLICT, xmax, = ANY): solo corre con TEST_DATABASE_URL
+requires_postgres = pytest.mark.skipif(
+    not os.getenv("TEST_DATABASE_URL"), reason="requiere PostgreSQL (TEST_DATABASE_URL)")
+
+@pytest.fixture
+def engine():
+    url = os.getenv("TEST_DATABASE_URL")
+    if url:
+        engine = create_engine(url)
+    else:
+        engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+@pytest.fixture
+def session(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+@pytest.fixture
+def breaker(monkeypatch):
+    """db_breaker real con un backend en memoria propio del test, siempre cerrado al empezar."""
+    from app.breaker import MemoryBreakerStorage, STATE_CLOSED
+    from app.dao.mongo_impl import db_breaker
+
+    monkeypatch.setattr(db_breaker, "storage", MemoryBreakerStorage())
+    monkeypatch.setattr(db_breaker, "reset_timeout", 0)
+    monkeypatch.setattr(db_breaker, "sync_interval", 0)
+    db_breaker._set_state(STATE_CLOSED, None)
+    yield db_breaker
+    db_breaker._set_state(STATE_CLOSED, None)
+
+@pytest.fixture
+def flask_app(engine, monkeypatch):
+    """App completa (create_app); la fábrica por request abre sus sesiones sobre la base de prueba."""
+    monkeypatch.setattr("app.dao.factory.SessionLocal", sessionmaker(bind=engine))
+    from app.main import create_app
+    flask_app = create_app()
+    flask_app.config["TESTING"] = True
+    return flask_app
+
+@pytest.fixture
+def login_as(flask_app):
+    """
+    Retorna un test client con sesión iniciada. El usuario se deja en la caché de
+    Flask-Login (como haría un login real), así no hace falta su hash de contraseña.
+    """
+    from app.cache import user_cache
+
+    def login(role: str = "admin", user_id: int = 1, email: str = "admin@uce.edu.ec"):
+        user_cache.set(str(user_id), {"id": user_id, "email": email, "name": role.title(), "role": role})
+        client = flask_app.test_client()
+        with client.session_transaction() as session:
+            session["_user_id"] = str(user_id)
+            session["_fresh"] = True
+        return client
+
+    yield login
+    user_cache.clear()
@@ -0,0 +1,75 @@
+"""
+Regresión N+1 del listado de postulaciones del admin (/api/applications/all).
+
+La cantidad de sentencias SQL no debe crecer con el número de filas: get_all y get_page
+resuelven estudiante + oferta con un solo JOIN proyectado (_joined_query).
+Corre sobre SQLite en memoria (tests/conftest.py); TEST_DATABASE_URL permite usar un PostgreSQL real.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.models.sql import UserModel, ApplicationModel
+from app.dao.postgres_impl import PostgresApplicationDAO
+
+@contextmanager
+def count_statements(engine):
+    statements = []
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "after_cursor_execute", after_cursor_execute)
+
+def seed(session, total: int) -> None:
+    """'total' postulaciones, cada una de un usuario distinto (el peor caso para el N+1)."""
+    start = session.query(UserModel).count()
+    now = datetime.utcnow()
+    for i in range(start, start + total):
+        user = UserModel(email=f"alumno{i}@uce.edu.ec", password_hash="x", name=f"Alumno {i}", role="student")
+        session.add(user)
+        session.flush()
+        session.add(ApplicationModel(
+            user_id=user.id, opportunity_id=f"opp-{i}", opportunity_title=f"Pasantía {i}",
+            opportunity_company="UCE", status="enviada", created_at=now - timedelta(minutes=i),
+        ))
+    session.commit()
+    # Sin entidades en la identity map: una carga perezosa tendría que ir a la BD
+    session.expunge_all()
+
+def statements_for(engine, operation) -> int:
+    with count_statements(engine) as statements:
+        operation()
+    return len(statements)
+
+def test_get_all_statement_count_is_constant(engine, session):
+    dao = PostgresApplicationDAO(session)
+
+    seed(session, 3)
+    few = statements_for(engine, dao.get_all)
+    seed(session, 30)
+    many = statements_for(engine, dao.get_all)
+
+    assert few == many == 1
+    rows = dao.get_all()
+    assert len(rows) == 33
+    assert all(row["student"].startswith("Alumno ") for row in rows)
+
+def test_get_page_statement_count_is_constant(engine, session):
+    dao = PostgresApplicationDAO(session)
+
+    seed(session, 5)
+    few = statements_for(engine, lambda: dao.get_page(limit=50))
+    seed(session, 60)
+    many = statements_for(engine, lambda: dao.get_page(limit=50))
+
+    assert few == many == 1
+    first = dao.get_page(limit=50)
+    assert len(first["items"]) == 50 and first["next_cursor"]
+    second_page = statements_for(engine, lambda: dao.get_page(limit=50, after=first["next_cursor"]))
+    assert second_page == 1
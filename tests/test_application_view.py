@@ -0,0 +1,107 @@
+"""
+Vista materializada de postulaciones: copia de título/empresa de Mongo en PostgreSQL
+(sync_opportunity_snapshot y reconcile_application_view).
+
+Mongo se reemplaza por un DAO en memoria; la base es la de tests/conftest.py.
+"""
+import pytest
+from sqlalchemy import event
+
+from app.dto.models import OpportunityDTO
+from app.models.sql import UserModel, ApplicationModel
+from app.dao.postgres_impl import PostgresApplicationDAO
+from app.dao.application_view import reconcile_application_view
+
+class MemoryOpportunityDAO:
+    def __init__(self, opportunities):
+        self.opportunities = {o.id: o for o in opportunities}
+
+    def get_many(self, ids, strict=False):
+        return {i: self.opportunities[i] for i in ids if i in self.opportunities}
+
+class Factory:
+    def __init__(self, session, opportunities):
+        self.session = session
+        self.opportunity_dao = MemoryOpportunityDAO(opportunities)
+
+    def get_application_dao(self):
+        return PostgresApplicationDAO(self.session)
+
+    def get_opportunity_dao(self):
+        return self.opportunity_dao
+
+def opportunity(opportunity_id, title, company="UCE"):
+    return OpportunityDTO(id=opportunity_id, title=title, company_name=company, description="")
+
+def seed(session, opportunity_ids):
+    user = UserModel(email="ana@uce.edu.ec", password_hash="x", name="Ana", role="student")
+    session.add(user)
+    session.flush()
+    for opportunity_id in opportunity_ids:
+        session.add(ApplicationModel(user_id=user.id, opportunity_id=opportunity_id, status="enviada"))
+    session.commit()
+
+def snapshot(session, opportunity_id):
+    session.expire_all()
+    row = session.query(ApplicationModel).filter_by(opportunity_id=opportunity_id).one()
+    return row.opportunity_title, row.opportunity_company
+
+@pytest.fixture
+def aborting_engine(engine):
+    """
+    Emula PostgreSQL: tras un error, toda sentencia falla hasta el ROLLBACK
+    ("current transaction is aborted"). SQLite por sí solo no lo hace.
+    """
+    state = {"fail_for": None, "aborted": False}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if state["aborted"]:
+            raise RuntimeError("current transaction is aborted")
+        if statement.lstrip().upper().startswith("UPDATE") and state["fail_for"] in (parameters or ()):
+            state["aborted"] = True
+            raise RuntimeError("lock timeout")
+
+    def rollback(conn):
+        state["aborted"] = False
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "rollback", rollback)
+    yield state
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    event.remove(engine, "rollback", rollback)
+
+def test_sync_only_counts_rows_that_differ(session):
+    seed(session, ["opp-1"])
+    dao = PostgresApplicationDAO(session)
+
+    assert dao.sync_opportunity_snapshot("opp-1", "Pasantía", "UCE") == 1
+    assert dao.sync_opportunity_snapshot("opp-1", "Pasantía", "UCE") == 0
+    assert snapshot(session, "opp-1") == ("Pasantía", "UCE")
+
+def test_sync_stores_titles_longer_than_200_characters(session):
+    # Con TEST_DATABASE_URL (PostgreSQL) un VARCHAR(200) fallaría aquí
+    seed(session, ["opp-1"])
+    title = "Pasantía " * 40
+    PostgresApplicationDAO(session).sync_opportunity_snapshot("opp-1", title, "UCE")
+    assert snapshot(session, "opp-1")[0] == title
+
+def test_reconcile_continues_after_one_opportunity_fails(session, aborting_engine):
+    seed(session, ["opp-1", "opp-2", "opp-3"])
+    factory = Factory(session, [opportunity("opp-1", "A"), opportunity("opp-2", "B"), opportunity("opp-3", "C")])
+    aborting_engine["fail_for"] = "opp-2"
+
+    stats = reconcile_application_view(factory, batch_size=2)
+
+    assert stats == {"opportunities": 3, "rows_updated": 2, "errors": 1}
+    assert snapshot(session, "opp-1") == ("A", "UCE")
+    assert snapshot(session, "opp-2") == (None, None)
+    assert snapshot(session, "opp-3") == ("C", "UCE")
+
+def test_reconcile_clears_snapshot_of_deleted_opportunities(session):
+    seed(session, ["opp-1"])
+    PostgresApplicationDAO(session).sync_opportunity_snapshot("opp-1", "A", "UCE")
+
+    stats = reconcile_application_view(Factory(session, []))
+
+    assert stats["rows_updated"] == 1
+    assert snapshot(session, "opp-1") == (None, None)
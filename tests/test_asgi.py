@@ -0,0 +1,104 @@
+"""
+Modo ASGI (app/asgi.py): rutas nativas, validación de la cookie de sesión de Flask
+y el resto de rutas servidas por la app Flask montada.
+
+Las solicitudes se envían directamente a la app ASGI (scope/receive/send) y los DAOs
+asíncronos se reemplazan por dobles en memoria.
+"""
+import asyncio
+import json
+
+import pytest
+
+from app import asgi
+from app.cache import user_cache
+
+class MemoryCountDAO:
+    def __init__(self, total):
+        self.total = total
+
+    async def count(self, filters=None):
+        return self.total
+
+class MemoryOpportunityDAO(MemoryCountDAO):
+    async def get_page(self, limit=50, after=None, filters=None):
+        return {"items": [{"id": "opp-1", "title": "Dev", "company_name": "ACME"}], "next_cursor": None}
+
+class Factory:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def get_user_dao(self):
+        raise AssertionError("el usuario debe salir de user_cache")
+
+    def get_student_dao(self):
+        return MemoryCountDAO(3)
+
+    def get_application_dao(self):
+        return MemoryCountDAO(5)
+
+    def get_opportunity_dao(self):
+        return MemoryOpportunityDAO(2)
+
+@pytest.fixture
+def users(monkeypatch):
+    monkeypatch.setattr(asgi, "AsyncUCEFactory", Factory)
+    user_cache.set("1", {"id": 1, "email": "admin@uce.edu.ec", "name": "Admin", "role": "admin"})
+    user_cache.set("2", {"id": 2, "email": "ana@uce.edu.ec", "name": "Ana", "role": "student"})
+    yield
+    user_cache.clear()
+
+def session_cookie(user_id: str) -> str:
+    name = asgi.flask_app.config["SESSION_COOKIE_NAME"]
+    return f"{name}={asgi._session_serializer.dumps({'_user_id': user_id, '_fresh': True})}"
+
+def get(path, headers=None):
+    """GET sobre la app ASGI; retorna (status, headers, cuerpo)."""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "server": ("testserver", 80), "client": ("127.0.0.1", 50000),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(asgi.asgi_app(scope, receive, send))
+    start = next(m for m in messages if m["type"] == "http.response.start")
+    body = b"".join(m.get("body", b"") for m in messages if m["type"] == "http.response.body")
+    return start["status"], {k.decode().lower(): v.decode() for k, v in start["headers"]}, body
+
+def test_stats_requires_a_valid_session_cookie(users):
+    assert get("/api/stats")[0] == 401
+    assert get("/api/stats", {"Cookie": session_cookie("1") + "x"})[0] == 401
+    assert get("/api/stats", {"Cookie": session_cookie("2")})[0] == 403
+
+def test_stats_counts_in_parallel_for_admins(users):
+    status, _, body = get("/api/stats", {"Cookie": session_cookie("1")})
+
+    assert status == 200
+    assert json.loads(body) == {"students": 3, "opportunities": 2, "applications": 5}
+
+def test_opportunities_support_if_none_match(users):
+    status, headers, body = get("/api/opportunities?limit=10")
+    assert status == 200
+    assert json.loads(body)["items"][0]["title"] == "Dev"
+
+    status, _, body = get("/api/opportunities?limit=10", {"If-None-Match": headers["etag"]})
+    assert status == 304
+    assert body == b""
+
+def test_other_routes_are_served_by_flask(users):
+    status, headers, _ = get("/metrics")
+
+    assert status == 200
+    assert headers["content-type"].startswith("text/plain")
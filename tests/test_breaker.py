@@ -0,0 +1,39 @@
+"""
+Circuit breaker propio (app.breaker) con el backend en memoria.
+"""
+import pytest
+
+from app.breaker import CircuitBreaker, CircuitBreakerError, STATE_CLOSED, STATE_OPEN
+
+def opened_breaker() -> CircuitBreaker:
+    # reset_timeout=0: la siguiente llamada ya es la sonda del estado semiabierto
+    breaker = CircuitBreaker("test", fail_max=1, reset_timeout=0, sync_interval=0)
+    with pytest.raises(RuntimeError):
+        with breaker.guard("op"):
+            raise RuntimeError("caída")
+    assert breaker.current_state == STATE_OPEN
+    return breaker
+
+def test_cancelled_probe_lets_the_next_call_probe_again():
+    breaker = opened_breaker()
+
+    def streaming():
+        with breaker.guard("op"):
+            yield 1
+
+    cursor = streaming()
+    next(cursor)
+    cursor.close()  # GeneratorExit dentro de la sonda: ni éxito ni fallo
+
+    assert breaker.current_state == STATE_OPEN
+    with breaker.guard("op"):
+        pass
+    assert breaker.current_state == STATE_CLOSED
+
+def test_only_one_probe_at_a_time():
+    breaker = opened_breaker()
+    with breaker.guard("op"):
+        with pytest.raises(CircuitBreakerError):
+            with breaker.guard("op"):
+                pass
+    assert breaker.current_state == STATE_CLOSED
@@ -0,0 +1,80 @@
+"""
+Cambio de estado masivo (PUT /api/applications/status): un solo UPDATE ... RETURNING.
+
+El camino por ids usa "id = ANY(:ids)" (arreglo de PostgreSQL) y solo corre con
+TEST_DATABASE_URL; la validación y el camino por filtro corren sobre SQLite.
+"""
+from app import main
+from app.models.sql import UserModel, ApplicationModel
+from tests.conftest import requires_postgres
+from tests.test_application_queries import count_statements
+
+def seed(session, statuses):
+    """Una postulación por estado, de usuarios distintos, todas para 'opp-1'."""
+    ids = []
+    for i, status in enumerate(statuses):
+        user = UserModel(email=f"alumno{i}@uce.edu.ec", password_hash="x", name=f"Alumno {i}", role="student")
+        session.add(user)
+        session.flush()
+        application = ApplicationModel(user_id=user.id, opportunity_id="opp-1", status=status)
+        session.add(application)
+        session.flush()
+        ids.append(application.id)
+    session.commit()
+    return ids
+
+def statuses(session):
+    session.expire_all()
+    return [a.status for a in session.query(ApplicationModel).order_by(ApplicationModel.id)]
+
+def test_rejects_invalid_requests(login_as, monkeypatch):
+    monkeypatch.setattr(main, "MAX_BULK_ROWS", 3)
+    admin = login_as("admin")
+
+    def put(body):
+        return admin.put("/api/applications/status", json=body).status_code
+
+    assert put({"status": "aprobada", "ids": [1, 2, 3, 4]}) == 413
+    assert put({"status": "aprobada", "ids": []}) == 400
+    assert put({"status": "aprobada", "ids": ["uno"]}) == 400
+    assert put({"status": "borrada", "ids": [1]}) == 400
+    assert put({"status": "aprobada"}) == 400
+    assert put({"status": "aprobada", "filter": {"status": "enviada"}}) == 400
+
+def test_requires_admin(login_as):
+    student = login_as("student", user_id=2, email="ana@uce.edu.ec")
+    response = student.put("/api/applications/status", json={"status": "aprobada", "ids": [1]})
+    assert response.status_code == 403
+
+def test_filter_updates_matching_rows_in_one_statement(engine, session, login_as):
+    ids = seed(session, ["enviada", "enviada", "rechazada"])
+    admin = login_as("admin")
+
+    with count_statements(engine) as statements:
+        response = admin.put("/api/applications/status", json={
+            "status": "aprobada", "filter": {"opportunity_id": "opp-1", "status": "enviada"}})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["updated"] == 2
+    assert sorted(r["id"] for r in body["results"]) == ids[:2]
+    assert statuses(session) == ["aprobada", "aprobada", "rechazada"]
+    assert len([s for s in statements if s.lstrip().upper().startswith("UPDATE")]) == 1
+
+@requires_postgres
+def test_ids_report_per_id_outcome(session, login_as):
+    ids = seed(session, ["enviada", "enviada"])
+    missing = ids[-1] + 100
+
+    response = login_as("admin").put("/api/applications/status",
+                                     json={"status": "rechazada", "ids": [ids[1], missing, ids[0]]})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["updated"] == 2
+    assert body["results"] == [
+        {"id": ids[0], "status": "updated"},
+        {"id": ids[1], "status": "updated"},
+        {"id": missing, "status": "not_found"},
+    ]
+    assert statuses(session) == ["rechazada", "rechazada"]
@@ -0,0 +1,81 @@
+"""
+Exportación en streaming (/api/export/<dataset>?format=csv|ndjson|parquet).
+
+Las filas salen de DAO.stream() sobre la base de tests/conftest.py y se envían por bloques.
+"""
+import csv
+import io
+import json
+
+import pyarrow.parquet as pq
+
+from app.models.sql import StudentModel, UserModel, ApplicationModel
+from app.reporting import export
+from app.reporting.export import iter_csv, iter_ndjson, iter_parquet
+
+def seed_students(session, total):
+    session.add_all([
+        StudentModel(name=f"Alumno {i}", email=f"alumno{i}@uce.edu.ec", gpa=7 + i / 10, department="Sistemas")
+        for i in range(total)
+    ])
+    session.commit()
+
+def test_csv_export(session, login_as):
+    seed_students(session, 3)
+
+    response = login_as("admin").get("/api/export/students?format=csv")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    assert 'filename="students.csv"' in response.headers["Content-Disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [r["email"] for r in rows] == [f"alumno{i}@uce.edu.ec" for i in range(3)]
+    assert list(rows[0]) == ["id", "name", "email", "gpa", "department"]
+
+def test_ndjson_export(session, login_as):
+    user = UserModel(email="ana@uce.edu.ec", password_hash="x", name="Ana", role="student")
+    session.add(user)
+    session.flush()
+    session.add(ApplicationModel(user_id=user.id, opportunity_id="opp-1", opportunity_title="Pasantía",
+                                 opportunity_company="UCE", status="enviada"))
+    session.commit()
+
+    response = login_as("admin").get("/api/export/applications?format=ndjson")
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(rows) == 1
+    assert rows[0]["student"] == "Ana (ana@uce.edu.ec)"
+    assert rows[0]["opportunity_title"] == "Pasantía"
+    assert set(rows[0]) == {name for name, _ in export.EXPORT_SCHEMAS["applications"]}
+
+def test_parquet_export(session, login_as):
+    seed_students(session, 3)
+
+    response = login_as("admin").get("/api/export/students?format=parquet")
+
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.get_data()))
+    assert table.column_names == ["id", "name", "email", "gpa", "department"]
+    assert table.column("email").to_pylist() == [f"alumno{i}@uce.edu.ec" for i in range(3)]
+
+def test_rejects_unknown_dataset_or_format_and_non_admins(login_as):
+    admin = login_as("admin")
+    assert admin.get("/api/export/users?format=csv").status_code == 400
+    assert admin.get("/api/export/students?format=xlsx").status_code == 400
+    assert login_as("student", user_id=2, email="ana@uce.edu.ec").get("/api/export/students").status_code == 403
+
+def test_writers_yield_one_chunk_per_batch(monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 2)
+    rows = [{"id": i, "name": f"Alumno {i}", "email": f"a{i}@uce.edu.ec", "gpa": 8.0, "department": "Sistemas"}
+            for i in range(5)]
+
+    csv_chunks = list(iter_csv(rows, ["id", "email"]))
+    ndjson_chunks = list(iter_ndjson(rows))
+    parquet = b"".join(iter_parquet(rows, "students", row_group_size=2))
+
+    # cabecera + 2 lotes completos + resto
+    assert len(csv_chunks) == 3
+    assert len(ndjson_chunks) == 3
+    assert pq.ParquetFile(io.BytesIO(parquet)).num_row_groups == 3
@@ -0,0 +1,49 @@
+"""
+Configuración de gunicorn (app/gunicorn.conf.py): se carga como lo hace gunicorn, con runpy.
+"""
+import os
+import runpy
+
+import pytest
+
+CONF_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "app", "gunicorn.conf.py")
+
+@pytest.fixture
+def load_conf(tmp_path, monkeypatch):
+    metrics_dir = tmp_path / "metrics"
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(metrics_dir))
+    monkeypatch.delenv("CACHE_REDIS_URL", raising=False)
+    monkeypatch.delenv("UCE_WEB_WORKERS", raising=False)
+
+    def load(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        return runpy.run_path(CONF_PATH)
+
+    yield load, metrics_dir
+    # La configuración exporta UCE_WEB_WORKERS en os.environ
+    os.environ.pop("UCE_WEB_WORKERS", None)
+
+def test_loading_the_config_keeps_live_metric_files(load_conf):
+    # --check-config y la recarga (HUP) del maestro vuelven a leer el archivo
+    load, metrics_dir = load_conf
+    metrics_dir.mkdir()
+    live = metrics_dir / "gauge_livesum_123.db"
+    live.write_bytes(b"")
+
+    conf = load()
+
+    assert live.exists()
+    conf["_reset_metrics_dir"]()
+    assert metrics_dir.is_dir() and not live.exists()
+
+def test_gevent_never_preloads_the_app(load_conf):
+    load, _ = load_conf
+    assert load(GUNICORN_WORKER_CLASS="gthread")["preload_app"] is True
+    assert load(GUNICORN_WORKER_CLASS="gevent", GUNICORN_PRELOAD="true")["preload_app"] is False
+
+def test_single_worker_without_shared_state(load_conf):
+    load, _ = load_conf
+    conf = load()
+    assert conf["workers"] == 1
+    assert os.environ["UCE_WEB_WORKERS"] == "1"
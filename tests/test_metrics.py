@@ -0,0 +1,81 @@
+"""
+Métricas Prometheus (app.metrics y /metrics). Sin PROMETHEUS_MULTIPROC_DIR se usa el
+registro del proceso, así los contadores se leen directamente con get_sample_value.
+"""
+from prometheus_client import REGISTRY, CONTENT_TYPE_LATEST
+
+from app.cache import user_cache
+from app.metrics import instrument_dao, BreakerMetricsListener
+from app.security import login_attempts
+from app.reporting.jobs import report_jobs
+
+def cache_reads(cache: str) -> float:
+    return sum(REGISTRY.get_sample_value("uce_cache_requests_total", {"cache": cache, "result": result}) or 0
+               for result in ("hit", "miss"))
+
+def test_read_through_caches_report_hits_and_misses():
+    before = REGISTRY.get_sample_value("uce_cache_requests_total", {"cache": "users", "result": "miss"}) or 0
+    user_cache.get("no-existe")
+    after = REGISTRY.get_sample_value("uce_cache_requests_total", {"cache": "users", "result": "miss"})
+    assert after == before + 1
+
+def test_state_caches_do_not_skew_the_hit_ratio():
+    before = cache_reads("login_attempts") + cache_reads("report_jobs")
+    login_attempts.incr("ip:10.0.0.1:0")
+    login_attempts.get("ip:10.0.0.1:0")
+    report_jobs.get("job")
+    assert cache_reads("login_attempts") + cache_reads("report_jobs") == before
+
+def test_metrics_endpoint_exposes_prometheus_text(flask_app):
+    response = flask_app.test_client().get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == CONTENT_TYPE_LATEST
+    assert b"uce_http_request_duration_seconds" in response.data
+
+def test_request_latency_uses_the_route_template(login_as):
+    labels = {"route": "/api/opportunities/<id>", "method": "PUT", "status": "403"}
+    before = REGISTRY.get_sample_value("uce_http_request_duration_seconds_count", labels) or 0
+
+    login_as("student", user_id=2, email="ana@uce.edu.ec").put("/api/opportunities/abc123", json={})
+
+    assert REGISTRY.get_sample_value("uce_http_request_duration_seconds_count", labels) == before + 1
+
+def test_dao_calls_are_timed_with_outcome():
+    @instrument_dao("memory")
+    class MemoryDAO:
+        def count(self):
+            return 1
+
+        def fail(self):
+            raise ValueError("boom")
+
+        def stream(self):
+            yield from (1, 2)
+
+    def calls(method, outcome):
+        return REGISTRY.get_sample_value("uce_dao_call_duration_seconds_count", {
+            "store": "memory", "dao": "MemoryDAO", "method": method, "outcome": outcome}) or 0
+
+    dao = MemoryDAO()
+    dao.count()
+    try:
+        dao.fail()
+    except ValueError:
+        pass
+    rows = dao.stream()
+    # El stream se mide cuando el consumidor lo agota, no al crearlo
+    assert calls("stream", "ok") == 0
+    assert list(rows) == [1, 2]
+
+    assert calls("count", "ok") == 1
+    assert calls("fail", "error") == 1
+    assert calls("stream", "ok") == 1
+
+def test_breaker_listener_publishes_state():
+    listener = BreakerMetricsListener("test_metrics")
+    listener.state_change(None, "closed", "open")
+
+    assert REGISTRY.get_sample_value("uce_circuit_breaker_state", {"breaker": "test_metrics"}) == 2
+    assert REGISTRY.get_sample_value("uce_circuit_breaker_transitions_total", {
+        "breaker": "test_metrics", "from_state": "closed", "to_state": "open"}) == 1
@@ -0,0 +1,21 @@
+"""
+Cliente Mongo compartido por proceso (app.db): las fábricas no abren clientes propios
+y todas usan la misma URI por defecto.
+"""
+from app.db import get_mongo_client, get_async_mongo_client, close_mongo_clients
+from app.dao.factory import UCEFactory
+from app.dao.async_factory import AsyncUCEFactory
+
+def test_factories_share_the_process_client():
+    try:
+        with UCEFactory() as first, UCEFactory() as second:
+            client = first.get_opportunity_dao().client
+            assert client is second.get_opportunity_dao().client
+            # Mismo cliente que el de init_mongo_indexes y los scripts (URI por defecto de app.db)
+            assert client is get_mongo_client()
+    finally:
+        close_mongo_clients()
+
+def test_async_factory_uses_the_same_default_uri():
+    factory = AsyncUCEFactory()
+    assert factory.get_opportunity_dao().client is get_async_mongo_client()
@@ -0,0 +1,72 @@
+"""
+MongoOpportunityDAO.stream: lotes por keyset sobre _id, cada uno protegido por el breaker.
+
+La colección es un doble en memoria (find/sort/limit); el breaker es el db_breaker real
+con un backend en memoria (fixture 'breaker' de tests/conftest.py).
+"""
+from bson import ObjectId
+
+from app.breaker import STATE_CLOSED, STATE_OPEN
+from app.dao.mongo_impl import MongoOpportunityDAO
+
+class MemoryCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, field, direction):
+        self.docs = sorted(self.docs, key=lambda d: d[field], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    def __iter__(self):
+        return iter(self.docs)
+
+class MemoryCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = 0
+        self.fail = False
+
+    def find(self, query, projection=None):
+        self.queries += 1
+        if self.fail:
+            raise ConnectionError("Mongo caído")
+        after = query.get("_id", {}).get("$gt")
+        return MemoryCursor([dict(d) for d in self.docs if after is None or d["_id"] > after])
+
+def dao_with(docs):
+    collection = MemoryCollection(docs)
+    return MongoOpportunityDAO({"ucedb": {"opportunities": collection}}), collection
+
+def test_stream_reads_every_document_in_batches(breaker):
+    docs = [{"_id": ObjectId(), "title": f"Oferta {i}"} for i in range(5)]
+    dao, collection = dao_with(docs)
+
+    rows = list(dao.stream(fields=["title"], batch_size=2))
+
+    assert [r["title"] for r in rows] == [f"Oferta {i}" for i in range(5)]
+    assert [r["id"] for r in rows] == [str(d["_id"]) for d in docs]
+    assert collection.queries == 3
+
+def test_probe_ends_with_its_batch_not_with_the_consumer(breaker):
+    dao, _ = dao_with([{"_id": ObjectId(), "title": f"Oferta {i}"} for i in range(3)])
+    breaker._open()
+
+    rows = dao.stream(fields=["title"], batch_size=2)
+    next(rows)
+    # El consumidor sigue a mitad del stream, pero la sonda (primer lote) ya cerró el circuito
+    assert breaker.current_state == STATE_CLOSED
+    rows.close()
+
+def test_batch_failures_open_the_circuit(breaker, monkeypatch):
+    monkeypatch.setattr(breaker, "fail_max", 1)
+    dao, collection = dao_with([{"_id": ObjectId(), "title": "Oferta"}])
+    collection.fail = True
+
+    rows = list(dao.stream(fields=["title"]))
+
+    assert rows == list(dao._get_maintenance_card())
+    assert breaker.current_state == STATE_OPEN
@@ -0,0 +1,137 @@
+"""
+Caché read-through del catálogo de ofertas (opportunity_cache): invalidación en escrituras,
+datos viejos con el circuito abierto y ETag / If-None-Match en GET /api/opportunities.
+
+La colección es un doble en memoria que cuenta las lecturas que llegan a "Mongo".
+"""
+import pytest
+from bson import ObjectId
+
+from app.dao import mongo_impl
+from app.dao.mongo_impl import MongoOpportunityDAO, opportunity_cache
+
+class Result:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+class MemoryCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, field, direction):
+        self.docs = sorted(self.docs, key=lambda d: d[field], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    def __iter__(self):
+        return iter(self.docs)
+
+class MemoryCollection:
+    def __init__(self):
+        self.docs = []
+        self.reads = 0
+        self.fail = False
+
+    def find(self, query, projection=None):
+        self.reads += 1
+        if self.fail:
+            raise ConnectionError("Mongo caído")
+        after = query.get("_id", {}).get("$gt")
+        return MemoryCursor([
+            {k: v for k, v in d.items() if k in ("_id", "title", "company_name")}
+            for d in self.docs if after is None or d["_id"] > after
+        ])
+
+    def find_one(self, query, projection=None):
+        return next((dict(d) for d in self.docs if d["_id"] == query["_id"]), None)
+
+    def insert_one(self, doc):
+        doc = dict(doc, _id=ObjectId())
+        self.docs.append(doc)
+        return Result(inserted_id=doc["_id"])
+
+    def update_one(self, query, update):
+        doc = next((d for d in self.docs if d["_id"] == query["_id"]), None)
+        if doc is not None:
+            doc.update(update["$set"])
+        return Result(matched_count=int(doc is not None))
+
+    def delete_one(self, query):
+        before = len(self.docs)
+        self.docs = [d for d in self.docs if d["_id"] != query["_id"]]
+        return Result(deleted_count=before - len(self.docs))
+
+@pytest.fixture
+def collection(breaker):
+    opportunity_cache.clear()
+    yield MemoryCollection()
+    opportunity_cache.clear()
+
+def titles(rows):
+    return [r["title"] for r in rows]
+
+def test_get_all_is_read_through(collection):
+    dao = MongoOpportunityDAO({"ucedb": {"opportunities": collection}})
+    dao.create({"title": "Dev", "company_name": "ACME"})
+
+    assert titles(dao.get_all()) == ["Dev"]
+    assert titles(dao.get_all()) == ["Dev"]
+    assert collection.reads == 1
+
+def test_writes_invalidate_the_catalogue(collection):
+    dao = MongoOpportunityDAO({"ucedb": {"opportunities": collection}})
+    opp_id = dao.create({"title": "Dev", "company_name": "ACME"})
+    assert titles(dao.get_all()) == ["Dev"]
+
+    dao.create({"title": "QA", "company_name": "ACME"})
+    assert titles(dao.get_all()) == ["Dev", "QA"]
+
+    dao.update(opp_id, {"title": "Dev Senior"})
+    assert titles(dao.get_all()) == ["Dev Senior", "QA"]
+    assert dao.get(opp_id).title == "Dev Senior"
+
+    dao.delete(opp_id)
+    assert titles(dao.get_all()) == ["QA"]
+    assert collection.reads == 4
+
+def test_open_circuit_serves_stale_catalogue(collection, breaker, monkeypatch):
+    monkeypatch.setattr(mongo_impl, "OPPORTUNITY_CACHE_TTL", 0)
+    dao = MongoOpportunityDAO({"ucedb": {"opportunities": collection}})
+    dao.create({"title": "Dev", "company_name": "ACME"})
+    assert titles(dao.get_all()) == ["Dev"]
+
+    collection.fail = True
+    monkeypatch.setattr(breaker, "reset_timeout", 60)
+    breaker._open()
+
+    assert titles(dao.get_all()) == ["Dev"]
+    assert collection.reads == 1
+
+def test_open_circuit_without_cache_shows_maintenance_card(collection, breaker, monkeypatch):
+    dao = MongoOpportunityDAO({"ucedb": {"opportunities": collection}})
+    monkeypatch.setattr(breaker, "reset_timeout", 60)
+    breaker._open()
+
+    assert dao.get_all() == dao._get_maintenance_card()
+    assert collection.reads == 0
+
+def test_unchanged_catalogue_returns_304(collection, flask_app, monkeypatch):
+    monkeypatch.setattr("app.dao.factory.get_mongo_client", lambda uri: {"ucedb": {"opportunities": collection}})
+    MongoOpportunityDAO({"ucedb": {"opportunities": collection}}).create({"title": "Dev", "company_name": "ACME"})
+    client = flask_app.test_client()
+
+    first = client.get("/api/opportunities")
+    etag = first.headers["ETag"]
+    unchanged = client.get("/api/opportunities", headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert unchanged.status_code == 304
+    assert unchanged.data == b""
+
+    MongoOpportunityDAO({"ucedb": {"opportunities": collection}}).create({"title": "QA", "company_name": "ACME"})
+    changed = client.get("/api/opportunities", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert len(changed.get_json()["items"]) == 2
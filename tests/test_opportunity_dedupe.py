@@ -0,0 +1,107 @@
+"""
+Duplicados de ofertas por clave normalizada (dedupe_key + índice único), sin $regex.
+
+La colección es un doble en memoria que aplica el índice único sobre dedupe_key
+como lo haría Mongo (DuplicateKeyError).
+"""
+import pytest
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from app.dao.mongo_impl import MongoOpportunityDAO, build_dedupe_key, DEDUPE_KEY_FIELD
+
+class Result:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+class UniqueKeyCollection:
+    def __init__(self, docs=()):
+        self.docs = [dict(d) for d in docs]
+
+    def _check_unique(self, key, own_id=None):
+        if any(d.get(DEDUPE_KEY_FIELD) == key and d["_id"] != own_id for d in self.docs):
+            raise DuplicateKeyError(f"E11000 duplicate key: {key!r}")
+
+    def insert_one(self, doc):
+        self._check_unique(doc[DEDUPE_KEY_FIELD])
+        doc = dict(doc, _id=ObjectId())
+        self.docs.append(doc)
+        return Result(inserted_id=doc["_id"])
+
+    def find_one(self, query, projection=None):
+        return next((dict(d) for d in self.docs if d["_id"] == query["_id"]), None)
+
+    def update_one(self, query, update):
+        doc = next((d for d in self.docs if d["_id"] == query["_id"]), None)
+        if doc is None:
+            return Result(matched_count=0)
+        changes = update["$set"]
+        if DEDUPE_KEY_FIELD in changes:
+            self._check_unique(changes[DEDUPE_KEY_FIELD], own_id=doc["_id"])
+        doc.update(changes)
+        return Result(matched_count=1)
+
+    def find(self, query, projection=None):
+        return [dict(d) for d in self.docs if DEDUPE_KEY_FIELD not in d]
+
+    def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            self.update_one(op._filter, op._doc)
+        return Result(modified_count=len(operations))
+
+def dao_with(docs=()):
+    collection = UniqueKeyCollection(docs)
+    return MongoOpportunityDAO({"ucedb": {"opportunities": collection}}), collection
+
+def test_key_ignores_case_and_whitespace():
+    assert build_dedupe_key("  Dev   Python ", "ACME") == build_dedupe_key("dev python", "acme")
+    assert build_dedupe_key("Straße", "UCE") == build_dedupe_key("STRASSE", "uce")
+    assert build_dedupe_key("Dev", "Python ACME") != build_dedupe_key("Dev Python", "ACME")
+
+def test_regex_metacharacters_are_plain_text():
+    assert build_dedupe_key("C++ (Senior)", "UCE") != build_dedupe_key("C (Senior)", "UCE")
+    assert build_dedupe_key(".*", "UCE") != build_dedupe_key("Dev", "UCE")
+
+def test_create_rejects_normalized_duplicate(breaker):
+    dao, collection = dao_with()
+    dao.create({"title": "Dev Python", "company_name": "ACME"})
+
+    with pytest.raises(ValueError):
+        dao.create({"title": "  DEV  python", "company_name": "acme "})
+    assert len(collection.docs) == 1
+    assert collection.docs[0][DEDUPE_KEY_FIELD] == build_dedupe_key("Dev Python", "ACME")
+
+def test_update_keeps_key_in_sync(breaker):
+    dao, collection = dao_with()
+    first = dao.create({"title": "Dev Python", "company_name": "ACME"})
+    second = dao.create({"title": "QA", "company_name": "ACME"})
+
+    assert dao.update(second, {"title": "Tester"}) is True
+    assert collection.docs[1][DEDUPE_KEY_FIELD] == build_dedupe_key("Tester", "ACME")
+    # Renombrar hacia otra oferta existente choca con el índice único
+    with pytest.raises(ValueError):
+        dao.update(second, {"title": "dev python"})
+    # La propia oferta puede cambiar solo mayúsculas sin chocar consigo misma
+    assert dao.update(first, {"title": "DEV PYTHON"}) is True
+
+def test_backfill_sets_missing_keys():
+    dao, collection = dao_with([
+        {"_id": ObjectId(), "title": " Dev ", "company_name": "ACME"},
+        {"_id": ObjectId(), "title": "QA", "company_name": "UCE", DEDUPE_KEY_FIELD: build_dedupe_key("QA", "UCE")},
+    ])
+
+    assert dao.backfill_dedupe_keys(batch_size=1) == 1
+    assert [d[DEDUPE_KEY_FIELD] for d in collection.docs] == [
+        build_dedupe_key("Dev", "ACME"), build_dedupe_key("QA", "UCE")]
+
+def test_create_endpoint_returns_409(breaker, login_as, monkeypatch):
+    collection = UniqueKeyCollection()
+    monkeypatch.setattr("app.dao.factory.get_mongo_client", lambda uri: {"ucedb": {"opportunities": collection}})
+    client = login_as("admin")
+
+    created = client.post("/api/opportunities", json={"title": "Dev Python", "company_name": "ACME"})
+    duplicate = client.post("/api/opportunities", json={"title": "dev  PYTHON", "company_name": "Acme"})
+
+    assert created.status_code == 201
+    assert duplicate.status_code == 409
+    assert len(collection.docs) == 1
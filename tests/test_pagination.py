@@ -0,0 +1,81 @@
+"""
+Paginación keyset y filtros en el servidor (?limit=&after= y filtros por campo).
+
+Se recorren las páginas siguiendo next_cursor: ninguna fila se repite ni se pierde, y un
+cursor inválido es un 400 (error del cliente), no un 500.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.sql import UserModel, StudentModel, ApplicationModel
+from app.dao.postgres_impl import PostgresStudentDAO
+from app.dao.mongo_impl import MongoOpportunityDAO
+
+def seed_applications(session, total):
+    user = UserModel(email="ana@uce.edu.ec", password_hash="x", name="Ana", role="student")
+    session.add(user)
+    session.flush()
+    now = datetime.utcnow()
+    for i in range(total):
+        # Dos postulaciones por instante: el id desempata el keyset (created_at, id)
+        session.add(ApplicationModel(user_id=user.id, opportunity_id=f"opp-{i}",
+                                     status="aceptada" if i % 3 == 0 else "enviada",
+                                     created_at=now - timedelta(minutes=i // 2)))
+    session.commit()
+
+def walk(client, url):
+    ids, cursor = [], None
+    while True:
+        response = client.get(url + (f"&after={cursor}" if cursor else ""))
+        assert response.status_code == 200
+        page = response.get_json()
+        ids.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return ids
+
+def test_application_pages_cover_every_row_once(session, login_as):
+    seed_applications(session, 25)
+    ids = walk(login_as("admin"), "/api/applications/all?limit=4")
+    assert len(ids) == 25 and len(set(ids)) == 25
+
+def test_filters_are_applied_in_the_database(session, login_as):
+    seed_applications(session, 25)
+    ids = walk(login_as("admin"), "/api/applications/all?limit=4&status=aceptada")
+    assert len(ids) == 9
+    assert all(row.status == "aceptada" for row in session.query(ApplicationModel).filter(ApplicationModel.id.in_(ids)))
+
+def test_page_size_is_capped(session, login_as):
+    seed_applications(session, 3)
+    page = login_as("admin").get("/api/applications/all?limit=100000").get_json()
+    assert len(page["items"]) == 3
+    assert login_as("admin").get("/api/applications/all?limit=abc").status_code == 200
+
+@pytest.mark.parametrize("cursor", ["no-es-un-cursor", "YWJj", "%%%"])
+def test_invalid_application_cursor_is_a_client_error(session, login_as, cursor):
+    response = login_as("admin").get(f"/api/applications/all?after={cursor}")
+    assert response.status_code == 400
+
+def test_student_keyset_over_primary_key(session):
+    session.add_all([StudentModel(name=f"Alumno {i}", email=f"a{i}@uce.edu.ec", gpa=8, department="Sistemas")
+                     for i in range(5)])
+    session.commit()
+    dao = PostgresStudentDAO(session)
+
+    first = dao.get_page(limit=2)
+    second = dao.get_page(limit=2, after=first["next_cursor"])
+    last = dao.get_page(limit=2, after=second["next_cursor"])
+
+    assert [s["name"] for s in first["items"] + second["items"] + last["items"]] == [f"Alumno {i}" for i in range(5)]
+    assert last["next_cursor"] is None
+    with pytest.raises(ValueError):
+        dao.get_page(after="abc")
+    with pytest.raises(ValueError):
+        dao.get_page(filters={"no_existe": 1})
+
+def test_invalid_opportunity_cursor_never_reaches_mongo():
+    # Sin servidor: el cursor se valida antes de tocar la colección (ni el breaker)
+    dao = MongoOpportunityDAO({"ucedb": {"opportunities": None}})
+    with pytest.raises(ValueError):
+        dao.get_page(after="no-es-un-objectid")
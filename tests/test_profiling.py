@@ -0,0 +1,59 @@
+"""
+Perfilado de consultas por request (DB_PROFILING): cabecera Server-Timing y avisos de
+requests lentos o N+1 en el log.
+"""
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from app import profiling
+from app.profiling import MongoCommandProfiler, attach_engine, start_profile, finish_profile
+from tests.test_application_queries import seed
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+
+def test_server_timing_counts_request_statements(enabled, engine, session, login_as):
+    attach_engine(engine)
+    seed(session, 3)
+
+    response = login_as("admin").get("/api/applications/all")
+
+    assert response.status_code == 200
+    header = response.headers["Server-Timing"]
+    assert 'sql;dur=' in header and 'desc="1 sentencias"' in header  # un solo JOIN para la página
+    assert 'mongo;dur=0.0;desc="0 comandos"' in header
+    assert "total;dur=" in header
+
+def test_disabled_profiling_adds_no_header(engine, session, login_as):
+    attach_engine(engine)
+
+    response = login_as("admin").get("/api/applications/all")
+
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+    assert start_profile() is None
+
+def test_repeated_statements_are_logged_as_n_plus_one(enabled, monkeypatch, caplog):
+    monkeypatch.setattr(profiling, "PROFILE_N_PLUS_ONE_THRESHOLD", 3)
+    listener = MongoCommandProfiler()
+    token = start_profile()
+    for request_id in range(3):
+        command = {"find": "opportunities", "filter": {"_id": request_id}}
+        listener.started(SimpleNamespace(command=command, command_name="find", request_id=request_id))
+        listener.succeeded(SimpleNamespace(request_id=request_id, duration_micros=1500))
+
+    with caplog.at_level(logging.WARNING):
+        header = finish_profile(token, "GET /api/my-applications", 12.0)
+
+    assert 'mongo;dur=4.5;desc="3 comandos"' in header
+    assert "Posible N+1 en GET /api/my-applications: 3x mongo: find opportunities ['_id']" in caplog.text
+
+def test_slow_requests_are_logged(enabled, caplog):
+    token = start_profile()
+    with caplog.at_level(logging.WARNING):
+        finish_profile(token, "GET /api/stats", profiling.PROFILE_SLOW_REQUEST_MS + 1)
+
+    assert "Request lento GET /api/stats" in caplog.text
@@ -0,0 +1,68 @@
+"""
+Caché de reportes direccionada por la huella de los datos (app.reporting.generator).
+
+El renderizado real se reemplaza por un PDF mínimo que cuenta cuántas veces se generó.
+"""
+import os
+
+import pytest
+
+from app.reporting import generator
+
+class VersionedDAO:
+    def __init__(self, version):
+        self.version = version
+
+    def data_version(self):
+        return self.version
+
+    def stream(self, fields=None, batch_size=1000):
+        return iter(())
+
+class Factory:
+    def __init__(self, students="10:10", opportunities="5:abc:0"):
+        self.students = VersionedDAO(students)
+        self.opportunities = VersionedDAO(opportunities)
+
+    def get_student_dao(self):
+        return self.students
+
+    def get_opportunity_dao(self):
+        return self.opportunities
+
+class FakePDF:
+    def output(self, path):
+        with open(path, "wb") as f:
+            f.write(b"%PDF-1.4 prueba")
+
+@pytest.fixture
+def renders(tmp_path, monkeypatch):
+    monkeypatch.setattr(generator, "REPORT_CACHE_DIR", str(tmp_path))
+    calls = []
+    monkeypatch.setattr(generator, "render_combined_pdf", lambda *a: calls.append(1) or FakePDF())
+    return calls
+
+def test_same_data_reuses_the_pdf(renders):
+    first = generator.generate_combined_report(Factory())
+    second = generator.generate_combined_report(Factory())
+    assert first == second and len(renders) == 1
+    assert generator.generate_combined_report(Factory(students="11:11")) != first
+    assert len(renders) == 2
+
+def test_mongo_outage_shares_one_degraded_pdf(renders):
+    first = generator.generate_combined_report(Factory(opportunities=None))
+    second = generator.generate_combined_report(Factory(opportunities=None))
+    assert first == second and len(renders) == 1
+    assert os.path.basename(first).startswith("combined-offline-")
+    # Con Mongo de vuelta, la huella cambia y se genera el reporte completo
+    assert generator.generate_combined_report(Factory()) != first
+
+def test_degraded_pdf_expires_quickly(renders, monkeypatch):
+    monkeypatch.setattr(generator, "REPORT_OFFLINE_MAX_AGE", 60)
+    path = generator.generate_combined_report(Factory(opportunities=None))
+    old = os.path.getmtime(path) - 120
+    os.utime(path, (old, old))
+
+    generator.generate_combined_report(Factory(opportunities=None))
+
+    assert len(renders) == 2
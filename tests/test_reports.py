@@ -0,0 +1,92 @@
+"""
+Reportes en segundo plano (app.reporting.jobs y rutas /api/reports/*).
+
+El renderizado real (pandas + fpdf) no interesa aquí: se reemplaza por un PDF mínimo.
+"""
+import threading
+
+import pytest
+
+from app.reporting import jobs
+
+@pytest.fixture
+def fake_report(tmp_path, monkeypatch):
+    """generate_combined_report escribe un PDF de prueba; 'release' controla cuándo termina."""
+    release = threading.Event()
+    release.set()
+    path = tmp_path / "combined.pdf"
+
+    def generate_combined_report():
+        release.wait(5)
+        path.write_bytes(b"%PDF-1.4 prueba")
+        return str(path)
+
+    monkeypatch.setattr("app.reporting.generator.generate_combined_report", generate_combined_report)
+    jobs.report_jobs.clear()
+    yield release
+    release.set()
+    jobs.report_jobs.clear()
+
+def wait_for(job_id):
+    for _ in range(100):
+        job = jobs.get_job(job_id)
+        if job["status"] not in ("pending", "running"):
+            return job
+        threading.Event().wait(0.05)
+    raise AssertionError("el trabajo no terminó")
+
+def test_single_worker_uses_local_job_state(fake_report):
+    # Sin Redis y con un worker (desarrollo, gunicorn por defecto sin CACHE_REDIS_URL)
+    assert not jobs.report_jobs.shared
+    assert jobs.WEB_WORKERS == 1 and jobs.REPORT_JOBS_ALLOW_LOCAL
+    job = jobs.submit_report_job()
+    assert wait_for(job["id"])["status"] == "done"
+
+def test_several_workers_without_redis_are_rejected(monkeypatch):
+    monkeypatch.setattr(jobs, "REPORT_JOBS_ALLOW_LOCAL", False)
+    with pytest.raises(jobs.ReportQueueUnavailable):
+        jobs.submit_report_job()
+
+def test_concurrent_requests_share_the_running_job(fake_report, monkeypatch):
+    monkeypatch.setattr(jobs, "REPORT_JOBS_ALLOW_LOCAL", True)
+    fake_report.clear()
+    first = jobs.submit_report_job()
+    second = jobs.submit_report_job()
+    assert first["id"] == second["id"]
+    fake_report.set()
+    wait_for(first["id"])
+    # Terminado el trabajo, un pedido nuevo encola otro
+    assert jobs.submit_report_job()["id"] != first["id"]
+
+def test_job_flow_over_http(fake_report, login_as, monkeypatch):
+    monkeypatch.setattr(jobs, "REPORT_JOBS_ALLOW_LOCAL", True)
+    client = login_as("admin")
+
+    response = client.post("/api/reports/combined")
+    assert response.status_code == 202
+    job = response.get_json()
+    wait_for(job["job_id"])
+
+    status = client.get(job["status_url"]).get_json()
+    assert status["status"] == "done"
+    download = client.get(status["download_url"])
+    assert download.status_code == 200 and download.data.startswith(b"%PDF")
+
+def test_legacy_get_still_downloads_the_pdf(fake_report, login_as, monkeypatch):
+    monkeypatch.setattr(jobs, "REPORT_JOBS_ALLOW_LOCAL", True)
+    response = login_as("admin").get("/api/reports/combined")
+    assert response.status_code == 200
+    assert response.data.startswith(b"%PDF")
+
+def test_legacy_get_answers_202_while_the_job_runs(fake_report, login_as, monkeypatch):
+    monkeypatch.setattr(jobs, "REPORT_JOBS_ALLOW_LOCAL", True)
+    monkeypatch.setattr("app.main.REPORT_GET_WAIT_SECONDS", 0.1)
+    fake_report.clear()
+    response = login_as("admin").get("/api/reports/combined")
+    assert response.status_code == 202
+    assert response.headers["Location"] == response.get_json()["status_url"]
+
+def test_reports_require_admin(login_as):
+    client = login_as("student", user_id=2, email="ana@uce.edu.ec")
+    assert client.post("/api/reports/combined").status_code == 403
+    assert client.get("/api/reports/combined").status_code == 403
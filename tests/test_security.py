@@ -0,0 +1,109 @@
+"""
+Hashing de contraseñas y limitación de intentos de login (app.security).
+"""
+import pytest
+from sqlalchemy.orm import sessionmaker
+from werkzeug.security import generate_password_hash
+
+from app import security
+
+def test_needs_rehash_accepts_hashes_of_the_configured_method():
+    # Werkzeug expande el método en el hash guardado: no debe forzar un re-hash en cada login
+    current = generate_password_hash("secreto", security.PASSWORD_HASH_METHOD)
+    assert not security.needs_rehash(current)
+
+def test_needs_rehash_detects_other_parameters():
+    assert security.needs_rehash(generate_password_hash("secreto", "pbkdf2:sha256:1000"))
+
+class StuckFuture:
+    def __init__(self):
+        self.cancelled = False
+
+    def result(self, timeout=None):
+        raise security.FuturesTimeoutError()
+
+    def cancel(self):
+        self.cancelled = True
+
+class StuckExecutor:
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, fn, *args):
+        self.futures.append(StuckFuture())
+        return self.futures[-1]
+
+def test_hash_timeout_is_reported_as_busy(monkeypatch):
+    executor = StuckExecutor()
+    monkeypatch.setattr(security, "_get_executor", lambda: executor)
+    with pytest.raises(security.HashingBusyError):
+        security.verify_password("x", "y")
+    assert executor.futures[0].cancelled
+
+def test_saturated_pool_rejects_without_waiting(monkeypatch):
+    monkeypatch.setattr(security, "_get_executor", lambda: StuckExecutor())
+    monkeypatch.setattr(security, "_pending", security.threading.BoundedSemaphore(1))
+    security._pending.acquire()
+    with pytest.raises(security.HashingBusyError):
+        security.verify_password("x", "y")
+
+def test_login_attempts_are_limited_per_account():
+    security.login_attempts.clear()
+    email, ip = "ana@uce.edu.ec", "10.0.0.1"
+    for _ in range(security.LOGIN_MAX_ATTEMPTS_PER_ACCOUNT):
+        assert security.login_retry_after(email, ip) == 0
+        security.register_login_failure(email, ip)
+    assert security.login_retry_after(email, ip) > 0
+    # Otra cuenta desde la misma IP sigue permitida (límite por IP más alto)
+    assert security.login_retry_after("luis@uce.edu.ec", ip) == 0
+    security.register_login_success(email, ip)
+    assert security.login_retry_after(email, ip) == 0
+
+def test_failures_from_one_ip_do_not_lock_the_account_elsewhere():
+    security.login_attempts.clear()
+    email = "ana@uce.edu.ec"
+    for _ in range(security.LOGIN_MAX_ATTEMPTS_PER_ACCOUNT):
+        security.register_login_failure(email, "10.0.0.66")
+    assert security.login_retry_after(email, "10.0.0.66") > 0
+    # La dueña de la cuenta, desde su propia IP, sigue pudiendo entrar
+    assert security.login_retry_after(email, "10.0.0.1") == 0
+
+def test_rotating_ips_hits_the_global_account_limit():
+    security.login_attempts.clear()
+    email = "ana@uce.edu.ec"
+    for i in range(security.LOGIN_MAX_ATTEMPTS_PER_ACCOUNT_GLOBAL):
+        security.register_login_failure(email, f"10.1.{i // 250}.{i % 250}")
+    assert security.login_retry_after(email, "10.9.9.9") > 0
+
+def failed_logins(client, attempts, headers):
+    statuses = []
+    for i in range(attempts):
+        # Una cuenta distinta por intento: solo puede actuar el límite por IP
+        response = client.post("/login", data={"email": f"alumno{i}@uce.edu.ec", "password": "x"},
+                               headers=headers(i))
+        statuses.append(response.status_code)
+    return statuses
+
+def test_spoofed_ip_headers_do_not_bypass_the_ip_limit(flask_app):
+    security.login_attempts.clear()
+    client = flask_app.test_client()
+    limit = security.LOGIN_MAX_ATTEMPTS_PER_IP
+    statuses = failed_logins(client, limit + 1, lambda i: {
+        "X-Real-IP": f"203.0.113.{i}", "X-Forwarded-For": f"198.51.100.{i}",
+    })
+    assert statuses[:limit] == [200] * limit
+    assert statuses[limit] == 429
+
+def test_behind_a_trusted_proxy_only_the_last_hop_is_used(engine, monkeypatch):
+    monkeypatch.setattr("app.dao.factory.SessionLocal", sessionmaker(bind=engine))
+    monkeypatch.setattr("app.main.TRUSTED_PROXY_HOPS", 1)
+    from app.main import create_app
+    client = create_app().test_client()
+    security.login_attempts.clear()
+    limit = security.LOGIN_MAX_ATTEMPTS_PER_IP
+    # El cliente inventa el primer valor; nginx agrega la IP real al final
+    statuses = failed_logins(client, limit + 1, lambda i: {"X-Forwarded-For": f"198.51.100.{i}, 192.0.2.7"})
+    assert statuses[limit] == 429
+    # Otro cliente real (otra IP agregada por nginx) no hereda el bloqueo
+    other = failed_logins(client, 1, lambda i: {"X-Forwarded-For": "192.0.2.8"})
+    assert other == [200]
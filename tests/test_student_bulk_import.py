@@ -0,0 +1,63 @@
+"""
+Carga masiva de estudiantes (POST /api/students/bulk).
+
+La validación, los emails repetidos en la misma carga y los límites se resuelven antes de
+tocar la base; la inserción (INSERT ... ON CONFLICT) necesita PostgreSQL.
+"""
+from tests.conftest import requires_postgres
+
+def row(email, **overrides):
+    return {"name": "Ana", "email": email, "gpa": 8.5, "department": "Sistemas", **overrides}
+
+def results_by_row(response):
+    return {item["row"]: item for item in response.get_json()["results"]}
+
+def test_only_admins_can_import(login_as):
+    client = login_as("student", user_id=2, email="ana@uce.edu.ec")
+    assert client.post("/api/students/bulk", json=[row("a@uce.edu.ec")]).status_code == 403
+
+def test_rejects_bad_payloads(login_as):
+    client = login_as("admin")
+    assert client.post("/api/students/bulk", json={"email": "a@uce.edu.ec"}).status_code == 400
+    assert client.post("/api/students/bulk?on_conflict=replace", json=[]).status_code == 400
+
+def test_row_limit(login_as, monkeypatch):
+    monkeypatch.setattr("app.main.MAX_BULK_ROWS", 2)
+    response = login_as("admin").post("/api/students/bulk", json=[row(f"a{i}@uce.edu.ec") for i in range(3)])
+    assert response.status_code == 413
+    assert "2" in response.get_json()["error"]
+
+def test_invalid_rows_and_repeated_emails_are_reported_per_row(login_as):
+    response = login_as("admin").post("/api/students/bulk", json=[
+        row("ana@uce.edu.ec"),
+        row("sin-arroba"),
+        row("luis@uce.edu.ec", gpa="alto"),
+        row("ana@uce.edu.ec", name="Ana Repetida"),
+        "no es un objeto",
+    ])
+    assert response.status_code == 200
+    results = results_by_row(response)
+    assert results[2] == {"row": 2, "email": "sin-arroba", "status": "invalid", "error": "email inválido"}
+    assert results[3]["status"] == "invalid" and "gpa" in results[3]["error"]
+    assert results[4]["status"] == "duplicate" and results[4]["error"] == "Email repetido en la misma carga"
+    assert results[5]["status"] == "invalid"
+    assert response.get_json()["total"] == 5
+
+def test_csv_body_is_accepted(login_as):
+    csv_body = "\ufeffname,email,gpa,department\nAna,ana@uce.edu.ec,8.5,Sistemas\nLuis,,7,Civil\n"
+    response = login_as("admin").post("/api/students/bulk", data=csv_body, content_type="text/csv")
+    assert response.status_code == 200
+    results = results_by_row(response)
+    assert results[2]["status"] == "invalid"
+
+@requires_postgres
+def test_skip_and_update_modes(login_as):
+    client = login_as("admin")
+    first = client.post("/api/students/bulk", json=[row("ana@uce.edu.ec")])
+    assert first.get_json()["summary"] == {"created": 1}
+
+    skipped = client.post("/api/students/bulk", json=[row("ana@uce.edu.ec", gpa=9)])
+    assert skipped.get_json()["summary"] == {"duplicate": 1}
+
+    updated = client.post("/api/students/bulk?on_conflict=update", json=[row("ana@uce.edu.ec", gpa=9)])
+    assert updated.get_json()["summary"] == {"updated": 1}
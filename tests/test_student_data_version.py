@@ -0,0 +1,37 @@
+"""
+Huella de los estudiantes para la caché de reportes (PostgresStudentDAO.data_version).
+
+Una edición (ej. la carga masiva con on_conflict="update") no cambia ni el conteo ni el
+id máximo: la huella debe cambiar igual, o se serviría un PDF desactualizado.
+"""
+from app.models.sql import StudentModel
+from tests.conftest import requires_postgres
+from app.dao.postgres_impl import PostgresStudentDAO
+
+def test_data_version_changes_when_a_student_is_edited(session):
+    dao = PostgresStudentDAO(session)
+    session.add_all([
+        StudentModel(name="Ana", email="ana@uce.edu.ec", gpa=8.5, department="Sistemas"),
+        StudentModel(name="Luis", email="luis@uce.edu.ec", gpa=7.9, department="Civil"),
+    ])
+    session.commit()
+    before = dao.data_version()
+
+    student = session.query(StudentModel).filter_by(email="ana@uce.edu.ec").one()
+    student.gpa = 9.1
+    session.commit()
+
+    assert dao.data_version() != before
+
+@requires_postgres
+def test_data_version_changes_when_bulk_import_updates_a_student(session):
+    # La carga masiva actualiza con INSERT ... ON CONFLICT DO UPDATE: ahí no corre el onupdate del ORM
+    dao = PostgresStudentDAO(session)
+    row = {"name": "Ana", "email": "ana@uce.edu.ec", "gpa": 8.5, "department": "Sistemas"}
+    assert dao.bulk_create([row])["ana@uce.edu.ec"]["status"] == "created"
+    before = dao.data_version()
+
+    outcome = dao.bulk_create([{**row, "gpa": 9.1}], on_conflict="update")
+
+    assert outcome["ana@uce.edu.ec"]["status"] == "updated"
+    assert dao.data_version() != before